@@ -0,0 +1,45 @@
+"""
+Benchmarks for the source estimates behind the 3D brain topomap
+"""
+
+from simpl_eeg import topomap_3d_brain
+
+from . import synthetic
+
+
+class InverseSuite:
+    """
+    Calculating the inverse solution of a toy spherical forward model with the default
+    empirical and shrunk noise covariance. The volume source space has free source
+    orientations, so loose is 1 and pick_ori None.
+    """
+    params = (synthetic.N_CHANNELS, [1, 10])
+    param_names = ["n_channels", "duration"]
+    timeout = 300
+
+    def setup(self, n_channels, duration):
+        self.epochs = synthetic.make_epochs(n_channels, 250, duration)
+        self.epochs.set_eeg_reference(projection=True, verbose=False)
+        self.fwd = synthetic.make_toy_forward(self.epochs.info)
+        self.inverse_operator = topomap_3d_brain.get_inverse_operator(
+            self.epochs, self.fwd, loose=1.0
+        )
+
+    def create_inverse_solution(self):
+        # the inverse operator is cached for the same data and forward
+        topomap_3d_brain.INVERSE_CACHE.clear()
+        topomap_3d_brain.create_inverse_solution(
+            self.epochs, self.fwd, loose=1.0, pick_ori=None
+        )
+
+    def time_create_inverse_solution(self, n_channels, duration):
+        self.create_inverse_solution()
+
+    def peakmem_create_inverse_solution(self, n_channels, duration):
+        self.create_inverse_solution()
+
+    def time_apply_inverse_batch(self, n_channels, duration):
+        topomap_3d_brain.apply_inverse_batch(self.epochs, self.inverse_operator, pick_ori=None)
+
+    def peakmem_apply_inverse_batch(self, n_channels, duration):
+        topomap_3d_brain.apply_inverse_batch(self.epochs, self.inverse_operator, pick_ori=None)
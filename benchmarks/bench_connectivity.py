@@ -0,0 +1,65 @@
+"""
+Benchmarks for calculating and drawing the connectivity between channels
+"""
+
+import matplotlib
+
+matplotlib.use("Agg")
+
+import matplotlib.pyplot as plt
+from simpl_eeg import connectivity, export
+
+from . import synthetic
+
+# Cases whose phase lag index would need more memory are skipped
+MAX_MEMORY = 2 ** 31
+
+
+class ConnectivitySuite:
+    """Calculating the connectivity of the first epoch for each calculation type"""
+    params = (
+        list(connectivity.CONNECTIVITY_ESTIMATORS),
+        synthetic.N_CHANNELS,
+        synthetic.SFREQS,
+        synthetic.DURATIONS
+    )
+    param_names = ["calc_type", "n_channels", "sfreq", "duration"]
+    timeout = 600
+
+    def setup(self, calc_type, n_channels, sfreq, duration):
+        # the sign of the cross spectrum of every pair of channels at every frequency
+        n_freqs = sfreq * duration // 2
+        if calc_type == "spectral_connectivity" and n_channels ** 2 * n_freqs * 24 > MAX_MEMORY:
+            raise NotImplementedError("the cross spectra do not fit in memory")
+
+        self.epoch = synthetic.make_epochs(n_channels, sfreq, duration)[0]
+
+    def time_calculate_connectivity(self, calc_type, n_channels, sfreq, duration):
+        connectivity.calculate_connectivity(self.epoch, calc_type)
+
+    def peakmem_calculate_connectivity(self, calc_type, n_channels, sfreq, duration):
+        connectivity.calculate_connectivity(self.epoch, calc_type)
+
+
+class ConnectivityPlotSuite:
+    """Drawing the connectivity of a one second epoch on the head and on a circle"""
+    params = synthetic.N_CHANNELS
+    param_names = ["n_channels"]
+
+    def setup(self, n_channels):
+        self.epoch = synthetic.make_epochs(n_channels, 250, 1)[0]
+
+    def teardown(self, n_channels):
+        plt.close("all")
+
+    def time_plot_connectivity(self, n_channels):
+        export.render_figure(connectivity.plot_connectivity(self.epoch))
+
+    def peakmem_plot_connectivity(self, n_channels):
+        export.render_figure(connectivity.plot_connectivity(self.epoch))
+
+    def time_plot_conn_circle(self, n_channels):
+        export.render_figure(connectivity.plot_conn_circle(self.epoch))
+
+    def peakmem_plot_conn_circle(self, n_channels):
+        export.render_figure(connectivity.plot_conn_circle(self.epoch))
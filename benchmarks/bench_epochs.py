@@ -0,0 +1,57 @@
+"""
+Benchmarks for loading a recording into epochs and reducing them
+"""
+
+from simpl_eeg import eeg_objects
+
+from . import synthetic
+
+
+def load_epochs(n_channels, sfreq, duration):
+    """Load the two epochs of a synthetic recording with eeg_objects.Epochs"""
+    return eeg_objects.Epochs(
+        synthetic.make_recording(n_channels, sfreq, duration),
+        tmin=0,
+        tmax=duration,
+        file_name=synthetic.FILE_NAME,
+        montage=synthetic.MONTAGE,
+        verbose=False
+    )
+
+
+class EpochsSuite:
+    """Creating epochs from a recording on disk"""
+    params = (synthetic.N_CHANNELS, synthetic.SFREQS, synthetic.DURATIONS)
+    param_names = ["n_channels", "sfreq", "duration"]
+    timeout = 600
+
+    def setup(self, n_channels, sfreq, duration):
+        synthetic.make_recording(n_channels, sfreq, duration)
+
+    def time_epochs(self, n_channels, sfreq, duration):
+        load_epochs(n_channels, sfreq, duration)
+
+    def peakmem_epochs(self, n_channels, sfreq, duration):
+        load_epochs(n_channels, sfreq, duration)
+
+
+class ReduceSuite:
+    """Reducing the selected epoch, or all epochs, to every 10th frame"""
+    params = (synthetic.N_CHANNELS, synthetic.SFREQS, synthetic.DURATIONS, [True, False])
+    param_names = ["n_channels", "sfreq", "duration", "use_single"]
+    timeout = 600
+
+    def setup(self, n_channels, sfreq, duration, use_single):
+        self.epochs = load_epochs(n_channels, sfreq, duration)
+
+    def time_average_n_steps(self, n_channels, sfreq, duration, use_single):
+        self.epochs.average_n_steps(10, use_single=use_single)
+
+    def peakmem_average_n_steps(self, n_channels, sfreq, duration, use_single):
+        self.epochs.average_n_steps(10, use_single=use_single)
+
+    def time_skip_n_steps(self, n_channels, sfreq, duration, use_single):
+        self.epochs.skip_n_steps(10, use_single=use_single)
+
+    def peakmem_skip_n_steps(self, n_channels, sfreq, duration, use_single):
+        self.epochs.skip_n_steps(10, use_single=use_single)
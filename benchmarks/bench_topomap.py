@@ -0,0 +1,77 @@
+"""
+Benchmarks for drawing and animating the 2D and 3D head topomaps
+"""
+
+import matplotlib
+
+matplotlib.use("Agg")
+
+import matplotlib.pyplot as plt
+from simpl_eeg import export, topomap_2d, topomap_3d_head
+
+from . import synthetic
+
+N_FRAMES = [12, 60]
+
+
+def make_epoch(n_channels, n_frames=1):
+    """Get the first n_frames of the first epoch of a synthetic 250 Hz recording"""
+    epochs = synthetic.make_epochs(n_channels, 250, 1)
+    return epochs[0].crop(tmax=epochs.times[n_frames - 1])
+
+
+class Topomap2DSuite:
+    """Drawing a single 2D topomap"""
+    params = synthetic.N_CHANNELS
+    param_names = ["n_channels"]
+
+    def setup(self, n_channels):
+        self.epoch = make_epoch(n_channels)
+
+    def teardown(self, n_channels):
+        plt.close("all")
+
+    def time_plot_topomap_2d(self, n_channels):
+        export.render_figure(topomap_2d.plot_topomap_2d(self.epoch).figure)
+
+    def peakmem_plot_topomap_2d(self, n_channels):
+        export.render_figure(topomap_2d.plot_topomap_2d(self.epoch).figure)
+
+
+class AnimateTopomap2DSuite:
+    """Rendering every frame of a 2D topomap animation"""
+    params = (synthetic.N_CHANNELS, N_FRAMES)
+    param_names = ["n_channels", "n_frames"]
+    timeout = 300
+
+    def setup(self, n_channels, n_frames):
+        self.epoch = make_epoch(n_channels, n_frames)
+
+    def teardown(self, n_channels, n_frames):
+        plt.close("all")
+
+    def render(self):
+        for frame in export.iter_frames(topomap_2d.animate_topomap_2d(self.epoch)):
+            pass
+
+    def time_animate_topomap_2d(self, n_channels, n_frames):
+        self.render()
+
+    def peakmem_animate_topomap_2d(self, n_channels, n_frames):
+        self.render()
+
+
+class Animate3DHeadSuite:
+    """Creating the plotly figure of a 3D head animation"""
+    params = (synthetic.N_CHANNELS, N_FRAMES)
+    param_names = ["n_channels", "n_frames"]
+    timeout = 300
+
+    def setup(self, n_channels, n_frames):
+        self.epoch = make_epoch(n_channels, n_frames)
+
+    def time_animate_3d_head(self, n_channels, n_frames):
+        topomap_3d_head.animate_3d_head(self.epoch)
+
+    def peakmem_animate_3d_head(self, n_channels, n_frames):
+        topomap_3d_head.animate_3d_head(self.epoch)
@@ -0,0 +1,260 @@
+# -*- coding: utf-8 -*-
+
+"""
+Module for generating the seeded synthetic EEG recordings the benchmarks run on
+"""
+
+import os
+import shutil
+import tempfile
+
+import mne
+import numpy as np
+
+# The classic 10-20 channels, extended with the spread out 10-05 channels for larger caps
+CHANNELS_1020 = [
+    "Fp1", "Fp2", "F7", "F3", "Fz", "F4", "F8", "T7", "C3", "Cz",
+    "C4", "T8", "P7", "P3", "Pz", "P4", "P8", "O1", "O2"
+]
+MONTAGE = "standard_1005"
+
+# The sizes the benchmarks are parameterized over
+N_CHANNELS = [19, 32, 64, 128]
+SFREQS = [250, 500, 1000, 2000]
+DURATIONS = [1, 10, 60]
+
+# Recordings are written once per machine and reused by every benchmark process
+RECORDING_DIR = os.path.join(tempfile.gettempdir(), "simpl_eeg_benchmarks")
+FILE_NAME = "recording.vhdr"
+
+# Seconds of data before the first, between and after the epochs
+EPOCH_GAP = 1
+
+
+def get_channel_names(n_channels):
+    """
+    Get the names of a cap of n_channels electrodes. The 10-20 channels are used first,
+    and further channels are added one at a time as far away as possible from the
+    channels already picked, so caps of every size cover the whole head.
+
+    Parameters:
+        n_channels: int
+            The number of channels.
+
+    Returns:
+        [str]:
+            The channel names.
+    """
+    positions = mne.channels.make_standard_montage(MONTAGE).get_positions()["ch_pos"]
+
+    # aliases (e.g. T3 and T7) share their position
+    names, coords = [], []
+    for name, coord in positions.items():
+        if not any(np.allclose(coord, other) for other in coords):
+            names.append(name)
+            coords.append(coord)
+    coords = np.array(coords)
+
+    picked = [names.index(name) for name in CHANNELS_1020[:n_channels]]
+    distance = np.min(
+        np.linalg.norm(coords[:, np.newaxis] - coords[picked][np.newaxis], axis=-1), axis=1
+    )
+    while len(picked) < n_channels:
+        picked.append(int(np.argmax(distance)))
+        distance = np.minimum(distance, np.linalg.norm(coords - coords[picked[-1]], axis=1))
+
+    return [names[idx] for idx in picked]
+
+
+def get_event_samples(sfreq, duration, n_epochs):
+    """
+    Get the samples of the events of a recording, one at the start of each epoch.
+
+    Parameters:
+        sfreq: float
+            The sampling frequency.
+        duration: float
+            The seconds per epoch.
+        n_epochs: int
+            The number of epochs.
+
+    Returns:
+        numpy.ndarray:
+            The sample of each event.
+    """
+    return np.round((EPOCH_GAP + np.arange(n_epochs) * (duration + EPOCH_GAP)) * sfreq).astype(int)
+
+
+def make_raw(n_channels, sfreq, duration, n_epochs=2, seed=0):
+    """
+    Generate a recording of seeded noise with a 10 Hz rhythm of a random phase on each
+    channel, long enough for n_epochs epochs of duration seconds.
+
+    Parameters:
+        n_channels: int
+            The number of channels.
+        sfreq: float
+            The sampling frequency.
+        duration: float
+            The seconds per epoch.
+        n_epochs: int
+            The number of epochs. Defaults to 2.
+        seed: int
+            The seed of the data. Defaults to 0.
+
+    Returns:
+        mne.io.RawArray:
+            The recording, with the standard montage set.
+    """
+    random_state = np.random.RandomState(seed)
+    n_samples = int(round((EPOCH_GAP + n_epochs * (duration + EPOCH_GAP)) * sfreq))
+    times = np.arange(n_samples) / sfreq
+    phases = random_state.uniform(0, 2 * np.pi, (n_channels, 1))
+
+    # microvolts
+    data = random_state.standard_normal((n_channels, n_samples)) * 5
+    data += 10 * np.sin(2 * np.pi * 10 * times + phases)
+
+    info = mne.create_info(get_channel_names(n_channels), sfreq, "eeg")
+    raw = mne.io.RawArray(data * 1e-6, info, verbose=False)
+    raw.set_montage(MONTAGE, verbose=False)
+    return raw
+
+
+def make_epochs(n_channels, sfreq, duration, n_epochs=2, seed=0):
+    """
+    Generate epochs of a synthetic recording in memory, the same as the ones
+    eeg_objects.Epochs creates from the file written by make_recording.
+
+    Parameters:
+        n_channels: int
+            The number of channels.
+        sfreq: float
+            The sampling frequency.
+        duration: float
+            The seconds per epoch.
+        n_epochs: int
+            The number of epochs. Defaults to 2.
+        seed: int
+            The seed of the data. Defaults to 0.
+
+    Returns:
+        mne.Epochs:
+            The preloaded epochs.
+    """
+    raw = make_raw(n_channels, sfreq, duration, n_epochs, seed)
+    samples = get_event_samples(sfreq, duration, n_epochs)
+    events = np.stack([samples, np.zeros_like(samples), np.ones_like(samples)], axis=1)
+    return mne.Epochs(
+        raw, events, tmin=0, tmax=duration, baseline=(0, 0), preload=True, verbose=False
+    )
+
+
+def write_brainvision(folder_path, raw, event_samples):
+    """
+    Helper function for make_recording. Writes a recording as BrainVision files, one of
+    the file types eeg_objects.EEG_File reads, with a stimulus marker for each event.
+
+    Parameters:
+        folder_path: str
+            The folder to write the .vhdr, .vmrk and .eeg files to.
+        raw: mne.io.Raw
+            The recording.
+        event_samples: numpy.ndarray
+            The sample of each event.
+    """
+    name = os.path.splitext(FILE_NAME)[0]
+    channels = "".join(
+        "Ch{}={},,1,µV\n".format(idx + 1, ch_name) for idx, ch_name in enumerate(raw.ch_names)
+    )
+    markers = "".join(
+        "Mk{}=Stimulus,S  1,{},1,0\n".format(idx + 1, sample + 1)
+        for idx, sample in enumerate(event_samples)
+    )
+
+    with open(os.path.join(folder_path, name + ".vhdr"), "w", encoding="utf-8") as header:
+        header.write(
+            "Brain Vision Data Exchange Header File Version 1.0\n\n"
+            "[Common Infos]\nCodepage=UTF-8\n"
+            "DataFile={0}.eeg\nMarkerFile={0}.vmrk\n"
+            "DataFormat=BINARY\nDataOrientation=MULTIPLEXED\n"
+            "NumberOfChannels={1}\nSamplingInterval={2}\n\n"
+            "[Binary Infos]\nBinaryFormat=IEEE_FLOAT_32\n\n"
+            "[Channel Infos]\n{3}".format(
+                name, len(raw.ch_names), 1e6 / raw.info["sfreq"], channels
+            )
+        )
+
+    with open(os.path.join(folder_path, name + ".vmrk"), "w", encoding="utf-8") as marker:
+        marker.write(
+            "Brain Vision Data Exchange Marker File, Version 1.0\n\n"
+            "[Common Infos]\nCodepage=UTF-8\nDataFile={}.eeg\n\n"
+            "[Marker Infos]\n{}".format(name, markers)
+        )
+
+    (raw.get_data().T * 1e6).astype("<f4").tofile(os.path.join(folder_path, name + ".eeg"))
+
+
+def make_recording(n_channels, sfreq, duration, n_epochs=2, seed=0):
+    """
+    Get the folder of a synthetic recording written as BrainVision files, so loading it
+    goes through eeg_objects.EEG_File like real data. Each recording is only written once.
+
+    Parameters:
+        n_channels: int
+            The number of channels.
+        sfreq: float
+            The sampling frequency.
+        duration: float
+            The seconds per epoch.
+        n_epochs: int
+            The number of epochs. Defaults to 2.
+        seed: int
+            The seed of the data. Defaults to 0.
+
+    Returns:
+        str:
+            The folder path, to pass to eeg_objects.Epochs with file_name=FILE_NAME.
+    """
+    folder_path = os.path.join(
+        RECORDING_DIR, "{}ch_{}hz_{}s_{}ep_{}".format(n_channels, sfreq, duration, n_epochs, seed)
+    )
+
+    if not os.path.isdir(folder_path):
+        os.makedirs(RECORDING_DIR, exist_ok=True)
+        tmp_path = tempfile.mkdtemp(dir=RECORDING_DIR)
+        try:
+            write_brainvision(
+                tmp_path,
+                make_raw(n_channels, sfreq, duration, n_epochs, seed),
+                get_event_samples(sfreq, duration, n_epochs)
+            )
+            os.rename(tmp_path, folder_path)
+        except OSError:
+            # another process wrote the same recording first
+            if not os.path.isdir(folder_path):
+                raise
+        finally:
+            shutil.rmtree(tmp_path, ignore_errors=True)
+
+    return folder_path
+
+
+def make_toy_forward(info, spacing=15.):
+    """
+    Generate a forward solution for a spherical head model with a volume source space,
+    so the inverse path can be benchmarked without downloading the fsaverage brain.
+
+    Parameters:
+        info: mne.Info
+            Info containing the channel locations.
+        spacing: float
+            The distance in mm between the sources. Defaults to 15.
+
+    Returns:
+        mne.Forward:
+            The forward solution.
+    """
+    sphere = mne.make_sphere_model("auto", "auto", info, verbose=False)
+    src = mne.setup_volume_source_space(pos=spacing, sphere=sphere, verbose=False)
+    return mne.make_forward_solution(info, None, src, sphere, verbose=False)
@@ -4,11 +4,22 @@
 Module for reading and generating custom epochs
 """
 
+import math
+import multiprocessing
+import os
+import shutil
+
 import matplotlib.pyplot as plt
 import matplotlib.animation as animation
 import pandas as pd
-import math
 import mne
+import numpy as np
+from matplotlib.collections import LineCollection
+from mne.filter import next_fast_len
+from scipy.signal import hilbert
+from matplotlib.patches import PathPatch
+from matplotlib.path import Path
+from simpl_eeg import eeg_objects, layout
 
 # common node pairs for convenient access
 PAIR_OPTIONS = {
@@ -46,6 +57,237 @@ def convert_pairs(string_pairs):
     return tuple_pairs
 
 
+def get_analytic_signal(data, sfreq):
+    """
+    Calculate the analytic signal of every channel with the Hilbert transform,
+    the same way as mne.connectivity.envelope_correlation(). Helper function
+    for calculate_connectivity_arrays.
+
+    Args:
+        data: numpy.ndarray
+            Array of shape (n_epochs, n_channels, n_times) with the samples
+        sfreq: float
+            The sampling frequency
+
+    Returns:
+        numpy.ndarray:
+            Complex array of shape (n_epochs, n_channels, n_times)
+    """
+    n_times = data.shape[-1]
+    return hilbert(data, N=next_fast_len(n_times), axis=-1)[..., :n_times]
+
+
+def get_fourier_spectra(data, sfreq):
+    """
+    Calculate the Hanning windowed spectra of every channel from 5 cycles per window
+    up to the Nyquist frequency, the same way as mne.connectivity.spectral_connectivity()
+    with mode="fourier". Helper function for calculate_connectivity_arrays.
+
+    Args:
+        data: numpy.ndarray
+            Array of shape (n_epochs, n_channels, n_times) with the samples
+        sfreq: float
+            The sampling frequency
+
+    Returns:
+        numpy.ndarray:
+            Complex array of shape (n_epochs, n_channels, n_freqs)
+    """
+    n_times = data.shape[-1]
+    freqs = np.fft.rfftfreq(n_times, 1. / sfreq)
+    freq_mask = freqs >= 5. / (n_times / sfreq)
+    if not freq_mask.any():
+        raise ValueError(
+            "There are no frequency points above 5 cycles per window, "
+            "please use longer windows"
+        )
+
+    data = data - data.mean(axis=-1, keepdims=True)
+    return np.fft.rfft(data * np.hanning(n_times), axis=-1)[..., freq_mask]
+
+
+# The inputs the connectivity estimators can use, each calculated
+# at most once from the samples and shared by all estimators
+CONNECTIVITY_INPUTS = {
+    "samples": lambda data, sfreq: data,
+    "analytic": get_analytic_signal,
+    "fourier": get_fourier_spectra
+}
+
+# The connectivity estimators, keyed by calc_type, with the input they use
+CONNECTIVITY_ESTIMATORS = {}
+
+# The samples of the current batch worker process, set once by init_batch_worker
+BATCH_WORKER_STATE = {}
+
+
+def register_connectivity_estimator(calc_type, input="samples"):
+    """
+    Register a connectivity estimator for calculate_connectivity. The estimator is
+    called with the input it declares and returns an (n_channels, n_channels) array.
+
+    Args:
+        calc_type: str
+            The calculation type the estimator is used for
+        input: str (optional)
+            The input of the estimator, one of
+            samples (n_epochs, n_channels, n_times),
+            analytic (the complex Hilbert transform of the samples), or
+            fourier (the complex spectra of the samples, see get_fourier_spectra).
+            Defaults to "samples".
+
+    Returns:
+        function:
+            Decorator registering the estimator
+    """
+    if input not in CONNECTIVITY_INPUTS:
+        raise ValueError(
+            "Invalid input, input can only be one of "
+            "samples, "
+            "analytic, or "
+            "fourier"
+        )
+
+    def decorator(estimator):
+        CONNECTIVITY_ESTIMATORS[calc_type] = (input, estimator)
+        return estimator
+
+    return decorator
+
+
+@register_connectivity_estimator("correlation")
+def correlation_estimator(samples):
+    """
+    Pearson correlation of the samples of all epochs.
+
+    Args:
+        samples: numpy.ndarray
+            Array of shape (n_epochs, n_channels, n_times) with the samples
+
+    Returns:
+        numpy.ndarray:
+            The (n_channels, n_channels) correlation
+    """
+    # constant channels give nan like pandas.DataFrame.corr
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.corrcoef(np.hstack(samples))
+
+
+@register_connectivity_estimator("covariance")
+def covariance_estimator(samples):
+    """
+    Empirical covariance of the samples of all epochs, without subtracting the
+    mean like mne.compute_covariance().
+
+    Args:
+        samples: numpy.ndarray
+            Array of shape (n_epochs, n_channels, n_times) with the samples
+
+    Returns:
+        numpy.ndarray:
+            The (n_channels, n_channels) covariance
+    """
+    samples = np.hstack(samples)
+    return samples @ samples.T / (samples.shape[1] - 1)
+
+
+@register_connectivity_estimator("envelope_correlation", input="analytic")
+def envelope_correlation_estimator(analytic):
+    """
+    Orthogonalized envelope correlation averaged over the epochs, calculated
+    with mne.connectivity.envelope_correlation().
+
+    Args:
+        analytic: numpy.ndarray
+            Complex array of shape (n_epochs, n_channels, n_times) with the
+            analytic signal
+
+    Returns:
+        numpy.ndarray:
+            The (n_channels, n_channels) envelope correlation
+    """
+    return mne.connectivity.envelope_correlation(analytic, verbose=False)
+
+
+@register_connectivity_estimator("spectral_connectivity", input="fourier")
+def spectral_connectivity_estimator(spectra):
+    """
+    Phase lag index averaged over the frequencies. Only the lower triangle is
+    filled like with mne.connectivity.spectral_connectivity(method="pli").
+
+    Args:
+        spectra: numpy.ndarray
+            Complex array of shape (n_epochs, n_channels, n_freqs) with the spectra
+
+    Returns:
+        numpy.ndarray:
+            The (n_channels, n_channels) phase lag index
+    """
+    # sign of the imaginary cross spectrum of every pair, averaged over the epochs
+    pli = np.zeros((spectra.shape[1], spectra.shape[1], spectra.shape[2]))
+    for epoch_spectra in spectra:
+        pli += np.sign(np.imag(epoch_spectra[:, np.newaxis] * epoch_spectra[np.newaxis].conj()))
+    pli = np.abs(pli / len(spectra)).mean(axis=-1)
+    return np.tril(pli, -1)
+
+
+def calculate_connectivity_arrays(data, sfreq, calc_types, inputs=None):
+    """
+    Calculate several types of connectivity from the same samples. Every input needed
+    by the estimators (e.g. the Hilbert transform or the spectra) is only calculated once.
+
+    Args:
+        data: numpy.ndarray
+            Array of shape (n_epochs, n_channels, n_times) with the samples
+        sfreq: float
+            The sampling frequency
+        calc_types: [str]
+            The calculation types, see calculate_connectivity
+        inputs: dict (optional)
+            Already calculated inputs, keyed by name. Inputs calculated by this
+            function are added to it. Defaults to None.
+
+    Returns:
+        {str: numpy.ndarray}:
+            The (n_channels, n_channels) connectivity of each calculation type
+    """
+    if inputs is None:
+        inputs = {}
+
+    for calc_type in calc_types:
+        if calc_type not in CONNECTIVITY_ESTIMATORS:
+            raise ValueError(
+                "Invalid calculation type, calc_type can only be one of " +
+                ", ".join(CONNECTIVITY_ESTIMATORS)
+            )
+
+    conn = {}
+    for calc_type in calc_types:
+        input, estimator = CONNECTIVITY_ESTIMATORS[calc_type]
+        if input not in inputs:
+            inputs[input] = CONNECTIVITY_INPUTS[input](data, sfreq)
+        conn[calc_type] = estimator(inputs[input])
+
+    return conn
+
+
+def get_epoch_samples(epoch):
+    """
+    Get the samples of an epoch or evoked as an (n_epochs, n_channels, n_times) array.
+
+    Args:
+        epoch: mne.epochs.Epochs or mne.evoked.EvokedArray
+            Epoch to get the samples of
+
+    Returns:
+        numpy.ndarray:
+            The samples
+    """
+    if type(epoch) is mne.evoked.EvokedArray:
+        return epoch.data[np.newaxis]
+    return epoch.get_data()
+
+
 def calculate_connectivity(epoch, calc_type="correlation"):
     """
     Calculate connectivity between nodes
@@ -58,7 +300,8 @@ def calculate_connectivity(epoch, calc_type="correlation"):
             spectral_connectivity,
             envelope_correlation,
             covariance,
-            correlation.
+            correlation,
+            or any type added with register_connectivity_estimator.
             Defaults to "correlation".
 
     Returns:
@@ -75,45 +318,291 @@ def calculate_connectivity(epoch, calc_type="correlation"):
     if type(calc_type) is not str:
         raise TypeError("calc_type has to be a string")
 
-    ch_names = epoch.ch_names
+    conn = calculate_connectivity_arrays(
+        get_epoch_samples(epoch), epoch.info["sfreq"], [calc_type]
+    )[calc_type]
 
-    # only return channel data
-    conn_df = epoch.to_data_frame().corr().loc[ch_names, ch_names]
+    return pd.DataFrame(conn, index=epoch.ch_names, columns=epoch.ch_names)
 
-    if calc_type != "correlation":
 
-        if calc_type == "spectral_connectivity":
-            conn = mne.connectivity.spectral_connectivity(
-                epoch,
-                method="pli",
-                mode="fourier",
-                faverage=True,
-                verbose=False
-            )[0][:, :, 0]
+def get_batch_samples(epochs):
+    """
+    Get the samples, sampling frequency and channel names of a batch of epochs.
+    Helper function for calculate_batch_connectivity.
 
-        elif calc_type == "envelope_correlation":
-            conn = mne.connectivity.envelope_correlation(epoch)
+    Args:
+        epochs: simpl_eeg.eeg_objects.Epochs or mne.BaseEpochs
+            The epochs
 
-        elif calc_type == "covariance":
-            conn = mne.compute_covariance(epoch, verbose=False).data
+    Returns:
+        numpy.ndarray:
+            Array of shape (n_epochs, n_channels, n_times) with the samples
+        float:
+            The sampling frequency
+        [str]:
+            The channel names
+    """
+    if isinstance(epochs, eeg_objects.Epochs):
+        epochs = epochs.all_epochs
 
-        else:
-            raise Exception(
-                "Invalid calculation type, calc_type can only be one of "
-                "correlation, "
-                "spectral_connectivity, "
-                "envelope_correlation, or"
-                "covariance"
+    if not isinstance(epochs, mne.BaseEpochs):
+        raise TypeError(
+            "epochs is not an epoched data, "
+            "please refer to eeg_objects to create an epoched data"
+        )
+
+    # loads lazy epochs and drops the bad ones
+    return epochs.get_data(), epochs.info["sfreq"], epochs.ch_names
+
+
+def init_batch_worker(samples, sfreq, calc_types):
+    """
+    Store the samples that a worker process calculates connectivity from.
+    Helper function for calculate_batch_connectivity.
+
+    Args:
+        samples: numpy.ndarray
+            Array of shape (n_epochs, n_channels, n_times) with the samples
+        sfreq: float
+            The sampling frequency
+        calc_types: [str]
+            The calculation types
+    """
+    BATCH_WORKER_STATE["samples"] = samples
+    BATCH_WORKER_STATE["sfreq"] = sfreq
+    BATCH_WORKER_STATE["calc_types"] = calc_types
+
+
+def calculate_batch_chunk(epoch_numbers):
+    """
+    Calculate the connectivity of a chunk of epochs of the worker process.
+    Helper function for calculate_batch_connectivity.
+
+    Args:
+        epoch_numbers: [int]
+            Indices of the epochs to calculate
+
+    Returns:
+        [int]:
+            The indices of the epochs
+        {str: numpy.ndarray}:
+            The (n_chunk, n_channels, n_channels) connectivity of each calculation type
+    """
+    samples = BATCH_WORKER_STATE["samples"]
+    calc_types = BATCH_WORKER_STATE["calc_types"]
+    conn = {calc_type: [] for calc_type in calc_types}
+    for epoch_number in epoch_numbers:
+        epoch_conn = calculate_connectivity_arrays(
+            samples[epoch_number:epoch_number + 1], BATCH_WORKER_STATE["sfreq"], calc_types
+        )
+        for calc_type in calc_types:
+            conn[calc_type].append(epoch_conn[calc_type])
+    return epoch_numbers, {calc_type: np.array(conn[calc_type]) for calc_type in calc_types}
+
+
+def load_batch_checkpoint(checkpoint_dir, calc_types, shape):
+    """
+    Open (or create) the memory mapped results of an interrupted batch calculation.
+    Helper function for calculate_batch_connectivity.
+
+    Args:
+        checkpoint_dir: str
+            Directory containing a .npy file for each calculation type
+            and a done.npy file with the finished epochs
+        calc_types: [str]
+            The calculation types
+        shape: (int, int, int)
+            The (n_epochs, n_channels, n_channels) shape of the results
+
+    Returns:
+        {str: numpy.memmap}:
+            The results of each calculation type
+        numpy.memmap:
+            Boolean array marking the finished epochs
+    """
+    os.makedirs(checkpoint_dir, exist_ok=True)
+    done_path = os.path.join(checkpoint_dir, "done.npy")
+    paths = {
+        calc_type: os.path.join(checkpoint_dir, calc_type + ".npy")
+        for calc_type in calc_types
+    }
+
+    try:
+        done = np.load(done_path, mmap_mode="r+")
+        conn = {calc_type: np.load(path, mmap_mode="r+") for calc_type, path in paths.items()}
+        if done.shape != shape[:1] or any(values.shape != shape for values in conn.values()):
+            raise ValueError("checkpoint is for different epochs")
+    except (OSError, ValueError):
+        # nothing to resume (or the checkpoint does not match), start over
+        conn = {
+            calc_type: np.lib.format.open_memmap(path, mode="w+", shape=shape)
+            for calc_type, path in paths.items()
+        }
+        # the done flags are created last so a partially created checkpoint is never used
+        done = np.lib.format.open_memmap(done_path, mode="w+", dtype=bool, shape=shape[:1])
+
+    return conn, done
+
+
+def calculate_batch_connectivity(
+    epochs,
+    calc_types=["correlation"],
+    n_jobs=1,
+    path=None,
+    chunk_size=None,
+    progress=True,
+    **kwargs
+):
+    """
+    Calculate the connectivity of every epoch separately for several calculation
+    types. The epochs are split into chunks which are calculated in parallel by a
+    pool of processes.
+
+    If a path is given the results are saved to a .npz file and checkpointed after
+    every chunk in a "<path>.partial" directory, so calling the function again with
+    the same arguments after an interruption only calculates the unfinished epochs.
+    Since the workers are started with 'spawn', scripts calling this function with
+    n_jobs > 1 need an `if __name__ == '__main__':` guard, and calculation types added
+    with register_connectivity_estimator need to be registered in an importable module.
+
+    Args:
+        epochs: simpl_eeg.eeg_objects.Epochs, mne.BaseEpochs or [str]
+            The epochs to calculate connectivity for, or a list of experiment
+            folders which are each loaded with eeg_objects.Epochs
+        calc_types: [str] (optional)
+            The calculation types, see calculate_connectivity.
+            Defaults to ["correlation"].
+        n_jobs: int (optional)
+            Number of processes to calculate with. None uses the number of CPUs
+            and 1 calculates in the current process. Defaults to 1.
+        path: str (optional)
+            Path of the .npz file to save the results to. For a list of folders
+            a directory which gets a .npz file named after each folder.
+            Defaults to None to only return the results.
+        chunk_size: int (optional)
+            Number of epochs calculated per task. Defaults to None for about
+            four tasks per process.
+        progress: bool or function (optional)
+            Whether to log the progress with mne's logger, or a function called with
+            the number of finished and total epochs after every chunk. Defaults to True.
+        **kwargs: dict (optional)
+            Arguments for eeg_objects.Epochs when a list of folders is given
+
+    Returns:
+        {str: numpy.ndarray}:
+            The (n_epochs, n_channels, n_channels) connectivity of each calculation
+            type, and the channel names under "ch_names". A list with one for each
+            folder when a list of folders is given.
+    """
+    if type(calc_types) is str:
+        calc_types = [calc_types]
+
+    for calc_type in calc_types:
+        if calc_type not in CONNECTIVITY_ESTIMATORS:
+            raise ValueError(
+                "Invalid calculation type, calc_type can only be one of " +
+                ", ".join(CONNECTIVITY_ESTIMATORS)
             )
 
-        conn_df.iloc[-conn.shape[0]:, -conn.shape[1]:] = conn
+    if n_jobs is None:
+        n_jobs = os.cpu_count()
+
+    if type(epochs) is list:
+        results = []
+        for folder in epochs:
+            folder_path = None
+            if path is not None:
+                name = os.path.basename(os.path.normpath(folder))
+                folder_path = os.path.join(path, name + ".npz")
+            elif progress is True:
+                mne.utils.logger.info("Calculating connectivity for %s" % folder)
+            results.append(calculate_batch_connectivity(
+                eeg_objects.Epochs(folder, **kwargs),
+                calc_types=calc_types,
+                n_jobs=n_jobs,
+                path=folder_path,
+                chunk_size=chunk_size,
+                progress=progress
+            ))
+        return results
+
+    # a finished run is only loaded
+    if path is not None and os.path.exists(path):
+        with np.load(path) as saved:
+            if all(calc_type in saved.files for calc_type in calc_types):
+                return {
+                    "ch_names": list(saved["ch_names"]),
+                    **{calc_type: saved[calc_type] for calc_type in calc_types}
+                }
+
+    samples, sfreq, ch_names = get_batch_samples(epochs)
+    shape = (len(samples), len(ch_names), len(ch_names))
+
+    if path is None:
+        conn = {calc_type: np.zeros(shape) for calc_type in calc_types}
+        done = np.zeros(len(samples), dtype=bool)
+    else:
+        checkpoint_dir = path + ".partial"
+        conn, done = load_batch_checkpoint(checkpoint_dir, calc_types, shape)
+
+    todo = np.flatnonzero(~done)
+    if chunk_size is None:
+        chunk_size = max(1, math.ceil(len(todo) / (max(n_jobs, 1) * 4)))
+    chunks = [list(todo[start:start + chunk_size]) for start in range(0, len(todo), chunk_size)]
+
+    def store(epoch_numbers, chunk_conn):
+        for calc_type in calc_types:
+            conn[calc_type][epoch_numbers] = chunk_conn[calc_type]
+        if path is not None:
+            for values in conn.values():
+                values.flush()
+        done[epoch_numbers] = True
+        if path is not None:
+            done.flush()
+
+        if callable(progress):
+            progress(int(done.sum()), len(done))
+        elif progress:
+            mne.utils.logger.info(
+                "Calculated connectivity for %d of %d epochs" % (done.sum(), len(done))
+            )
+
+    try:
+        if n_jobs <= 1 or len(chunks) <= 1:
+            init_batch_worker(samples, sfreq, calc_types)
+            for chunk in chunks:
+                store(*calculate_batch_chunk(chunk))
+        else:
+            context = multiprocessing.get_context("spawn")
+            with context.Pool(
+                n_jobs,
+                initializer=init_batch_worker,
+                initargs=(samples, sfreq, calc_types)
+            ) as pool:
+                for epoch_numbers, chunk_conn in pool.imap_unordered(calculate_batch_chunk, chunks):
+                    store(epoch_numbers, chunk_conn)
+    finally:
+        BATCH_WORKER_STATE.clear()
+
+    results = {"ch_names": list(ch_names)}
+    results.update({calc_type: np.array(conn[calc_type]) for calc_type in calc_types})
+
+    if path is not None:
+        del conn, done
+        # write to a temporary file first so an interrupted save is never loaded
+        tmp_path = "%s.%d.tmp.npz" % (path[:-4] if path.endswith(".npz") else path, os.getpid())
+        np.savez(tmp_path, **results)
+        os.replace(tmp_path, path)
+        shutil.rmtree(checkpoint_dir, ignore_errors=True)
+
+    return results
 
-    return conn_df
 
 def get_axis_lims_con(epoch):
     """
-    Generates an invisible mne.viz.plot_topomap plot and gets the ylim from its
-    matplotlib.axes._subplots.AxesSubplot. Helper function for plot_connectivity.
+    Gets the ylim of a default mne.viz.plot_topomap plot of the epoch. Calculated
+    from the montage positions without drawing and cached per montage. Helper
+    function for plot_connectivity.
     
     Parameters:
         epoch: mne.epochs.Epochs
@@ -123,23 +612,7 @@ def get_axis_lims_con(epoch):
         ax_lims: tuple
             A tuple of the ax_lims.
     """
-    fig, ax = plt.subplots()
-    
-    if type(epoch) is mne.evoked.EvokedArray:
-        plot_data = epoch.data[:, 0]
-    else:
-        plot_data = epoch.get_data('eeg')[0][:, 0]
-
-    mne.viz.plot_topomap(
-        data=plot_data,
-        pos=epoch.info,
-        show=False,
-        res=1
-    )
-    
-    axis_lims = ax.get_ylim()
-    plt.close()
-    return(axis_lims)
+    return layout.get_axis_lims(epoch.info)
 
 def get_frame(epoch, step_size, frame_number):
     """
@@ -172,6 +645,434 @@ def get_frame(epoch, step_size, frame_number):
     )
 
 
+def get_window_bounds(n_times, window_size, hop):
+    """
+    Get the first and last sample of each window of a sliding window analysis.
+    Windows start every hop samples and are cut short at the end of the data.
+    Helper function for calculate_windowed_connectivity.
+
+    Args:
+        n_times: int
+            Number of samples in the data
+        window_size: int
+            Number of samples in each window
+        hop: int
+            Number of samples between the starts of consecutive windows
+
+    Returns:
+        numpy.ndarray:
+            Array of shape (n_windows, 2) with the start (inclusive) and stop
+            (exclusive) sample of each window
+    """
+    starts = np.arange(0, n_times, hop)
+    stops = np.minimum(starts + window_size, n_times)
+    return np.stack([starts, stops], axis=1)
+
+
+def calculate_windowed_connectivity(epoch, calc_type="correlation", window_size=21, hop=20):
+    """
+    Calculate connectivity between nodes for every window of a sliding window analysis.
+    Correlation and (empirical) covariance are calculated in one pass over the samples.
+    When windows overlap by more than a hop, running sums and cross-products are updated
+    with the samples entering and leaving the window so the overlap isn't recalculated.
+    Other calculation types are calculated separately for every window, the same as
+    calculate_connectivity on the cropped epoch. Windows that are too short for a
+    calculation type give nan.
+
+    The default window_size and hop give the same windows as get_frame with 20 steps.
+
+    Args:
+        epoch: mne.epochs.Epochs
+            Epoch to calculate connectivity for
+        calc_type: str (optional)
+            Calculation type, one of
+            spectral_connectivity,
+            envelope_correlation,
+            covariance,
+            correlation,
+            or any type added with register_connectivity_estimator.
+            Defaults to "correlation".
+        window_size: int (optional)
+            Number of samples in each window. Defaults to 21.
+        hop: int (optional)
+            Number of samples between the starts of consecutive windows.
+            Defaults to 20.
+
+    Returns:
+        conn: numpy.ndarray
+            Array of shape (n_windows, n_channels, n_channels) with the connectivity
+            of each window
+        times: numpy.ndarray
+            Array of shape (n_windows, 2) with the first and last time of each window
+    """
+    if type(epoch) is not mne.epochs.Epochs and type(epoch) is not mne.evoked.EvokedArray:
+        raise TypeError(
+            "epoch is not an epoched data, "
+            "please refer to eeg_objects to create an epoched data"
+        )
+
+    if type(calc_type) is not str:
+        raise TypeError("calc_type has to be a string")
+
+    if not isinstance(window_size, (int, np.integer)) or not isinstance(hop, (int, np.integer)):
+        raise TypeError("window_size and hop have to be integers")
+
+    if window_size < 1 or hop < 1:
+        raise ValueError("window_size and hop have to be at least 1")
+
+    bounds = get_window_bounds(len(epoch.times), window_size, hop)
+    times = epoch.times[np.stack([bounds[:, 0], bounds[:, 1] - 1], axis=1)]
+
+    data = get_epoch_samples(epoch)
+    sfreq = epoch.info["sfreq"]
+
+    if calc_type not in ("correlation", "covariance"):
+        if calc_type not in CONNECTIVITY_ESTIMATORS:
+            calculate_connectivity_arrays(data, sfreq, [calc_type])
+
+        conn = np.full((len(bounds), data.shape[1], data.shape[1]), np.nan)
+        for frame, (start, stop) in enumerate(bounds):
+            try:
+                conn[frame] = calculate_connectivity_arrays(
+                    data[..., start:stop], sfreq, [calc_type]
+                )[calc_type]
+            except ValueError:
+                # the window is too short for the calculation, e.g. the last window
+                pass
+        return conn, times
+
+    # Updating the running sums costs two hops of samples per frame instead of a
+    # whole window, so it's only used when windows overlap by more than a hop
+    incremental = 2 * hop < window_size
+
+    # centre the channels so the running sums of the correlation don't lose
+    # precision, the covariance keeps the mean like mne.compute_covariance
+    if calc_type == "covariance":
+        summed = data
+    else:
+        summed = data - data.mean(axis=(0, 2))[np.newaxis, :, np.newaxis]
+
+    def window_sums(start, stop):
+        samples = np.hstack(summed[:, :, start:stop])
+        return samples.sum(axis=1), samples @ samples.T
+
+    n_channels = data.shape[1]
+    conn = np.empty((len(bounds), n_channels, n_channels))
+    start, stop = 0, 0
+
+    for frame, (new_start, new_stop) in enumerate(bounds):
+        if incremental and new_start < stop and new_stop - new_start == window_size:
+            # only add the new samples and remove the ones that left the window
+            entering_sums, entering_cross = window_sums(stop, new_stop)
+            leaving_sums, leaving_cross = window_sums(start, new_start)
+            sums += entering_sums - leaving_sums
+            cross += entering_cross - leaving_cross
+            start, stop = new_start, new_stop
+
+            n_samples = (stop - start) * len(data)
+
+            if calc_type == "covariance":
+                conn[frame] = cross / (n_samples - 1)
+            else:
+                mean = sums / n_samples
+                cov = cross / n_samples - np.outer(mean, mean)
+
+                # constant channels give nan like pandas.DataFrame.corr, variances
+                # that are only left over from the running sums count as constant
+                variance = np.diag(cov).copy()
+                variance[variance <= 1e-10 * np.diag(cross) / n_samples] = 0
+                with np.errstate(divide="ignore", invalid="ignore"):
+                    std = np.sqrt(variance)
+                    conn[frame] = np.clip(cov / np.outer(std, std), -1, 1)
+        else:
+            window = data[:, :, new_start:new_stop]
+            if calc_type == "covariance":
+                # a window of a single sample gives inf like the covariance estimator
+                with np.errstate(divide="ignore", invalid="ignore"):
+                    conn[frame] = covariance_estimator(window)
+            else:
+                # constant channels give nan like pandas.DataFrame.corr
+                with np.errstate(divide="ignore", invalid="ignore"):
+                    conn[frame] = np.corrcoef(np.hstack(window))
+
+            if incremental:
+                sums, cross = window_sums(new_start, new_stop)
+                start, stop = new_start, new_stop
+
+    return conn, times
+
+
+class ConnectivityRenderer:
+    """
+    A persistent 2D connectivity plot for rendering many frames with the same nodes.
+    The nodes, cartoon head, colorbar, title and caption are drawn once and each new
+    frame only updates the connection lines, which are drawn as a single collection.
+
+    Attributes:
+        fig: matplotlib.pyplot.figure
+            The figure containing the plot.
+        ax: matplotlib.axes.Axes
+            The axis containing the nodes and connections.
+        pairs: [(str, str)]
+            The names of every node pair that can be shown.
+        lines: matplotlib.collections.LineCollection
+            The connection lines of the node pairs shown in the current frame.
+        visible: numpy.ndarray
+            Whether each of the pairs is shown in the current frame.
+        cmap: matplotlib.cm.ScalarMappable
+            The colour scale of the connections.
+        colorbar: matplotlib.colorbar.Colorbar or None
+            The colorbar of the plot.
+        caption_text: matplotlib.text.Text or None
+            The caption at the bottom of the plot.
+
+    Methods:
+        update_lines(correlation_df):
+            Updates the connection lines from connectivity values.
+        update(epoch, caption):
+            Draws the connectivity of a new epoch and returns the changed artists.
+        update_connectivity(correlation_df, caption):
+            Draws already calculated connectivity values and returns the changed artists.
+    """
+
+    def __init__(
+        self,
+        epoch,
+        fig=None,
+        locations=None,
+        calc_type="correlation",
+        pair_list=[],
+        threshold=0,
+        show_sphere=True,
+        readjust_sphere="auto",
+        colormap="RdBu_r",
+        vmin=None,
+        vmax=None,
+        line_width=None,
+        title=None,
+        colorbar=True,
+        caption=None,
+        **kwargs
+    ):
+        """
+        Draws the connectivity plot of the first frame.
+
+        Args:
+            See plot_connectivity.
+        """
+        if type(epoch) is not mne.epochs.Epochs and type(epoch) is not mne.evoked.EvokedArray:
+            raise TypeError(
+                "data is not an epoched data, "
+                "please refer to eeg_objects to create an epoched data"
+            )
+
+        if fig is None:
+            fig = plt.figure()
+        self.fig = fig
+
+        self.calc_type = calc_type
+        self.threshold = threshold
+        self.line_width = line_width
+        self.autoscale = vmin is None or vmax is None
+
+        correlation_df = calculate_connectivity(epoch, calc_type)
+
+        self.cmap = plt.cm.ScalarMappable(cmap=colormap)
+
+        if self.autoscale:
+            self.cmap.set_array(correlation_df)
+            self.cmap.autoscale()
+        else:
+            self.cmap.set_clim(vmin, vmax)
+
+        self.ax = fig.add_subplot()
+
+        if locations is None:
+            # the sensor positions plot_sensors draws, projected without a figure
+            names, positions = layout.get_sensor_positions(epoch.info, ignore_overlap=True)
+            node_df = pd.DataFrame({"name": names, "x": positions[:, 0], "y": positions[:, 1]})
+        else:
+            node_df = pd.DataFrame(
+                {
+                    "name": [node.get_text() for node in locations],
+                    "x": [node.get_position()[0] for node in locations],
+                    "y": [node.get_position()[1] for node in locations],
+                }
+            )
+
+        # Every pair that could be shown, the lines below the
+        # threshold are left out of the collection until a frame needs them
+        names = node_df["name"].to_numpy()
+        first, second = np.meshgrid(np.arange(len(names)), np.arange(len(names)), indexing="ij")
+        first, second = first.ravel(), second.ravel()
+        if pair_list:
+            selected = [(name1, name2) in pair_list for name1, name2 in zip(names[first], names[second])]
+            first, second = first[selected], second[selected]
+        self.pairs = list(zip(names[first], names[second]))
+
+        positions = node_df[["x", "y"]].to_numpy()
+        self.segments = np.stack([positions[first], positions[second]], axis=1)
+
+        self.lines = LineCollection(self.segments, zorder=2)
+        self.ax.add_collection(self.lines)
+        self.ax.autoscale_view()
+
+        # The channel order is the same for every frame
+        self.rows = correlation_df.columns.get_indexer(names[first])
+        self.cols = correlation_df.index.get_indexer(names[second])
+
+        self.update_lines(correlation_df)
+
+        # add padding for names
+        epoch = epoch.copy().rename_channels(lambda x: "  "+str(x))
+
+        # Default to no sphere values
+        sphere_vals = None
+
+        # If sphere parameters have not been provided by user...
+        if show_sphere and 'sphere' not in kwargs:
+            # get axis limits
+            ax_lims = get_axis_lims_con(epoch)
+
+            def_sphere = ax_lims[0]*-0.94
+
+            # Attempt to determine whether to readjust sphere or not based
+            # on the limits of the axis
+            if readjust_sphere=="auto":
+                if ax_lims[0] <= -50:
+                    readjust_sphere=True
+                else:
+                    readjust_sphere=False
+
+            # Readjust with Cz node at center if it is present
+            if readjust_sphere:
+                if 'Cz' in node_df['name']:
+                    def_x = node_df[node_df['name'] == 'Cz']['x']
+                    def_y = node_df[node_df['name'] == 'Cz']['y']
+                else:
+                    def_x = node_df['x'].mean()
+                    def_y = node_df['y'].mean()
+            else:
+                def_x = 0.0
+                def_y = 0.0
+
+            sphere_vals = (def_x, def_y, 0.0, def_sphere)
+
+        # combine default settings with user specified settings
+        default_kwargs = {
+            "axes": self.ax,
+            "show_names": True,
+            "kind": "topomap",
+            "sphere": sphere_vals,
+            "show": False
+        }
+
+        if show_sphere==False:
+            default_kwargs.pop('sphere', None)
+
+        kwargs = {**default_kwargs, **kwargs}
+
+        epoch.plot_sensors(**kwargs)
+
+        self.colorbar = None
+        if colorbar:
+            self.colorbar = fig.colorbar(self.cmap)
+
+        if title:
+            plt.title(title)
+
+        self.caption_text = None
+        if caption:
+            if 'ax_lims' not in locals():
+                ax_lims = get_axis_lims_con(epoch)
+            if ax_lims[0] <= -50:
+                self.caption_text = plt.text(
+                    ax_lims[0]*0.45, -ax_lims[1] - ax_lims[1]*0.25, caption, fontsize=10
+                )
+            else:
+                self.caption_text = plt.text(ax_lims[0]*0.45, -ax_lims[1], caption, fontsize=10)
+
+    def update_lines(self, correlation_df):
+        """
+        Updates the colour, width and visibility of the connection lines.
+
+        Args:
+            correlation_df: pandas.core.frame.DataFrame
+                Data frame containing connectivity values
+
+        Returns:
+            [matplotlib.collections.LineCollection]:
+                The connection lines
+        """
+        correlations = correlation_df.to_numpy()[self.rows, self.cols]
+        with np.errstate(invalid="ignore"):
+            self.visible = np.abs(correlations) >= self.threshold
+
+        # use width based on connection measure if no width given
+        if self.line_width:
+            widths = np.full(len(correlations), self.line_width)
+        else:
+            widths = 1.5 + np.log(1 - np.minimum(np.abs(correlations), 0.999))
+
+        self.lines.set_segments(self.segments[self.visible])
+        self.lines.set_color(self.cmap.cmap(correlations[self.visible]))
+        self.lines.set_linewidth(widths[self.visible])
+
+        return [self.lines]
+
+    def update(self, epoch, caption=None):
+        """
+        Draws the connectivity of a new epoch on the plot.
+
+        Args:
+            epoch: mne.epochs.Epochs
+                Epoch to visualize
+            caption: str (optional)
+                The new caption. Defaults to None to keep the current caption.
+
+        Returns:
+            [matplotlib.artist.Artist]:
+                The artists that were changed
+        """
+        return self.update_connectivity(
+            calculate_connectivity(epoch, self.calc_type), caption
+        )
+
+    def update_connectivity(self, correlation_df, caption=None):
+        """
+        Draws already calculated connectivity values on the plot.
+
+        Args:
+            correlation_df: pandas.core.frame.DataFrame
+                Data frame containing connectivity values
+            caption: str (optional)
+                The new caption. Defaults to None to keep the current caption.
+
+        Returns:
+            [matplotlib.artist.Artist]:
+                The artists that were changed
+        """
+        # autoscale() resets the limits to (0, 1) once a colorbar is attached,
+        # so the limits are set from the values directly
+        if self.autoscale and np.isfinite(correlation_df.to_numpy()).any():
+            self.cmap.set_array(correlation_df)
+            self.cmap.set_clim(
+                np.nanmin(correlation_df.to_numpy()),
+                np.nanmax(correlation_df.to_numpy())
+            )
+
+        changed = self.update_lines(correlation_df)
+
+        if self.autoscale and self.colorbar is not None:
+            changed += self.colorbar.ax.get_children()
+
+        if caption and self.caption_text is not None:
+            self.caption_text.set_text(caption)
+            changed.append(self.caption_text)
+
+        return changed
+
+
 def plot_connectivity(
     epoch,
     fig=None,
@@ -199,7 +1100,8 @@ def plot_connectivity(
         fig: matplotlib.pyplot.figure (optional)
             Figure to plot on. Defaults to None.
         locations: [matplotlib.text.Text] (optional)
-            List of node locations. Defaults to None.
+            List of node locations. Defaults to None to project the
+            channel locations of the epoch with layout.get_sensor_positions.
         calc_type: str
             Connectivity calculation type
         pair_list: [str] (optional)
@@ -236,135 +1138,24 @@ def plot_connectivity(
         matplotlib.pyplot.figure:
             The generated connectivity figure
     """
-    if type(epoch) is not mne.epochs.Epochs and type(epoch) is not mne.evoked.EvokedArray:
-        raise TypeError(
-            "data is not an epoched data, "
-            "please refer to eeg_objects to create an epoched data"
-        )
-
-    if locations is None:
-        sensor_locations = epoch.plot_sensors(show_names=True, show=False)
-        locations = sensor_locations.findobj(
-            match=lambda x: type(x) == plt.Text and x.get_text() != ""
-        )
-
-    if fig is None:
-        fig = plt.figure()
-
-    correlation_df = calculate_connectivity(epoch, calc_type)
-
-    cmap = plt.cm.ScalarMappable(cmap=colormap)
-
-    if vmin is None or vmax is None:
-        cmap.set_array(correlation_df)
-        cmap.autoscale()
-    else:
-        cmap.set_clim(vmin, vmax)
-
-    colour_array = cmap.cmap(correlation_df)
-
-    ax = fig.add_subplot()
-
-    node_df = pd.DataFrame(
-        {
-            "name": [node.get_text() for node in locations],
-            "x": [node.get_position()[0] for node in locations],
-            "y": [node.get_position()[1] for node in locations],
-        }
-    )
-
-    x_list = []
-    y_list = []
-    width = line_width
-    for x1, y1, name1 in zip(node_df["x"], node_df["y"], node_df["name"]):
-        for x2, y2, name2 in zip(node_df["x"], node_df["y"], node_df["name"]):
-            if (name1, name2) in pair_list or not pair_list:
-                correlation = correlation_df.loc[name1, name2]
-                if abs(correlation) >= threshold:
-                    row = correlation_df.columns.get_loc(name1)
-                    col = correlation_df.index.get_loc(name2)
-                    x_list = [x1, x2]
-                    y_list = [y1, y2]
-
-                    # use width based on connection measure if no width given
-                    if not line_width:
-                        var_width = math.log(1-min(abs(correlation), 0.999))
-                        width = 1.5 + var_width
-
-                    ax.plot(
-                        x_list,
-                        y_list,
-                        color=colour_array[row, col],
-                        linewidth=width
-                    )
-
-    # add padding for names
-    epoch.copy()
-    epoch = epoch.rename_channels(lambda x: "  "+str(x))
-
-    # Default to no sphere values
-    sphere_vals = None
-
-    # If sphere parameters have not been provided by user...
-    if show_sphere and 'sphere' not in locals():
-        # get axis limits
-        ax_lims = get_axis_lims_con(epoch)
-
-        def_sphere = ax_lims[0]*-0.94
-
-        # Attempt to determine whether to readjust sphere or not based
-        # on the limits of the axis
-        if readjust_sphere=="auto":
-            if ax_lims[0] <= -50:
-                readjust_sphere=True
-            else:
-                readjust_sphere=False
-        
-        # Readjust with Cz node at center if it is present
-        if readjust_sphere:
-            if 'Cz' in node_df['name']:
-                def_x = node_df[node_df['name'] == 'Cz']['x']
-                def_y = node_df[node_df['name'] == 'Cz']['y']
-            else:
-                def_x = node_df['x'].mean()
-                def_y = node_df['y'].mean()
-        else:
-            def_x = 0.0
-            def_y = 0.0
-        
-        sphere_vals = (def_x, def_y, 0.0, def_sphere)
-
-    # combine default settings with user specified settings
-    default_kwargs = {
-        "axes": ax,
-        "show_names": True,
-        "kind": "topomap",
-        "sphere": sphere_vals,
-        "show": False
-    }
-
-    if show_sphere==False:
-        default_kwargs.pop('sphere', None)
-
-    kwargs = {**default_kwargs, **kwargs}
-
-    epoch.plot_sensors(**kwargs)
-
-    if colorbar:
-        fig.colorbar(cmap)
-
-    if title:
-        plt.title(title)
-
-    if caption:
-        if 'ax_lims' not in locals():
-            ax_lims = get_axis_lims_con(epoch)
-        if ax_lims[0] <= -50:
-            plt.text(ax_lims[0]*0.45, -ax_lims[1] - ax_lims[1]*0.25, caption, fontsize=10)
-        else:
-            plt.text(ax_lims[0]*0.45, -ax_lims[1], caption, fontsize=10)
-
-    return fig
+    return ConnectivityRenderer(
+        epoch,
+        fig,
+        locations,
+        calc_type,
+        pair_list=pair_list,
+        threshold=threshold,
+        show_sphere=show_sphere,
+        readjust_sphere=readjust_sphere,
+        colormap=colormap,
+        vmin=vmin,
+        vmax=vmax,
+        line_width=line_width,
+        title=title,
+        colorbar=colorbar,
+        caption=caption,
+        **kwargs
+    ).fig
 
 
 def animate_connectivity(
@@ -382,6 +1173,7 @@ def animate_connectivity(
     colorbar=True,
     timestamp=True,
     frame_rate=12.0,
+    window_size=None,
     **kwargs
 ):
     """
@@ -418,6 +1210,10 @@ def animate_connectivity(
             Whether to show the timestamp caption. Defaults to True.
         frame_rate: int or float (optional)
             The frame rate to genearte the final animation with. Defaults to 12.0.
+        window_size: int (optional)
+            Number of samples in each frame's connectivity calculation, frames start
+            every steps samples. Defaults to None for steps + 1 so consecutive
+            frames only share their edge sample.
         **kwargs: dict (optional)
             Optional arguments to pass to mne.viz.plot_sensors()
 
@@ -440,25 +1236,17 @@ def animate_connectivity(
                 please pass an int or float instead"""
             )
 
-    sensor_locations = epoch.plot_sensors(show_names=True, show=False)
-    locations = sensor_locations.findobj(
-        match=lambda x: type(x) == plt.Text and x.get_text() != ""
-    )
-
     pair_list = convert_pairs(pair_list)
-    num_steps = math.ceil(len(epoch.times)/steps)
     ms_between_frames = 1000 / frame_rate
 
-    fig = plt.figure()
-
-    def animate(frame_number):
-        fig.clear()
-
-        frame_epoch = get_frame(epoch, steps, frame_number)
+    if window_size is None:
+        window_size = steps + 1
 
-        start_time = frame_epoch.tmin
-        end_time = frame_epoch.tmax
+    # The connectivity of every frame is calculated in one pass
+    conn, frame_times = calculate_windowed_connectivity(epoch, calc_type, window_size, steps)
+    num_steps = len(conn)
 
+    def get_caption(start_time, end_time):
         caption = None
         if timestamp is True:
             start_space=''
@@ -469,26 +1257,33 @@ def animate_connectivity(
                 end_space=' '
 
             caption = f"time: {start_space}{'%.3f' % start_time}s to {end_space}{'%.3f' % end_time}s"
+        return caption
+
+    # The nodes, head, colorbar and caption are drawn once, each
+    # frame only updates the connection lines and the caption text
+    renderer = ConnectivityRenderer(
+        epoch.copy().crop(*frame_times[0], include_tmax=True),
+        plt.figure(),
+        None,
+        calc_type,
+        pair_list=pair_list,
+        threshold=threshold,
+        show_sphere=show_sphere,
+        colormap=colormap,
+        vmin=vmin,
+        vmax=vmax,
+        line_width=line_width,
+        title=title,
+        colorbar=colorbar,
+        caption=get_caption(*frame_times[0]),
+        **kwargs
+    )
+    fig = renderer.fig
+
+    def animate(frame_number):
+        conn_df = pd.DataFrame(conn[frame_number], index=epoch.ch_names, columns=epoch.ch_names)
+        return renderer.update_connectivity(conn_df, get_caption(*frame_times[frame_number]))
 
-        return [
-            plot_connectivity(
-                frame_epoch,
-                fig,
-                locations,
-                calc_type,
-                pair_list=pair_list,
-                threshold=threshold,
-                show_sphere=show_sphere,
-                colormap=colormap,
-                vmin=vmin,
-                vmax=vmax,
-                line_width=line_width,
-                title=title,
-                colorbar=colorbar,
-                caption=caption,
-                **kwargs
-            )
-        ]
     anim = animation.FuncAnimation(
         fig,
         animate,
@@ -608,6 +1403,273 @@ def plot_conn_circle(
     return fig
 
 
+def get_conn_circle_paths(conn, node_angles, n_lines=None, node_width=None, vmin=None, vmax=None):
+    """
+    Calculate the connection curves of a connectivity circle the same way as
+    mne.viz.plot_connectivity_circle. Helper function for ConnectivityCircleRenderer.
+
+    Args:
+        conn: numpy.ndarray
+            Square connectivity matrix
+        node_angles: numpy.ndarray
+            Angle of each node in degrees
+        n_lines: int (optional)
+            Maximum connections to draw. Defaults to None for all connections.
+        node_width: float (optional)
+            Width of each node in degrees. Defaults to None for the minimum
+            angle between two nodes.
+        vmin: float (optional)
+            The minimum for the scale. Defaults to None.
+        vmax: float (optional)
+            The maximum for the scale. Defaults to None.
+
+    Returns:
+        [matplotlib.path.Path]:
+            The connection curves ordered from the weakest to the strongest connection
+        numpy.ndarray:
+            The connection values scaled between vmin (0) and vmax (1)
+    """
+    node_angles = np.asarray(node_angles) * np.pi / 180
+    n_nodes = len(node_angles)
+
+    if node_width is None:
+        # widths correspond to the minimum angle between two nodes
+        dist_mat = node_angles[None, :] - node_angles[:, None]
+        dist_mat[np.diag_indices(n_nodes)] = 1e9
+        node_width = np.min(np.abs(dist_mat))
+    else:
+        node_width = node_width * np.pi / 180
+
+    # use the lower-triangular part, without connections that could not be calculated
+    indices = np.tril_indices(n_nodes, -1)
+    con = conn[indices]
+    finite = np.isfinite(con)
+    con = con[finite]
+    indices = [ind[finite] for ind in indices]
+
+    # only draw the strongest connections
+    if n_lines is not None and len(con) > n_lines:
+        con_thresh = np.sort(np.abs(con).ravel())[-n_lines]
+    else:
+        con_thresh = 0.
+
+    # sort by connection strength so the strongest are drawn last
+    con_abs = np.abs(con)
+    con_draw_idx = np.where(con_abs >= con_thresh)[0]
+    con = con[con_draw_idx]
+    con_abs = con_abs[con_draw_idx]
+    indices = [ind[con_draw_idx] for ind in indices]
+
+    sort_idx = np.argsort(con_abs)
+    con = con[sort_idx]
+    indices = [ind[sort_idx] for ind in indices]
+
+    if len(con) == 0:
+        return [], np.array([])
+
+    if vmin is None:
+        vmin = np.min(con[np.abs(con) >= con_thresh])
+    if vmax is None:
+        vmax = np.max(con)
+
+    # Move the start and end of the strongest connections closer to the node centre
+    nodes_n_con = np.zeros((n_nodes), dtype=np.int64)
+    for i, j in zip(indices[0], indices[1]):
+        nodes_n_con[i] += 1
+        nodes_n_con[j] += 1
+
+    # same seed as mne so the curves are identical
+    rng = np.random.mtrand.RandomState(0)
+
+    n_con = len(indices[0])
+    noise_max = 0.25 * node_width
+    start_noise = rng.uniform(-noise_max, noise_max, n_con)
+    end_noise = rng.uniform(-noise_max, noise_max, n_con)
+
+    nodes_n_con_seen = np.zeros_like(nodes_n_con)
+    for i, (start, end) in enumerate(zip(indices[0], indices[1])):
+        nodes_n_con_seen[start] += 1
+        nodes_n_con_seen[end] += 1
+
+        start_noise[i] *= ((nodes_n_con[start] - nodes_n_con_seen[start]) /
+                           float(nodes_n_con[start]))
+        end_noise[i] *= ((nodes_n_con[end] - nodes_n_con_seen[end]) /
+                         float(nodes_n_con[end]))
+
+    codes = [Path.MOVETO, Path.CURVE4, Path.CURVE4, Path.LINETO]
+    paths = []
+    for pos, (i, j) in enumerate(zip(indices[0], indices[1])):
+        t0 = node_angles[i] + start_noise[pos]
+        t1 = node_angles[j] + end_noise[pos]
+        paths.append(Path([(t0, 10), (t0, 5), (t1, 5), (t1, 10)], codes))
+
+    return paths, (con - vmin) / (vmax - vmin)
+
+
+class ConnectivityCircleRenderer:
+    """
+    A persistent connectivity circle for rendering many frames with the same nodes.
+    The node ring, labels, title, colorbar and caption are drawn once and each new
+    frame only updates the curve, colour and visibility of a fixed set of connections.
+
+    Attributes:
+        fig: matplotlib.pyplot.figure
+            The figure containing the plot.
+        ax: matplotlib.projections.polar.PolarAxes
+            The axis containing the connectivity circle.
+        lines: [matplotlib.patches.PathPatch]
+            One connection curve for every node pair, unused curves are hidden.
+        caption_text: matplotlib.text.Text or None
+            The caption at the bottom of the plot.
+
+    Methods:
+        update(epoch, caption):
+            Draws the connectivity of a new epoch and returns the changed artists.
+        update_connectivity(conn_df, caption):
+            Draws already calculated connectivity values and returns the changed artists.
+    """
+
+    def __init__(
+        self,
+        epoch,
+        fig=None,
+        calc_type="correlation",
+        max_connections=50,
+        ch_names=[],
+        colormap="RdBu_r",
+        vmin=None,
+        vmax=None,
+        line_width=1.5,
+        title=None,
+        colorbar=True,
+        caption=None,
+        **kwargs
+    ):
+        """
+        Draws the connectivity circle of the first frame.
+
+        Args:
+            See plot_conn_circle.
+        """
+        if not ch_names:
+            ch_names = epoch.ch_names
+
+        self.fig = plot_conn_circle(
+            epoch,
+            fig,
+            calc_type=calc_type,
+            max_connections=max_connections,
+            ch_names=ch_names,
+            colormap=colormap,
+            vmin=vmin,
+            vmax=vmax,
+            line_width=line_width,
+            title=title,
+            colorbar=colorbar,
+            caption=caption,
+            **kwargs
+        )
+        self.ax = self.fig.axes[0]
+
+        self.calc_type = calc_type
+        self.ch_names = ch_names
+        self.colormap = plt.get_cmap(colormap)
+        self.vmin = vmin
+        self.vmax = vmax
+        self.n_lines = kwargs.get("n_lines", max_connections)
+        self.node_width = kwargs.get("node_width", None)
+        self.node_angles = kwargs.get(
+            "node_angles",
+            mne.viz.circular_layout(ch_names, ch_names, start_pos=90)
+        )
+
+        # Move the caption from the figure to the axis, figure level
+        # artists can not be redrawn on their own
+        self.caption_text = None
+        if caption:
+            self.fig.texts[-1].remove()
+            self.caption_text = self.ax.text(
+                0.33, 0.1, caption, fontsize=10, transform=self.fig.transFigure
+            )
+
+        # Reuse the curves mne drew and add hidden ones until every pair has one,
+        # all below the node ring like the original curves
+        self.lines = [
+            patch for patch in self.ax.patches if isinstance(patch, PathPatch)
+        ]
+        n_pairs = len(ch_names) * (len(ch_names) - 1) // 2
+        while len(self.lines) < n_pairs:
+            patch = PathPatch(
+                Path([(0, 10), (0, 10)]),
+                fill=False,
+                linewidth=kwargs.get("linewidth", line_width),
+                alpha=1.,
+                visible=False
+            )
+            self.ax.add_patch(patch)
+            self.lines.append(patch)
+        for patch in self.lines:
+            patch.set_zorder(0.9)
+
+    def update(self, epoch, caption=None):
+        """
+        Draws the connectivity of a new epoch on the circle.
+
+        Args:
+            epoch: mne.epochs.Epochs
+                Epoch to visualize
+            caption: str (optional)
+                The new caption. Defaults to None to keep the current caption.
+
+        Returns:
+            [matplotlib.artist.Artist]:
+                The artists that were changed
+        """
+        return self.update_connectivity(
+            calculate_connectivity(epoch, calc_type=self.calc_type), caption
+        )
+
+    def update_connectivity(self, conn_df, caption=None):
+        """
+        Draws already calculated connectivity values on the circle.
+
+        Args:
+            conn_df: pandas.core.frame.DataFrame
+                Data frame containing connectivity values
+            caption: str (optional)
+                The new caption. Defaults to None to keep the current caption.
+
+        Returns:
+            [matplotlib.artist.Artist]:
+                The artists that were changed
+        """
+        conn = conn_df.loc[self.ch_names, self.ch_names].to_numpy()
+
+        paths, con_val_scaled = get_conn_circle_paths(
+            conn,
+            self.node_angles,
+            self.n_lines,
+            self.node_width,
+            self.vmin,
+            self.vmax
+        )
+
+        for patch, path, value in zip(self.lines, paths, con_val_scaled):
+            patch.set_path(path)
+            patch.set_edgecolor(self.colormap(value))
+            patch.set_visible(True)
+        for patch in self.lines[len(paths):]:
+            patch.set_visible(False)
+
+        changed = list(self.lines)
+
+        if caption and self.caption_text is not None:
+            self.caption_text.set_text(caption)
+            changed.append(self.caption_text)
+
+        return changed
+
+
 def animate_connectivity_circle(
     epoch,
     calc_type="correlation",
@@ -621,6 +1683,7 @@ def animate_connectivity_circle(
     colorbar=True,
     timestamp=True,
     frame_rate = 12.0,
+    window_size=None,
     **kwargs
 ):
     """
@@ -651,6 +1714,10 @@ def animate_connectivity_circle(
             Whether to display the timestamp caption. Defaults to True.
         frame_rate: int or float (optional)
             The frame rate to genearte the final animation with. Defaults to 12.0.
+        window_size: int (optional)
+            Number of samples in each frame's connectivity calculation, frames start
+            every steps samples. Defaults to None for steps + 1 so consecutive
+            frames only share their edge sample.
         **kwargs: dict (optional)
             Optional arguments to pass to mne.viz.plot_connectivity_circle()
 
@@ -675,9 +1742,12 @@ def animate_connectivity_circle(
     
     ms_between_frames = 1000 / frame_rate
 
-    fig = plt.figure()
+    if window_size is None:
+        window_size = steps + 1
 
-    num_steps = math.ceil(len(epoch.times)/steps)
+    # The connectivity of every frame is calculated in one pass
+    conn, frame_times = calculate_windowed_connectivity(epoch, calc_type, window_size, steps)
+    num_steps = len(conn)
 
     # combine default settings with user specified settings
     default_kwargs = {
@@ -691,27 +1761,26 @@ def animate_connectivity_circle(
     }
     kwargs = {**default_kwargs, **kwargs}
 
-    def animate(frame_number):
-        fig.clear()
-
-        frame_epoch = get_frame(epoch, steps, frame_number)
-
-        start_time = frame_epoch.tmin
-        end_time = frame_epoch.tmax
-
+    def get_caption(start_time, end_time):
         caption = None
         if timestamp is True:
             caption = f"time: {'%.3f' % start_time}s to {'%.3f' % end_time}s"
+        return caption
+
+    # The node ring, labels, colorbar and caption are drawn once, each
+    # frame only updates the connection curves and the caption text
+    renderer = ConnectivityCircleRenderer(
+        epoch.copy().crop(*frame_times[0], include_tmax=True),
+        plt.figure(),
+        colorbar=colorbar,
+        caption=get_caption(*frame_times[0]),
+        **kwargs
+    )
+    fig = renderer.fig
 
-        return [
-            plot_conn_circle(
-                frame_epoch,
-                fig,
-                colorbar=colorbar,
-                caption=caption,
-                **kwargs
-            )
-        ]
+    def animate(frame_number):
+        conn_df = pd.DataFrame(conn[frame_number], index=epoch.ch_names, columns=epoch.ch_names)
+        return renderer.update_connectivity(conn_df, get_caption(*frame_times[frame_number]))
 
     anim = animation.FuncAnimation(
         fig,
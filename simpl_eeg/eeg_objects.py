@@ -7,11 +7,16 @@ Module for creating custom epoch objects
 import mne
 import scipy.io
 import warnings
+import os
+import hashlib
+import pickle
 from os import listdir, walk
 from os.path import isfile, join
 import numpy as np
 import re
 import numbers
+from collections import OrderedDict
+from simpl_eeg import montages
 
 
 def load_montage(raw, montage='auto'):
@@ -57,8 +62,8 @@ def load_montage(raw, montage='auto'):
 
     if load_montage:
         try:
-            mne.channels.make_standard_montage(montage)
-            raw.set_montage(montage, verbose=False)
+            # the standard montage is only read once per process
+            raw.set_montage(montages.get_montage(montage), verbose=False)
             montage_source = montage
         except:
             warnings.warn(
@@ -428,6 +433,164 @@ def load_file_EEG(data_path, folder_path, events_file, montage):
     return raw, events, montage_source, events_source
 
 
+class CachedRaw(mne.io.BaseRaw):
+    """
+    Raw EEG data backed by a memory-mapped sample matrix from the raw cache.
+    Only the time ranges that are accessed are read from disk.
+    """
+
+    def __init__(self, data, info, first_samp=0):
+        """
+        Parameters:
+            data: numpy.memmap
+                Memory-mapped float64 array of shape (n_channels, n_samples).
+            info: mne.Info
+                Measurement info for the data.
+            first_samp: int (optional)
+                First sample offset of the original recording. Defaults to 0.
+        """
+        # mne.io.RawArray scans the whole array for complex values which
+        # would page in the full file, so pass the memmap straight through
+        super().__init__(
+            info,
+            preload=data,
+            first_samps=(int(first_samp),),
+            verbose=False
+        )
+
+
+def get_raw_cache_key(data_path, folder_path, events_file, montage):
+    """
+    Helper function for __init__ in EEG_File class that builds the raw cache
+    key. The key is a hash of the loading options and the path, size and
+    modification time of the primary data file, any companion files sharing
+    its name (e.g. .fdt, .eeg, .vmrk) and any .mat events files in the folder.
+
+    Returns:
+        str:
+            Hexadecimal cache key
+    """
+    stem = os.path.splitext(os.path.basename(data_path))[0]
+    fingerprint = [events_file, montage]
+
+    for f in sorted(listdir(folder_path)):
+        if f.startswith(stem + ".") or f.endswith(".mat"):
+            file_path = os.path.abspath(join(folder_path, f))
+            file_stat = os.stat(file_path)
+            fingerprint.append((file_path, file_stat.st_size, file_stat.st_mtime_ns))
+
+    return hashlib.sha1(repr(fingerprint).encode("utf-8")).hexdigest()
+
+
+def load_raw_cache(cache_dir, cache_key):
+    """
+    Helper function for __init__ in EEG_File class that opens a raw cache
+    entry. The sample matrix is memory-mapped (copy-on-write, so in-place
+    changes never reach the cache) rather than read into memory.
+    Returns None if no complete cache entry exists.
+    """
+    data_path = join(cache_dir, cache_key + ".npy")
+    info_path = join(cache_dir, cache_key + "-info.pickle")
+
+    if not (isfile(data_path) and isfile(info_path)):
+        return None
+
+    with open(info_path, "rb") as handle:
+        cached = pickle.load(handle)
+
+    raw = CachedRaw(
+        np.load(data_path, mmap_mode="c"),
+        cached["info"],
+        first_samp=cached["first_samp"]
+    )
+    raw.set_annotations(cached["annotations"])
+    print("loaded raw from cache " + data_path)
+
+    return raw, cached["events"], cached["montage_source"], cached["events_source"]
+
+
+def save_raw_cache(cache_dir, cache_key, raw, events, montage_source, events_source,
+                   chunk_size=1000000):
+    """
+    Helper function for __init__ in EEG_File class that writes a raw cache
+    entry. The sample matrix is written to a .npy file in chunks and the
+    info, events, montage and annotations to a small pickle file. Files are
+    written under temporary names and renamed once complete so readers never
+    see partial entries.
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    data_path = join(cache_dir, cache_key + ".npy")
+    info_path = join(cache_dir, cache_key + "-info.pickle")
+    tmp_suffix = ".{}.tmp".format(os.getpid())
+
+    n_times = raw.n_times
+    data = np.lib.format.open_memmap(
+        data_path + tmp_suffix,
+        mode="w+",
+        dtype=np.float64,
+        shape=(len(raw.ch_names), n_times)
+    )
+    for start in range(0, n_times, chunk_size):
+        stop = min(start + chunk_size, n_times)
+        data[:, start:stop] = raw.get_data(start=start, stop=stop)
+    data.flush()
+    del data
+    os.replace(data_path + tmp_suffix, data_path)
+
+    with open(info_path + tmp_suffix, "wb") as handle:
+        pickle.dump(
+            {
+                "info": raw.info,
+                "first_samp": raw.first_samp,
+                "annotations": raw.annotations,
+                "events": events,
+                "montage_source": montage_source,
+                "events_source": events_source
+            },
+            handle,
+            protocol=pickle.HIGHEST_PROTOCOL
+        )
+    os.replace(info_path + tmp_suffix, info_path)
+
+
+def rolling_average(data, num_steps, offset=0, decim=1):
+    """
+    Helper function for average_n_steps in Epochs class. Calculates a centred
+    moving average along the last axis of an array (e.g. channels x samples or
+    epochs x channels x samples) using cumulative sums, so every channel and
+    epoch is handled in one pass. Windows are truncated at the edges of the
+    data. Only the samples that are kept after decimation (offset::decim) are
+    calculated.
+
+    Parameters:
+        data: numpy.ndarray
+            Array of EEG data with time as the last axis.
+        num_steps: int
+            The number of time steps to average. Each output sample is the mean
+            of the num_steps//2 samples either side of it (and itself).
+        offset: int (optional)
+            Index of the first sample to keep. Defaults to 0.
+        decim: int (optional)
+            Only every decim-th sample from offset onwards is calculated.
+            Defaults to 1.
+
+    Returns:
+        numpy.ndarray:
+            The averaged data with shape data.shape[:-1] + (n_kept_samples,)
+    """
+    data = np.asarray(data)
+    n_times = data.shape[-1]
+    half_window = num_steps // 2
+
+    # cumulative sum with a leading zero so window sums are two lookups
+    cumsum = np.zeros(data.shape[:-1] + (n_times + 1,), dtype=np.result_type(data, float))
+    np.cumsum(data, axis=-1, out=cumsum[..., 1:])
+
+    centres = np.arange(offset, n_times, decim)
+    starts = np.maximum(centres - half_window, 0)
+    ends = np.minimum(centres + half_window + 1, n_times)
+
+    return (cumsum[..., ends] - cumsum[..., starts]) / (ends - starts)
 
 
 class EEG_File:
@@ -449,7 +612,8 @@ class EEG_File:
                  folder_path,
                  file_name='auto',
                  events_file='auto',
-                 montage='auto'):
+                 montage='auto',
+                 cache_dir=None):
         """
         Imports and stores EEG data files. Can be used to attach events data from
         an external file if none exists in the primary data. Can be used to load
@@ -489,6 +653,13 @@ class EEG_File:
                 https://mne.tools/dev/generated/mne.channels.make_standard_montage.html
                 None can be passed if you do not want to load a montage.
                 Defaults to 'auto'.
+            cache_dir: str or None (optional)
+                Directory for the raw cache. If provided, the decoded data is written
+                to a .npy file in this directory (alongside a small file holding the
+                info, events and montage) the first time a file is loaded. Later loads
+                of the same unchanged file with the same options memory-map the cached
+                data instead of decoding the source file, so only the time ranges that
+                are used are read from disk. Defaults to None for no caching.
         """
 
         self.folder_path = folder_path
@@ -529,8 +700,18 @@ class EEG_File:
                             file_source = f
                             break
 
+        # Check for a cached copy of the decoded file
+        cache_key = None
+        cached = None
+        if cache_dir is not None and data_file_type is not None:
+            cache_key = get_raw_cache_key(data_path, folder_path, events_file, montage)
+            cached = load_raw_cache(cache_dir, cache_key)
+
         # Finally, load files and events based on file type
-        if data_file_type == '.set':
+        if cached is not None:
+            raw, events, montage_source, events_source = cached
+
+        elif data_file_type == '.set':
             raw, events, montage_source, events_source = load_file_set(
                 data_path,
                 folder_path,
@@ -603,6 +784,9 @@ class EEG_File:
                 valid EEG data file type {}.""".format(file_types)
             )
         
+        if cache_key is not None and cached is None and raw is not None:
+            save_raw_cache(cache_dir, cache_key, raw, events, montage_source, events_source)
+
         #Abandoned feature to set reference since data needs to be pre-loaded for it
         # if raw and ref_channels:
         #     raw.set_eeg_reference(ref_channels=ref_channels)
@@ -624,12 +808,18 @@ class Epochs:
             the generated epoch data
         epoch: mne.Epochs
             the selected epoch of interest
+        lazy: bool
+            whether epoch data is only loaded when an epoch is selected
+        epoch_cache: collections.OrderedDict
+            recently used epochs (and the evoked average), most recent last
 
     Methods:
         generate_epochs(duration, start_second):
             Calculates epochs based on a duration and start second.
         get_epoch(epoch_num):
             Set and return the epoch of interest.
+        load_epoch(epoch_num):
+            Load an epoch through the cache of recently used epochs.
         skip_n_steps(num_steps):
             Returns a subset of the epoch by skipping records in increments of num_steps.
     """
@@ -643,6 +833,9 @@ class Epochs:
         file_name='auto',
         events_file='auto',
         montage='auto',
+        cache_dir=None,
+        lazy=False,
+        epoch_cache_size=8,
         **kwargs
     ):
         """
@@ -689,6 +882,16 @@ class Epochs:
                 https://mne.tools/dev/generated/mne.channels.make_standard_montage.html
                 None can be passed if you do not want to load a montage.
                 Defaults to 'auto'.
+            cache_dir: str or None (optional)
+                Directory for the raw cache used when loading the data file. See
+                EEG_File for details. Defaults to None for no caching.
+            lazy: bool (optional)
+                If True only the event index is built up front and the data for each
+                epoch is loaded from the raw data when it is selected with get_epoch.
+                Useful for long recordings with many events. Defaults to False.
+            epoch_cache_size: int (optional)
+                The number of recently selected epochs (including the 'evoked'
+                average) to keep loaded. Defaults to 8.
             **kwargs: dict (optional)
                 Additional parameters to pass to the mne.Epochs() constructor.
 
@@ -703,7 +906,11 @@ class Epochs:
             file_name=file_name,
             events_file=events_file,
             montage=montage,
+            cache_dir=cache_dir,
         )
+        self.lazy = lazy
+        self.epoch_cache_size = epoch_cache_size
+        self.epoch_cache = OrderedDict()
         self.all_epochs = self.generate_epochs(tmin, tmax, start_second, **kwargs)
 
         # set first epoch to be the default selection
@@ -758,7 +965,7 @@ class Epochs:
             "event_id": {str(i[2])+" seconds": i[2] for i in events},
             "tmin": tmin,
             "tmax": tmax,
-            "preload": True
+            "preload": not self.lazy
         }
         kwargs = {**default_kwargs, **kwargs}
 
@@ -786,20 +993,52 @@ class Epochs:
             mne.Epoch:
                 The epoch of interest
         """
-        if epoch_num == 'evoked':
-            self.epoch = self.all_epochs[:].average()
-
-        elif epoch_num > len(self.all_epochs):
+        # use the event index since the length of lazy epochs is not known
+        # until bad epochs are dropped
+        if epoch_num != 'evoked' and epoch_num > len(self.all_epochs.events):
             raise Exception(
                 "Invalid selection, "
-                "epoch_num must be between 0 and "+str(len(self.all_epochs))
+                "epoch_num must be between 0 and "+str(len(self.all_epochs.events))
             )
 
-        else:
-            self.epoch = self.all_epochs[epoch_num]
+        self.epoch = self.load_epoch(epoch_num)
 
         return self.epoch
 
+    def load_epoch(self, epoch_num):
+        """
+        Helper function for get_epoch. Loads the nth epoch (or the 'evoked'
+        average of all epochs) through a least recently used cache so that
+        re-selecting an epoch does not read it from the raw data again.
+
+        Parameters:
+            epoch_num: int or 'evoked'
+                The epoch to load
+
+        Returns:
+            mne.Epochs or mne.Evoked:
+                A copy of the loaded epoch, so the cached data is never modified
+        """
+        if epoch_num in self.epoch_cache:
+            self.epoch_cache.move_to_end(epoch_num)
+            return self.epoch_cache[epoch_num].copy()
+
+        if epoch_num == 'evoked':
+            # averages one epoch at a time if the epochs are not preloaded
+            loaded = self.all_epochs[:].average()
+        else:
+            loaded = self.all_epochs[epoch_num]
+            if not loaded.preload:
+                loaded.load_data()
+
+        if self.epoch_cache_size > 0:
+            self.epoch_cache[epoch_num] = loaded
+            if len(self.epoch_cache) > self.epoch_cache_size:
+                self.epoch_cache.popitem(last=False)
+            loaded = loaded.copy()
+
+        return loaded
+
     def skip_n_steps(self, num_steps, use_single=True):
         """
         Return new epoch containing every nth frame
@@ -822,7 +1061,7 @@ class Epochs:
             epochs = self.all_epochs
         return epochs.copy().decimate(num_steps)
 
-    def average_n_steps(self, num_steps):
+    def average_n_steps(self, num_steps, use_single=True):
         """
         Return new epoch containing every nth frame for the selected epoch
         Averages steps bewteen frames
@@ -830,27 +1069,47 @@ class Epochs:
         Parameters:
             num_steps: int
                 The number of time steps to average
+            use_single: bool (optional)
+                Whether to apply the averaging to all epochs or the
+                current selected epoch only. Defaults to True.
 
         Returns:
-            mne.Evoked:
-                The reduced size epoch in evoked format
+            mne.Evoked or mne.EpochsArray:
+                The reduced size epoch in evoked format, or all of the
+                reduced size epochs if use_single is False
         """
-        # calculate rolling average one step at a time
-        def roll_average(x):
-            epoch = x[0]
-            arr = epoch*0.0
-
-            for channel in range(epoch.shape[0]):
-                for row in range(epoch.shape[1]):
-                    arr[channel, row] = epoch[
-                        channel,
-                        max(row-num_steps//2,0):min(row+num_steps//2+1,epoch.shape[1])
-                        ].mean()
-            return arr
-
-        # only use every nth average
-        epochs = self.epoch
-        evoked = epochs.copy().average(method=roll_average).decimate(num_steps)
+        if not use_single:
+            epochs = self.all_epochs
+            sfreq = epochs.info["sfreq"]
+
+            # keep the same samples mne.Epochs.decimate would keep
+            offset = int(round(-epochs.times[0] * sfreq)) % num_steps
+            info = epochs.info.copy()
+            info["sfreq"] = sfreq / num_steps
+
+            return mne.EpochsArray(
+                rolling_average(epochs.get_data(), num_steps, offset, num_steps),
+                info,
+                events=epochs.events,
+                tmin=epochs.times[offset],
+                event_id=epochs.event_id,
+                verbose=False
+            )
+
+        if isinstance(self.epoch, mne.Evoked):
+            evoked = self.epoch.copy()
+        else:
+            # the selected epoch only contains one event
+            evoked = self.epoch.average(method=lambda data: data[0])
+
+        full_data = evoked.data
+        full_times = evoked.times
+        sfreq = evoked.info["sfreq"]
+
+        # only use every nth average, decimate handles times and sfreq
+        evoked.decimate(num_steps)
+        offset = int(round((evoked.times[0] - full_times[0]) * sfreq))
+        evoked.data = rolling_average(full_data, num_steps, offset, num_steps)
 
         # give evoked data the get_data attribute
         # so it can be used in same way as epochs
@@ -0,0 +1,360 @@
+# -*- coding: utf-8 -*-
+
+"""
+Module for rendering animations to video and gif files
+"""
+
+import math
+import multiprocessing
+import os
+
+import imageio_ffmpeg
+import matplotlib
+import matplotlib.pyplot as plt
+import numpy as np
+from matplotlib import cbook
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+# ffmpeg settings for each supported output format
+FORMAT_SETTINGS = {
+    "mp4": {
+        "codec": "libx264",
+        "pix_fmt_out": "yuv420p",
+        "macro_block_size": 2,
+        "output_params": []
+    },
+    "webm": {
+        "codec": "libvpx-vp9",
+        "pix_fmt_out": "yuv420p",
+        "macro_block_size": 2,
+        "output_params": []
+    },
+    "gif": {
+        "codec": "gif",
+        "pix_fmt_out": "pal8",
+        "macro_block_size": 1,
+        "output_params": [
+            "-filter_complex", "split[a][b];[a]palettegen[p];[b][p]paletteuse",
+            "-loop", "0"
+        ]
+    }
+}
+
+# The animation of the current worker process, created once by init_render_worker
+WORKER_STATE = {}
+
+
+def render_figure(fig):
+    """
+    Draw a matplotlib figure into its Agg canvas and get the pixels. The canvas keeps
+    its renderer between calls, so no buffer is allocated per frame and the returned
+    array is a view of the renderer's buffer rather than a copy. It is overwritten by
+    the next draw, so copy it to keep it.
+
+    Args:
+        fig: matplotlib.pyplot.figure
+            Figure to render
+
+    Returns:
+        numpy.ndarray:
+            Array of shape (height, width, 4) with the RGBA pixels of the figure
+    """
+    canvas = fig.canvas
+    if not isinstance(canvas, FigureCanvasAgg):
+        canvas = FigureCanvasAgg(fig)
+
+    # drawing as if saving also draws the animated (blitted) artists
+    with cbook._setattr_cm(canvas, _is_saving=True):
+        canvas.draw()
+    return np.asarray(canvas.buffer_rgba())
+
+
+def figure_to_array(fig):
+    """
+    Render a matplotlib figure to an RGB array. The array is a view of the
+    figure's reused Agg buffer, see render_figure.
+
+    Args:
+        fig: matplotlib.pyplot.figure
+            Figure to render
+
+    Returns:
+        numpy.ndarray:
+            Array of shape (height, width, 3) with the pixels of the figure
+    """
+    return render_figure(fig)[:, :, :3]
+
+
+def iter_frames(animation):
+    """
+    Render every frame of an animation headless. Each frame is a view of the reused
+    Agg buffer (see render_figure) which is only valid until the next frame is
+    rendered, so frames can be sent straight to an encoder without any copies.
+
+    Args:
+        animation: matplotlib.animation.FuncAnimation
+            Animation to render
+
+    Yields:
+        numpy.ndarray:
+            Array of shape (height, width, 4) with the RGBA pixels of each frame
+    """
+    for frame in animation.new_saved_frame_seq():
+        animation._draw_frame(frame)
+        yield render_figure(animation._fig)
+
+
+class FrameWriter:
+    """
+    A class to stream frames to a mp4, webm or gif file through a single ffmpeg
+    process, so the frames of an animation never need to be held in memory
+
+    Attributes:
+        path: str
+            Path of the file to save
+        format: str
+            One of "mp4", "webm" or "gif"
+        frame_rate: int or float
+            The frame rate of the file
+        writer: generator or None
+            The imageio_ffmpeg writer, started with the first frame
+
+    Methods:
+        write(image):
+            Writes the next frame.
+        close():
+            Finishes the file.
+    """
+
+    def __init__(self, path, format=None, frame_rate=12):
+        """
+        Checks the output settings, the file is only opened with the first frame.
+
+        Args:
+            path: str
+                Path of the file to save
+            format: str (optional)
+                One of "mp4", "webm" or "gif". Defaults to None to use the extension of the path.
+            frame_rate: int or float (optional)
+                The frame rate of the file. Defaults to 12.
+        """
+        if format is None:
+            format = os.path.splitext(path)[1].lstrip(".").lower()
+
+        if format not in FORMAT_SETTINGS:
+            raise ValueError(
+                "Invalid format, format can only be one of "
+                "mp4, "
+                "webm, or "
+                "gif"
+            )
+
+        if type(frame_rate) is not int and type(frame_rate) is not float:
+            raise TypeError(
+                """Passed frame_rate object is not in the correct format,
+                please pass an int or float instead"""
+            )
+
+        self.path = path
+        self.format = format
+        self.frame_rate = frame_rate
+        self.writer = None
+
+    def write(self, image):
+        """
+        Writes the next frame. The array is passed to ffmpeg without copying it
+        when it is contiguous.
+
+        Args:
+            image: numpy.ndarray
+                Array of shape (height, width, 3) or (height, width, 4) with the
+                RGB or RGBA pixels of the frame, the same shape for every frame
+        """
+        # the frame size is only known once the first frame is rendered
+        if self.writer is None:
+            self.writer = imageio_ffmpeg.write_frames(
+                self.path,
+                (image.shape[1], image.shape[0]),
+                pix_fmt_in="rgba" if image.shape[2] == 4 else "rgb24",
+                fps=self.frame_rate,
+                ffmpeg_log_level="error",
+                **FORMAT_SETTINGS[self.format]
+            )
+            self.writer.send(None)
+        self.writer.send(np.ascontiguousarray(image))
+
+    def close(self):
+        """
+        Finishes the file.
+        """
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+def get_chunks(n_frames, workers, chunk_size=None):
+    """
+    Split the frames into ranges rendered by a pool of processes.
+
+    Args:
+        n_frames: int
+            Number of frames
+        workers: int
+            Number of processes
+        chunk_size: int (optional)
+            Number of frames per chunk. Defaults to None for about
+            four chunks per process.
+
+    Returns:
+        [(int, int)]:
+            Start (inclusive) and stop (exclusive) frame index of each chunk
+    """
+    if chunk_size is None:
+        chunk_size = max(1, math.ceil(n_frames / (workers * 4)))
+    return [
+        (start, min(start + chunk_size, n_frames))
+        for start in range(0, n_frames, chunk_size)
+    ]
+
+
+def init_render_worker(animation_fn, epoch, kwargs, headless=True):
+    """
+    Create the animation that a worker process renders frames from.
+    Helper function for render_to_file.
+
+    Args:
+        animation_fn: function
+            Animation function returning a matplotlib.animation.FuncAnimation
+        epoch: mne.epochs.Epochs or mne.evoked.EvokedArray
+            Epoch to animate
+        kwargs: dict
+            Arguments for the animation function
+        headless: bool (optional)
+            Whether to switch matplotlib to the Agg backend. Defaults to True.
+    """
+    if headless:
+        matplotlib.use("Agg")
+    animation = animation_fn(epoch, **kwargs)
+    WORKER_STATE["animation"] = animation
+    WORKER_STATE["frames"] = list(animation.new_saved_frame_seq())
+
+
+def count_frames():
+    """
+    Get the number of frames in the animation of the worker process.
+    Helper function for render_to_file.
+
+    Returns:
+        int:
+            Number of frames
+    """
+    return len(WORKER_STATE["frames"])
+
+
+def render_frames(frame_range):
+    """
+    Render a range of frames from the animation of the worker process.
+    Helper function for render_to_file.
+
+    Args:
+        frame_range: (int, int)
+            Start (inclusive) and stop (exclusive) frame index
+
+    Returns:
+        [numpy.ndarray]:
+            RGBA array of each frame
+    """
+    animation = WORKER_STATE["animation"]
+    images = []
+    for frame in WORKER_STATE["frames"][frame_range[0]:frame_range[1]]:
+        animation._draw_frame(frame)
+        # copied since the buffer is reused for the next frame
+        images.append(render_figure(animation._fig).copy())
+    return images
+
+
+def render_to_file(
+    animation_fn,
+    epoch,
+    path,
+    workers=None,
+    format=None,
+    frame_rate=12,
+    chunk_size=None,
+    **kwargs
+):
+    """
+    Render an animation to a mp4, webm or gif file. The frames are split into
+    chunks which are rendered in parallel by a pool of processes, each with its own
+    headless (Agg) copy of the animation. The frames are written in order to a
+    single ffmpeg process as they arrive, so the whole animation is never held in memory.
+
+    Works with any of the animation functions taking an epoch as the first argument and
+    returning a matplotlib.animation.FuncAnimation, e.g. topomap_2d.animate_topomap_2d,
+    connectivity.animate_connectivity, connectivity.animate_connectivity_circle and
+    topomap_3d_brain.animate_matplot_brain. Since the workers are started with 'spawn',
+    scripts calling this function with workers > 1 need an `if __name__ == '__main__':` guard.
+
+    Args:
+        animation_fn: function
+            Animation function to render
+        epoch: mne.epochs.Epochs or mne.evoked.EvokedArray
+            Epoch to animate
+        path: str
+            Path of the file to save
+        workers: int (optional)
+            Number of processes to render frames with. Defaults to None for the
+            number of CPUs. 1 renders in the current process.
+        format: str (optional)
+            One of "mp4", "webm" or "gif". Defaults to None to use the extension of the path.
+        frame_rate: int or float (optional)
+            The frame rate of the file. Defaults to 12.
+        chunk_size: int (optional)
+            Number of frames rendered per task. Defaults to None for about
+            four tasks per worker.
+        **kwargs: dict (optional)
+            Optional arguments to pass to the animation function. For
+            topomap_3d_brain.animate_matplot_brain pass a pre-calculated stc,
+            otherwise every worker calculates its own.
+
+    Returns:
+        str:
+            The path of the saved file
+    """
+    if workers is None:
+        workers = os.cpu_count()
+
+    # validates the format and frame rate before any frames are rendered
+    writer = FrameWriter(path, format, frame_rate)
+    kwargs = {**kwargs, "frame_rate": frame_rate}
+
+    try:
+        if workers <= 1:
+            init_render_worker(animation_fn, epoch, kwargs, headless=False)
+            # each frame is written before the buffer is reused
+            for image in iter_frames(WORKER_STATE["animation"]):
+                writer.write(image)
+        else:
+            context = multiprocessing.get_context("spawn")
+            with context.Pool(
+                workers,
+                initializer=init_render_worker,
+                initargs=(animation_fn, epoch, kwargs)
+            ) as pool:
+                n_frames = pool.apply(count_frames)
+                for images in pool.imap(render_frames, get_chunks(n_frames, workers, chunk_size)):
+                    for image in images:
+                        writer.write(image)
+    finally:
+        if "animation" in WORKER_STATE:
+            plt.close(WORKER_STATE["animation"]._fig)
+        WORKER_STATE.clear()
+        writer.close()
+
+    return path
@@ -0,0 +1,214 @@
+# -*- coding: utf-8 -*-
+
+"""
+Module for calculating the 2D layout of the electrodes and cartoon head
+"""
+
+import hashlib
+
+import matplotlib
+import numpy as np
+from mne.io.pick import _pick_data_channels, pick_info
+from mne.viz.topomap import (
+    _check_extrapolate,
+    _check_sphere,
+    _find_topomap_coords,
+    _make_head_outlines,
+    _setup_interp,
+)
+
+# Results are cached per layout fingerprint since they only depend
+# on the channel names and positions
+AXIS_LIMS_CACHE = {}
+SPHERE_CHECK_CACHE = {}
+SENSOR_POSITIONS_CACHE = {}
+
+
+def get_layout_fingerprint(info):
+    """
+    Calculate a key identifying the names and positions of the data channels.
+
+    Parameters:
+        info: mne.Info
+            Info containing the channel locations.
+
+    Returns:
+        str:
+            The hex digest identifying the layout.
+    """
+    sha1 = hashlib.sha1()
+    for pick in _pick_data_channels(info, exclude=()):
+        channel = info['chs'][pick]
+        sha1.update(channel['ch_name'].encode())
+        sha1.update(np.asarray(channel['loc'][:3], dtype=float).tobytes())
+    return sha1.hexdigest()
+
+
+def get_sensor_positions(info, sphere=None, ignore_overlap=False):
+    """
+    Project the 3D locations of the data channels onto the 2D topomap plane the same
+    way mne.viz.plot_topomap and mne.viz.plot_sensors do: each electrode keeps its
+    distance from the sphere origin and is placed at its azimuth, scaled by its polar
+    angle. Calculated with numpy only and cached per layout and sphere.
+
+    Parameters:
+        info: mne.Info
+            Info containing the channel locations.
+        sphere: float, tuple or None
+            The 'sphere' parameter as used in mne.viz.plot_topomap(). Defaults to None.
+        ignore_overlap: bool
+            Whether to allow electrodes at the same location. Defaults to False.
+
+    Returns:
+        names: [str]
+            The names of the data channels.
+        pos: numpy.ndarray
+            The (n_channels, 2) positions of the electrodes on the topomap.
+    """
+    sphere = _check_sphere(sphere)
+    key = (get_layout_fingerprint(info), tuple(sphere), ignore_overlap)
+
+    if key not in SENSOR_POSITIONS_CACHE:
+        picks = _pick_data_channels(info, exclude=())
+        chs = [info['chs'][pick] for pick in picks]
+        locs3d = np.array([channel['loc'][:3] for channel in chs], dtype=float).reshape(-1, 3)
+
+        if len(locs3d) == 0 or np.allclose(np.nan_to_num(locs3d), 0.):
+            # mne falls back to the digitization points
+            pos = _find_topomap_coords(
+                pick_info(info, picks),
+                picks=list(range(len(picks))),
+                ignore_overlap=ignore_overlap,
+                sphere=sphere
+            )[:, :2]
+        else:
+            locs3d[~np.isfinite(locs3d)] = 0.
+
+            if not ignore_overlap and len(locs3d) > 1:
+                dist = np.linalg.norm(locs3d[:, np.newaxis] - locs3d[np.newaxis], axis=-1)
+                overlap = (dist < 1e-10) & ~np.eye(len(locs3d), dtype=bool)
+                if overlap.any():
+                    raise ValueError(
+                        "The following electrodes have overlapping positions, "
+                        "which causes problems during visualization:\n" +
+                        ", ".join(chs[idx]['ch_name'] for idx in np.flatnonzero(overlap.any(axis=0)))
+                    )
+
+            locs3d -= sphere[:3]
+            radius = np.linalg.norm(locs3d, axis=1)
+            azimuth = np.arctan2(locs3d[:, 1], locs3d[:, 0])
+            polar = np.arccos(locs3d[:, 2] / np.where(radius > 0, radius, 1))
+            distance = np.nan_to_num(polar) * radius / (np.pi / 2.)
+            pos = np.stack([distance * np.cos(azimuth), distance * np.sin(azimuth)], axis=1)
+            pos += sphere[:2]
+
+        pos.setflags(write=False)
+        SENSOR_POSITIONS_CACHE[key] = ([chs[idx]['ch_name'] for idx in range(len(chs))], pos)
+
+    return SENSOR_POSITIONS_CACHE[key]
+
+
+def get_topomap_geometry(info, sphere=None, extrapolate='auto', border='mean'):
+    """
+    Calculate the electrode positions, head outlines and image extent used by
+    mne.viz.plot_topomap without drawing anything.
+
+    Parameters:
+        info: mne.Info
+            Info containing the channel locations.
+        sphere: float or None
+            The 'sphere' parameter as used in mne.viz.plot_topomap(). Defaults to None.
+        extrapolate: str
+            The 'extrapolate' parameter as used in mne.viz.plot_topomap(). Defaults to 'auto'.
+        border: float or 'mean'
+            The 'border' parameter as used in mne.viz.plot_topomap(). Defaults to 'mean'.
+
+    Returns:
+        pos: numpy.ndarray
+            The (n_channels, 2) positions of the electrodes on the topomap.
+        outlines: dict
+            The head outlines as created by mne.
+        extent: tuple
+            The (xmin, xmax, ymin, ymax) extent of the topomap image.
+    """
+    sphere = _check_sphere(sphere)
+    pos = get_sensor_positions(info, sphere)[1]
+    extrapolate = _check_extrapolate(extrapolate, 'eeg')
+    outlines = _make_head_outlines(sphere, pos, 'head', (0., 0.))
+    extent = _setup_interp(pos, 1, extrapolate, sphere, outlines, border)[0]
+    return pos, outlines, extent
+
+
+def get_axis_lims(info):
+    """
+    Calculate the y axis limits of a default mne.viz.plot_topomap plot of the
+    channels in info. The limits are calculated from the electrode positions, head
+    outlines and image extent the same way matplotlib autoscales the axis, so no
+    figure needs to be drawn. Results are cached per layout.
+
+    Parameters:
+        info: mne.Info
+            Info containing the channel locations.
+
+    Returns:
+        ax_lims: tuple
+            A tuple of the ax_lims.
+    """
+    key = get_layout_fingerprint(info)
+
+    if key not in AXIS_LIMS_CACHE:
+        pos, outlines, extent = get_topomap_geometry(info)
+
+        # Everything mne draws with data limits: the image, sensors and outlines
+        y_values = [pos[:, 1], np.asarray(extent[2:])]
+        for name, (x_coord, y_coord) in outlines.items():
+            if 'mask' not in name and name not in ('patch', 'clip_radius', 'clip_origin'):
+                y_values.append(np.asarray(y_coord))
+        y_values = np.concatenate(y_values)
+        y_min, y_max = y_values.min(), y_values.max()
+
+        delta = (y_max - y_min) * matplotlib.rcParams['axes.ymargin']
+        lower, upper = y_min - delta, y_max + delta
+
+        # The margin can not cross the edges of the image (matplotlib sticky edges)
+        tol = 1e-5 * max(abs(y_min), abs(y_max), abs(y_max - y_min))
+        stickies = np.sort(extent[2:])
+        below = stickies[stickies < y_min + tol]
+        above = stickies[stickies > y_max - tol]
+        if len(below):
+            lower = max(lower, below.max())
+        if len(above):
+            upper = min(upper, above.min())
+
+        AXIS_LIMS_CACHE[key] = (lower, upper)
+
+    return AXIS_LIMS_CACHE[key]
+
+
+def check_sphere_works(info, sphere=100, extrapolate='auto'):
+    """
+    Checks whether a sphere parameter can be used with the channel locations
+    and extrapolation setting. Results are cached per layout.
+
+    Parameters:
+        info: mne.Info
+            Info containing the channel locations.
+        sphere: float
+            The 'sphere' parameter as used in mne.viz.plot_topomap(). Defaults to 100.
+        extrapolate: str
+            The 'extrapolate' parameter as used in mne.viz.plot_topomap(). Defaults to 'auto'.
+
+    Returns:
+        bool:
+            Whether the sphere parameter can be used.
+    """
+    key = (get_layout_fingerprint(info), sphere, extrapolate)
+
+    if key not in SPHERE_CHECK_CACHE:
+        try:
+            get_topomap_geometry(info, sphere, extrapolate)
+            SPHERE_CHECK_CACHE[key] = True
+        except Exception:
+            SPHERE_CHECK_CACHE[key] = False
+
+    return SPHERE_CHECK_CACHE[key]
@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+
+"""
+Module for looking up the electrode positions of standard montages
+"""
+
+import mne
+import numpy as np
+
+# The geometry of each standard montage, loaded once per process
+MONTAGE_REGISTRY = {}
+
+
+class MontageGeometry:
+    """
+    A class to represent the electrode positions of a montage as contiguous arrays
+
+    Attributes:
+        montage: mne.channels.DigMontage
+            The montage the positions are from
+        ch_names: [str]
+            The channel names of the montage
+        coords: numpy.ndarray
+            Read only (n_channels, 3) array of the cartesian coordinates of each channel
+        index: dict
+            The row of each channel name in coords
+
+    Methods:
+        get_indices(ch_names):
+            Returns the rows of a list of channels.
+        get_coords(ch_names):
+            Returns the coordinates of a list of channels.
+    """
+
+    def __init__(self, montage):
+        """
+        Reads the positions from the montage once.
+
+        Parameters:
+            montage: mne.channels.DigMontage
+                The montage
+        """
+        if type(montage) is not mne.channels.montage.DigMontage:
+            raise TypeError("montage has to be a mne montage")
+
+        positions = montage.get_positions()["ch_pos"]
+        self.montage = montage
+        self.ch_names = list(positions)
+        self.coords = np.array(list(positions.values()), dtype=float).reshape(-1, 3)
+        self.coords.setflags(write=False)
+        self.index = {name: idx for idx, name in enumerate(self.ch_names)}
+
+    def get_indices(self, ch_names):
+        """
+        Gets the rows of a list of channels.
+
+        Parameters:
+            ch_names: [str]
+                The channel names
+
+        Returns:
+            numpy.ndarray:
+                The row of each channel in coords
+        """
+        missing = [name for name in ch_names if name not in self.index]
+        if missing:
+            raise ValueError(
+                "Invalid channels, the montage has no position for " + ", ".join(missing)
+            )
+        return np.array([self.index[name] for name in ch_names], dtype=int)
+
+    def get_coords(self, ch_names):
+        """
+        Gets the coordinates of a list of channels.
+
+        Parameters:
+            ch_names: [str]
+                The channel names
+
+        Returns:
+            numpy.ndarray:
+                A (n_channels, 3) array of the cartesian coordinates of each channel
+        """
+        return self.coords[self.get_indices(ch_names)]
+
+
+def get_montage_geometry(montage="standard_1005"):
+    """
+    Get the electrode positions of a montage. Standard montages are loaded once per
+    process and shared by every caller.
+
+    Parameters:
+        montage: str or mne.channels.DigMontage (optional)
+            The name of a standard montage as used in mne.channels.make_standard_montage()
+            or a montage. Defaults to "standard_1005".
+
+    Returns:
+        MontageGeometry:
+            The electrode positions
+    """
+    if type(montage) is str:
+        if montage not in MONTAGE_REGISTRY:
+            MONTAGE_REGISTRY[montage] = MontageGeometry(
+                mne.channels.make_standard_montage(montage)
+            )
+        return MONTAGE_REGISTRY[montage]
+
+    # montages handed out by the registry are looked up without reading them again
+    for geometry in MONTAGE_REGISTRY.values():
+        if geometry.montage is montage:
+            return geometry
+
+    return MontageGeometry(montage)
+
+
+def get_montage(montage):
+    """
+    Get a copy of a standard montage from the registry, e.g. to set it on raw data.
+
+    Parameters:
+        montage: str or mne.channels.DigMontage
+            The name of a standard montage as used in mne.channels.make_standard_montage()
+            or a montage, which is returned as is
+
+    Returns:
+        mne.channels.DigMontage:
+            The montage
+    """
+    if type(montage) is str:
+        return get_montage_geometry(montage).montage.copy()
+    return montage
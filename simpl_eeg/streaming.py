@@ -0,0 +1,580 @@
+# -*- coding: utf-8 -*-
+
+"""
+Module for drawing live EEG streams
+"""
+
+import asyncio
+import itertools
+import threading
+import time
+
+import matplotlib.animation as animation
+import matplotlib.pyplot as plt
+import mne
+import numpy as np
+import pandas as pd
+from simpl_eeg import connectivity, eeg_objects, topomap_2d
+
+
+class RingBuffer:
+    """
+    A fixed capacity buffer holding the most recent samples of a stream. A producer
+    (e.g. a thread or an asyncio task) writes chunks of samples while a display reads
+    the newest ones, the oldest samples are overwritten once the buffer is full.
+
+    Attributes:
+        data: numpy.ndarray
+            The (n_channels, capacity) array the samples are stored in.
+        capacity: int
+            The number of samples per channel that are kept.
+        n_written: int
+            The total number of samples written since the buffer was created.
+        write_time: float or None
+            The time.perf_counter() of the last write.
+        lock: threading.Lock
+            Lock shared by writes and reads.
+
+    Methods:
+        write(chunk):
+            Adds a chunk of samples to the end of the buffer.
+        read(n_samples):
+            Returns the newest samples in time order.
+    """
+
+    def __init__(self, n_channels, capacity):
+        """
+        Allocates the buffer once.
+
+        Parameters:
+            n_channels: int
+                The number of channels of the stream.
+            capacity: int
+                The number of samples per channel to keep.
+        """
+        if type(n_channels) is not int or type(capacity) is not int:
+            raise TypeError("n_channels and capacity have to be integers")
+
+        if capacity < 1:
+            raise ValueError("Invalid capacity, capacity has to be at least 1")
+
+        self.data = np.zeros((n_channels, capacity))
+        self.capacity = capacity
+        self.n_written = 0
+        self.write_time = None
+        self.lock = threading.Lock()
+
+    def write(self, chunk):
+        """
+        Adds a chunk of samples to the end of the buffer.
+
+        Parameters:
+            chunk: numpy.ndarray
+                Array of shape (n_channels, n_samples) with the new samples.
+        """
+        chunk = np.asarray(chunk)
+        if chunk.ndim != 2 or chunk.shape[0] != self.data.shape[0]:
+            raise ValueError(
+                "Invalid chunk, chunk has to be of shape (n_channels, n_samples) "
+                "with " + str(self.data.shape[0]) + " channels"
+            )
+
+        # only the newest samples of a chunk larger than the buffer are kept
+        n_samples = chunk.shape[1]
+        chunk = chunk[:, -self.capacity:]
+
+        with self.lock:
+            start = (self.n_written + n_samples - chunk.shape[1]) % self.capacity
+            first = min(chunk.shape[1], self.capacity - start)
+            self.data[:, start:start + first] = chunk[:, :first]
+            self.data[:, :chunk.shape[1] - first] = chunk[:, first:]
+            self.n_written += n_samples
+            self.write_time = time.perf_counter()
+
+    def read(self, n_samples=None):
+        """
+        Returns the newest samples in time order.
+
+        Parameters:
+            n_samples: int or None
+                The number of samples to read. Defaults to None for every sample in the
+                buffer. Fewer samples are returned if fewer have been written.
+
+        Returns:
+            data: numpy.ndarray
+                Array of shape (n_channels, n_samples) with a copy of the samples.
+            n_written: int
+                The total number of samples written, i.e. the index after the last
+                returned sample.
+        """
+        with self.lock:
+            available = min(self.n_written, self.capacity)
+            if n_samples is None or n_samples > available:
+                n_samples = available
+            end = self.n_written % self.capacity
+            indices = np.arange(end - n_samples, end) % self.capacity
+            return self.data[:, indices], self.n_written
+
+
+def get_stream_info(source):
+    """
+    Get the info of the EEG channels of a stream source.
+
+    Parameters:
+        source: simpl_eeg.eeg_objects.EEG_File or mne.io.Raw or mne.Info
+            The data the stream is replayed from, or the info of the stream.
+
+    Returns:
+        mne.Info:
+            The info of the EEG channels.
+    """
+    if isinstance(source, eeg_objects.EEG_File):
+        source = source.raw
+    if not isinstance(source, mne.Info):
+        source = source.info
+    return mne.pick_info(source, mne.pick_types(source, eeg=True, exclude=()))
+
+
+class StreamReplay:
+    """
+    Replays the EEG channels of a recording as fixed size blocks of samples, as a local
+    stand-in for an amplifier. Iterating over it yields each block once its last sample
+    would have been recorded, either as a generator (for block in replay) or as an async
+    iterator (async for block in replay). Delivery jitter and dropped blocks can be
+    simulated, and the time each block is handed out (enqueued) and shown by a consumer
+    (dequeued) is kept so the end-to-end latency of a display can be measured.
+
+    Attributes:
+        data: numpy.ndarray
+            The (n_channels, n_samples) EEG data of the recording.
+        sfreq: float
+            The sampling frequency of the recording.
+        block_size: int
+            The number of samples per block.
+        speed: float or None
+            How many times faster than real time the blocks are yielded, None for as fast
+            as possible.
+        jitter: float
+            The maximum delay in seconds randomly added to each block.
+        drop_rate: float
+            The probability of each block being dropped.
+        seed: int or None
+            The seed of the jitter and dropped blocks.
+        starts: numpy.ndarray
+            The index of the first sample of each block.
+        dropped: numpy.ndarray
+            Whether each block was dropped in the last replay.
+        enqueue_times: numpy.ndarray
+            The time.perf_counter() each block was yielded, NaN if it was not.
+        dequeue_times: numpy.ndarray
+            The time.perf_counter() each block was consumed, NaN if it was not.
+
+    Methods:
+        record_dequeue(n_consumed, timestamp):
+            Marks the yielded blocks that have been consumed.
+        get_latencies():
+            Returns the seconds between yielding and consuming each consumed block.
+        get_latency_percentiles(percentiles):
+            Returns percentiles of the latencies.
+    """
+
+    def __init__(self, source, block_size=32, speed=1.0, jitter=0.0, drop_rate=0.0, seed=None):
+        """
+        Reads the data of the recording once.
+
+        Parameters:
+            source: simpl_eeg.eeg_objects.EEG_File or mne.io.Raw
+                The recording to replay.
+            block_size: int
+                The number of samples per block. Defaults to 32.
+            speed: float or None
+                How many times faster than real time to replay, None for as fast as
+                possible. Defaults to 1.0.
+            jitter: float
+                The maximum delay in seconds randomly added to each block. Defaults to 0.
+            drop_rate: float
+                The probability of each block being dropped. Defaults to 0.
+            seed: int or None
+                The seed of the jitter and dropped blocks. Defaults to None.
+        """
+        if isinstance(source, eeg_objects.EEG_File):
+            source = source.raw
+
+        if type(block_size) is not int:
+            raise TypeError("block_size has to be an integer")
+
+        if block_size < 1:
+            raise ValueError("Invalid block_size, block_size has to be at least 1")
+
+        if speed is not None and speed <= 0:
+            raise ValueError("Invalid speed, speed has to be positive or None")
+
+        if jitter < 0:
+            raise ValueError("Invalid jitter, jitter can not be negative")
+
+        if not 0 <= drop_rate < 1:
+            raise ValueError("Invalid drop_rate, drop_rate has to be between 0 and 1")
+
+        self.data = source.get_data(picks="eeg")
+        self.sfreq = source.info["sfreq"]
+        self.block_size = block_size
+        self.speed = speed
+        self.jitter = jitter
+        self.drop_rate = drop_rate
+        self.seed = seed
+        self.starts = np.arange(0, self.data.shape[1], block_size)
+        self.reset()
+
+    def __len__(self):
+        return len(self.starts)
+
+    def reset(self):
+        """
+        Clears the timestamps of the last replay.
+        """
+        self.dropped = np.zeros(len(self), dtype=bool)
+        self.enqueue_times = np.full(len(self), np.nan)
+        self.dequeue_times = np.full(len(self), np.nan)
+        # number of samples yielded up to and including each block
+        self.n_yielded = np.zeros(len(self), dtype=int)
+
+    def get_schedule(self):
+        """
+        Helper function for iterating over the blocks. Draws the jitter and dropped
+        blocks of a replay.
+
+        Returns:
+            delays: numpy.ndarray
+                The seconds after the start of the replay each block is due.
+            dropped: numpy.ndarray
+                Whether each block is dropped.
+        """
+        random_state = np.random.RandomState(self.seed)
+        stops = np.minimum(self.starts + self.block_size, self.data.shape[1])
+        delays = random_state.uniform(0, self.jitter, len(self))
+        if self.speed is not None:
+            delays += stops / self.sfreq / self.speed
+        dropped = random_state.uniform(size=len(self)) < self.drop_rate
+        return delays, dropped
+
+    def enqueue(self, block_number, n_yielded):
+        """
+        Helper function for iterating over the blocks. Records a block being yielded.
+
+        Parameters:
+            block_number: int
+                The index of the block.
+            n_yielded: int
+                The number of samples yielded before the block.
+
+        Returns:
+            numpy.ndarray:
+                The (n_channels, block_size) samples of the block.
+        """
+        start = self.starts[block_number]
+        block = self.data[:, start:start + self.block_size]
+        self.n_yielded[block_number] = n_yielded + block.shape[1]
+        self.enqueue_times[block_number] = time.perf_counter()
+        return block
+
+    def __iter__(self):
+        self.reset()
+        delays, self.dropped = self.get_schedule()
+        start_time = time.perf_counter()
+        n_yielded = 0
+
+        for block_number in range(len(self)):
+            if self.dropped[block_number]:
+                continue
+
+            delay = start_time + delays[block_number] - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+
+            block = self.enqueue(block_number, n_yielded)
+            n_yielded += block.shape[1]
+            yield block
+
+    async def __aiter__(self):
+        self.reset()
+        delays, self.dropped = self.get_schedule()
+        start_time = time.perf_counter()
+        n_yielded = 0
+
+        for block_number in range(len(self)):
+            if self.dropped[block_number]:
+                continue
+
+            # sleeping hands control back to the other tasks of the event loop
+            await asyncio.sleep(max(start_time + delays[block_number] - time.perf_counter(), 0))
+
+            block = self.enqueue(block_number, n_yielded)
+            n_yielded += block.shape[1]
+            yield block
+
+    def record_dequeue(self, n_consumed=None, timestamp=None):
+        """
+        Marks the yielded blocks that have been consumed, e.g. drawn by a display.
+        Blocks that were already marked keep their first timestamp.
+
+        Parameters:
+            n_consumed: int or None
+                The number of yielded samples that have been consumed, e.g. the
+                n_written of the RingBuffer the blocks are written to. Defaults to None
+                for every block yielded so far.
+            timestamp: float or None
+                The time.perf_counter() the blocks were consumed. Defaults to None for now.
+        """
+        if timestamp is None:
+            timestamp = time.perf_counter()
+
+        consumed = ~np.isnan(self.enqueue_times) & np.isnan(self.dequeue_times)
+        if n_consumed is not None:
+            consumed &= self.n_yielded <= n_consumed
+        self.dequeue_times[consumed] = timestamp
+
+    def get_latencies(self):
+        """
+        Gets the seconds between yielding and consuming each consumed block.
+
+        Returns:
+            numpy.ndarray:
+                The latency of each consumed block, in the order of the blocks.
+        """
+        latencies = self.dequeue_times - self.enqueue_times
+        return latencies[~np.isnan(latencies)]
+
+    def get_latency_percentiles(self, percentiles=(50, 95, 99)):
+        """
+        Gets percentiles of the end-to-end latencies of the consumed blocks.
+
+        Parameters:
+            percentiles: [float]
+                The percentiles to calculate. Defaults to (50, 95, 99).
+
+        Returns:
+            dict:
+                The latency in seconds of each percentile, NaN if no block was consumed.
+        """
+        latencies = self.get_latencies()
+        if len(latencies) == 0:
+            return {percentile: np.nan for percentile in percentiles}
+        return dict(zip(percentiles, np.percentile(latencies, percentiles)))
+
+
+def replay_eeg_file(source, buffer, block_size=32, speed=1.0, stop_event=None):
+    """
+    Replay the EEG channels of a recording into a ring buffer as if it was recorded
+    live, as a local stand-in for an amplifier. Blocks until the recording is replayed
+    or stop_event is set, so it is usually the target of a thread, e.g.
+    threading.Thread(target=replay_eeg_file, args=(eeg_file, buffer)).start().
+
+    Parameters:
+        source: simpl_eeg.eeg_objects.EEG_File, mne.io.Raw or StreamReplay
+            The recording to replay. A StreamReplay is used as is, e.g. to add jitter
+            or to measure latencies.
+        buffer: RingBuffer
+            The buffer to write the samples to.
+        block_size: int
+            The number of samples written at once. Defaults to 32.
+        speed: float or None
+            How many times faster than real time to replay, None for as fast as
+            possible. Defaults to 1.0.
+        stop_event: threading.Event or None
+            Event to stop the replay early. Defaults to None.
+
+    Returns:
+        int:
+            The number of samples replayed.
+    """
+    if not isinstance(source, StreamReplay):
+        source = StreamReplay(source, block_size, speed)
+
+    n_replayed = 0
+    for block in source:
+        if stop_event is not None and stop_event.is_set():
+            break
+        buffer.write(block)
+        n_replayed += block.shape[1]
+
+    return n_replayed
+
+
+class StreamingTopomap:
+    """
+    A live 2D topomap (and optionally connectivity plot) of the newest samples in a ring
+    buffer. The figures are drawn once with TopomapRenderer and ConnectivityRenderer,
+    so each frame only interpolates the newest samples and updates the changed artists.
+
+    Attributes:
+        buffer: RingBuffer
+            The buffer the samples are read from.
+        info: mne.Info
+            The info of the channels in the buffer.
+        window: int
+            The number of newest samples averaged for each topomap frame.
+        renderer: simpl_eeg.topomap_2d.TopomapRenderer
+            The persistent topomap.
+        conn_renderer: simpl_eeg.connectivity.ConnectivityRenderer or None
+            The persistent connectivity plot.
+        replay: StreamReplay or None
+            The replay writing to the buffer, whose blocks are marked as consumed
+            once drawn.
+        n_drawn: int
+            The buffer's n_written when the last frame was drawn.
+        latency: float or None
+            Seconds between the last write to the buffer and drawing it.
+
+    Methods:
+        update():
+            Draws the newest samples and returns the changed artists.
+        animate(frame_rate):
+            Returns an animation redrawing the newest samples at a target frame rate.
+    """
+
+    def __init__(
+        self,
+        buffer,
+        info,
+        window=1,
+        show_connectivity=False,
+        calc_type="correlation",
+        conn_window=None,
+        replay=None,
+        **kwargs
+    ):
+        """
+        Draws the static parts of the plots.
+
+        Parameters:
+            buffer: RingBuffer
+                The buffer the samples are read from.
+            info: simpl_eeg.eeg_objects.EEG_File, mne.io.Raw or mne.Info
+                The recording the stream is replayed from, or the info of the stream.
+                Only the EEG channels are used, in the order of the buffer.
+            window: int
+                The number of newest samples averaged for each topomap frame. Defaults to 1.
+            show_connectivity: bool
+                Whether to also draw a connectivity plot in its own figure. Defaults to False.
+            calc_type: str
+                The connectivity calculation type, see connectivity.calculate_connectivity.
+                Defaults to "correlation".
+            conn_window: int or None
+                The number of newest samples used for the connectivity. Defaults to None
+                for the whole buffer.
+            replay: StreamReplay or None
+                The replay writing to the buffer, to measure the end-to-end latency of
+                each block. Defaults to None.
+            **kwargs: various
+                Additional arguments for topomap_2d.TopomapRenderer.
+        """
+        self.info = get_stream_info(info)
+        if buffer.data.shape[0] != len(self.info["ch_names"]):
+            raise ValueError(
+                "Invalid buffer, the buffer has to have a row for each EEG channel"
+            )
+
+        self.buffer = buffer
+        self.window = window
+        self.calc_type = calc_type
+        self.conn_window = conn_window
+        self.replay = replay
+        self.n_drawn = 0
+        self.latency = None
+
+        kwargs = {"timestamp": True, **kwargs}
+        self.renderer = topomap_2d.TopomapRenderer(
+            mne.EvokedArray(np.zeros((len(self.info["ch_names"]), 1)), self.info, verbose=False),
+            **kwargs
+        )
+
+        self.conn_renderer = None
+        if show_connectivity:
+            data = self.read_connectivity_window()
+            self.conn_renderer = connectivity.ConnectivityRenderer(
+                mne.EvokedArray(data, self.info, verbose=False),
+                plt.figure(),
+                calc_type=calc_type
+            )
+
+    def read_connectivity_window(self):
+        """
+        Reads the samples used for the connectivity, padded with zeros while
+        the buffer is filling up.
+
+        Returns:
+            numpy.ndarray:
+                Array of shape (n_channels, n_samples) with the samples.
+        """
+        n_samples = self.conn_window or self.buffer.capacity
+        data = self.buffer.read(n_samples)[0]
+        if data.shape[1] < 2:
+            data = np.zeros((data.shape[0], 2))
+        return data
+
+    def update(self):
+        """
+        Draws the newest samples in the buffer if any have been written since the last frame.
+
+        Returns:
+            list:
+                The artists that were changed.
+        """
+        data, n_written = self.buffer.read(self.window)
+        if n_written == self.n_drawn:
+            return []
+
+        changed = self.renderer.update(
+            data.mean(axis=1), (n_written - 1) / self.info["sfreq"]
+        )
+
+        if self.conn_renderer is not None:
+            data = self.read_connectivity_window()
+            conn = connectivity.calculate_connectivity_arrays(
+                data[np.newaxis], self.info["sfreq"], [self.calc_type]
+            )[self.calc_type]
+            changed += self.conn_renderer.update_connectivity(
+                pd.DataFrame(conn, index=self.info["ch_names"], columns=self.info["ch_names"])
+            )
+
+        self.n_drawn = n_written
+        self.latency = time.perf_counter() - self.buffer.write_time
+        if self.replay is not None:
+            self.replay.record_dequeue(n_written)
+        return changed
+
+    def animate(self, frame_rate=30):
+        """
+        Returns an animation of the topomap that draws the newest samples at a target
+        frame rate for as long as it is shown. The connectivity plot is updated by the
+        same animation.
+
+        Parameters:
+            frame_rate: int or float
+                The target number of frames per second. Defaults to 30.
+
+        Returns:
+            matplotlib.animation.FuncAnimation:
+                The animation.
+        """
+        if type(frame_rate) is not int and type(frame_rate) is not float:
+            raise TypeError(
+                """Passed frame_rate object is not in the correct format,
+                please pass an int or float instead"""
+            )
+
+        # artists of the connectivity figure are redrawn with their own canvas
+        def update(frame_number):
+            changed = self.update()
+            if self.conn_renderer is not None and changed:
+                self.conn_renderer.fig.canvas.draw_idle()
+            return [artist for artist in changed if artist.figure is self.renderer.fig]
+
+        return animation.FuncAnimation(
+            self.renderer.fig,
+            update,
+            frames=itertools.count(),
+            interval=1000 / frame_rate,
+            blit=True,
+            cache_frame_data=False
+        )
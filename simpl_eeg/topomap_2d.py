@@ -5,6 +5,14 @@ import numpy
 import numpy as np
 from mpl_toolkits.axes_grid1.axes_divider import make_axes_locatable
 from pylab import text
+from simpl_eeg import layout
+from scipy.interpolate import CloughTocher2DInterpolator
+from mne.viz.topomap import (
+    _check_extrapolate,
+    _check_sphere,
+    _make_head_outlines,
+    _setup_interp,
+)
 
 
 def add_timestamp(epoch, x_pos, y_pos, frame_number):
@@ -20,20 +28,34 @@ def add_timestamp(epoch, x_pos, y_pos, frame_number):
             The timestamp to plot.
     """
     
-    frame_time = epoch.times[frame_number]
+    text(x_pos, y_pos, get_timestamp_text(epoch.times[frame_number]))
+
+
+def get_timestamp_text(frame_time):
+    """
+    Formats a time in seconds as the timestamp text shown on topomaps.
+
+    Parameters:
+        frame_time: float
+            The time of the frame in seconds.
+
+    Returns:
+        str:
+            The timestamp text.
+    """
     tstamp = format(frame_time, '.4f')
-    
+
     if frame_time >= 0:
-        text(x_pos, y_pos, 'time:  {}'.format(tstamp) + 's')
+        return 'time:  {}'.format(tstamp) + 's'
     else:
-        text(x_pos, y_pos, 'time: {}'.format(tstamp) + 's')
-    
+        return 'time: {}'.format(tstamp) + 's'
+
         
         
 def get_axis_lims(epoch):
     """
-    Generates an invisible mne.viz.plot_topomap plot and gets the ylim from its
-    matplotlib.axes._subplots.AxesSubplot.
+    Gets the ylim of a default mne.viz.plot_topomap plot of the epoch. Calculated
+    from the montage positions without drawing and cached per montage.
     
     Parameters:
         epoch: mne.epochs.Epochs
@@ -43,23 +65,7 @@ def get_axis_lims(epoch):
         ax_lims: tuple
             A tuple of the ax_lims.
     """
-    fig, ax = plt.subplots()
-    
-    if type(epoch) is mne.evoked.EvokedArray:
-        plot_data = epoch.data[:, 0]
-    else:
-        plot_data = epoch.get_data('eeg')[0][:, 0]
-    
-    mne.viz.plot_topomap(
-        data=plot_data,
-        pos=epoch.info,
-        show=False,
-        res=1
-    )
-    
-    axis_lims = ax.get_ylim()
-    plt.close()
-    return(axis_lims)
+    return layout.get_axis_lims(epoch.info)
 
 
 def plot_topomap_2d(epoch,
@@ -275,6 +281,298 @@ def plot_topomap_2d(epoch,
     return topo_2d_fig
 
 
+def get_interpolation_matrix(info, sphere=None, res=64, extrapolate='head', border='mean',
+                             outlines='head'):
+    """
+    Calculates the electrode to image grid interpolation used by mne.viz.plot_topomap as
+    a single linear operator. The interpolation (and the 'mean' border extrapolation) is
+    linear in the electrode values, so interpolating a unit value for each electrode gives
+    the weights of that electrode for every grid point. A topomap image can then be
+    calculated with a matrix-vector product instead of rebuilding the interpolator.
+
+    Parameters:
+        info: mne.Info
+            Info containing the electrode locations of the data channels.
+        sphere: float or None
+            The 'sphere' parameter as used in mne.viz.plot_topomap(). Defaults to None.
+        res: int
+            The resolution of the topomap image (n pixels along each side). Defaults to 64.
+        extrapolate: str
+            The 'extrapolate' parameter as used in mne.viz.plot_topomap(). Defaults to 'head'.
+        border: float or 'mean'
+            The 'border' parameter as used in mne.viz.plot_topomap(). Defaults to 'mean'.
+        outlines: str
+            The 'outlines' parameter as used in mne.viz.plot_topomap(). Defaults to 'head'.
+
+    Returns:
+        weights: numpy.ndarray
+            Array of shape (res * res, n_channels) with the weight of each electrode for each
+            grid point. Grid points outside of the interpolated area are NaN.
+        offset: numpy.ndarray
+            Array of shape (res * res,) with the contribution of a numeric border value
+            (zeros for the 'mean' border).
+        extent: tuple
+            The (xmin, xmax, ymin, ymax) extent of the image grid.
+    """
+    sphere = _check_sphere(sphere)
+    pos = layout.get_sensor_positions(info, sphere)[1]
+    extrapolate = _check_extrapolate(extrapolate, 'eeg')
+    outlines = _make_head_outlines(sphere, pos, outlines, (0., 0.))
+    extent, Xi, Yi, interp = _setup_interp(pos, res, extrapolate, sphere, outlines, border)
+
+    # The last column holds the constant border, the others one unit value per electrode
+    n_channels = len(pos)
+    basis = np.zeros((n_channels + interp.n_extra, n_channels + 1))
+    basis[:n_channels, :n_channels] = np.eye(n_channels)
+
+    if isinstance(border, str):
+        # Extra points take the mean of their neighbouring electrodes,
+        # following mne.viz.topomap._GridData.set_values
+        indices, indptr = interp.tri.vertex_neighbor_vertices
+        used = np.zeros(interp.n_extra, bool)
+        for idx in range(interp.n_extra):
+            extra_idx = n_channels + idx
+            ngb = indptr[indices[extra_idx]:indices[extra_idx + 1]]
+            ngb = ngb[ngb < n_channels]
+            if len(ngb) > 0:
+                used[idx] = True
+                basis[extra_idx, ngb] = 1.0 / len(ngb)
+        if not used.all() and used.any():
+            basis[n_channels:][~used] = basis[n_channels:][used].mean(axis=0)
+    else:
+        basis[n_channels:, n_channels] = border
+
+    grid_weights = CloughTocher2DInterpolator(interp.tri, basis)(Xi, Yi)
+    grid_weights = grid_weights.reshape(res * res, n_channels + 1)
+
+    return grid_weights[:, :n_channels], grid_weights[:, n_channels], extent
+
+
+class TopomapRenderer:
+    """
+    A persistent 2D topomap figure for rendering many frames with the same electrode
+    layout. The head outline, sensors, colorbar and timestamp are drawn once and the
+    electrode to image interpolation is calculated once, so each new frame is a single
+    matrix-vector product and an update of the image data.
+
+    Attributes:
+        fig: matplotlib.figure.Figure
+            The figure containing the topomap.
+        ax: matplotlib.axes.Axes
+            The axis containing the topomap.
+        image: matplotlib.image.AxesImage
+            The topomap image that is updated for each frame.
+        timestamp_text: matplotlib.text.Text or None
+            The timestamp text that is updated for each frame.
+        weights: numpy.ndarray
+            The (res * res, n_channels) interpolation matrix.
+        offset: numpy.ndarray
+            The (res * res,) contribution of a numeric border value.
+
+    Methods:
+        interpolate(plotting_data):
+            Calculates topomap images for one or more frames.
+        draw_contours(image_data):
+            Replaces the contour lines on the topomap.
+        update(plotting_data, frame_time):
+            Draws a new frame and returns the changed artists.
+    """
+
+    def __init__(self,
+                 epoch,
+                 plotting_data=None,
+                 colormap='RdBu_r',
+                 mark='dot',
+                 vmin=-30,
+                 vmax=30,
+                 sphere='auto',
+                 colorbar=True,
+                 timestamp=True,
+                 fig=None,
+                 **kwargs):
+        """
+        Draws the static parts of a 2D topomap and calculates the interpolation matrix.
+
+        Parameters:
+            epoch: mne.epochs.Epochs or mne.evoked.EvokedArray
+                MNE epochs object (or evoked array object) containing the electrode layout.
+            plotting_data: numpy.ndarray or None
+                Data of shape (num_channels, ) to draw in the first frame. If None the first
+                recording in the epoch is used. Defaults to None.
+            colormap: matplotlib colormap or None
+                The colormap for the topomap and colorbar. Defaults to 'RdBu_r'.
+            mark: str
+                Specifies what kind of marker should be shown for each node on the topomap. Can be one of
+                'dot', 'r+' (for red +'s), 'channel_name', or 'none'. Defaults to 'dot'.
+            vmin: float
+                The lower limit of the colormap in μV. Defaults to -30.
+            vmax: float
+                The upper limit of the colormap in μV. Defaults to +30.
+            sphere: float or 'auto'
+                The 'sphere' parameter as used in mne.viz.plot_topomap(). If 'auto' it is calculated
+                from the axis limits of the electrode layout. Defaults to 'auto'.
+            colorbar: bool
+                Specifies whether to include a colorbar. Defaults to True.
+            timestamp: bool
+                Specifies whether to show a timestamp. Defaults to True.
+            fig: matplotlib.figure.Figure or None
+                The figure to draw on. If None a new figure is created. Defaults to None.
+            **kwargs: various
+                Additional arguments from the 'mne.viz.plot_topomap' function, see plot_topomap_2d.
+        """
+        defaultKwargs = {'contours': 0, 'res': 64, 'extrapolate': 'head', 'outlines': 'head',
+                         'mask': None, 'mask_params': None, 'image_interp': 'bilinear', 'show': False,
+                         'onselect': None, 'border': 'mean', 'ch_type': 'eeg'}
+        kwargs = { **defaultKwargs, **kwargs }
+        kwargs.pop('axes', None)
+
+        if fig is None:
+            fig = plt.figure()
+        self.fig = fig
+        self.ax = fig.add_subplot()
+
+        ax_lims = get_axis_lims(epoch)
+        if sphere == 'auto':
+            sphere = ax_lims[0] * -0.95
+
+        # Contours depend on the data so they are drawn separately for every frame
+        self.contours = kwargs['contours']
+        self.contour_set = None
+        kwargs['contours'] = 0
+
+        self.image = plot_topomap_2d(
+            epoch,
+            plotting_data=plotting_data,
+            colormap=colormap,
+            mark=mark,
+            vmin=vmin,
+            vmax=vmax,
+            sphere=sphere,
+            colorbar=False,
+            timestamp=False,
+            axes=self.ax,
+            **kwargs
+        )
+
+        # Sphere parameter breaks plot if pre-loaded montage is used, in which
+        # case plot_topomap_2d falls back to the default sphere
+        try:
+            self.weights, self.offset, extent = get_interpolation_matrix(
+                epoch.info, sphere, kwargs['res'], kwargs['extrapolate'],
+                kwargs['border'], kwargs['outlines']
+            )
+        except Exception:
+            self.weights, self.offset, extent = get_interpolation_matrix(
+                epoch.info, None, kwargs['res'], kwargs['extrapolate'],
+                kwargs['border'], kwargs['outlines']
+            )
+        self.res = kwargs['res']
+
+        # mne stops refining the interpolation gradients early for data in volts, so the
+        # first frame is redrawn with the operator to match all of the following frames
+        if plotting_data is None:
+            if isinstance(epoch, mne.epochs.Epochs):
+                plotting_data = epoch.get_data('eeg')[0][:, 0]
+            else:
+                plotting_data = epoch.data[:, 0]
+        self.image.set_data(self.interpolate(plotting_data))
+
+        if self.contours:
+            xi = np.linspace(extent[0], extent[1], self.res)
+            yi = np.linspace(extent[2], extent[3], self.res)
+            self.grid = np.meshgrid(xi, yi)
+            self.draw_contours(np.ma.filled(self.image.get_array(), np.nan))
+
+        self.timestamp_text = None
+        if timestamp:
+            self.timestamp_text = self.ax.text(ax_lims[0], ax_lims[1], '')
+
+        if colorbar:
+            ax_divider = make_axes_locatable(self.ax)
+            self.cax = ax_divider.append_axes("right", size=0.1, pad="0%")
+            vmid = (vmin+vmax)/2
+            clim = dict(kind='value', lims=[vmin, vmid, vmax])
+            # https://mne.tools/stable/generated/mne.viz.plot_brain_colorbar.html
+            mne.viz.plot_brain_colorbar(
+                self.cax,
+                clim,
+                colormap=colormap,
+                transparent=False,
+                orientation='vertical',
+                label='µV',
+                bgcolor='0'
+            )
+
+    def interpolate(self, plotting_data):
+        """
+        Calculates topomap images from electrode data.
+
+        Parameters:
+            plotting_data: numpy.ndarray
+                Data of shape (num_channels, ) for a single frame or (num_channels, num_frames)
+                for multiple frames, in volts.
+
+        Returns:
+            numpy.ndarray:
+                Images of shape (res, res) or (num_frames, res, res).
+        """
+        if plotting_data.ndim == 1:
+            return (self.weights @ plotting_data + self.offset).reshape(self.res, self.res)
+
+        images = self.weights @ plotting_data + self.offset[:, np.newaxis]
+        return images.T.reshape(-1, self.res, self.res)
+
+    def draw_contours(self, image_data):
+        """
+        Replaces the contour lines on the topomap.
+
+        Parameters:
+            image_data: numpy.ndarray
+                The (res, res) topomap image to draw the contours of.
+
+        Returns:
+            list:
+                The line collections of the new contours.
+        """
+        if self.contour_set is not None:
+            for col in self.contour_set.collections:
+                col.remove()
+        self.contour_set = self.ax.contour(
+            self.grid[0], self.grid[1], image_data, self.contours,
+            colors='k', linewidths=0.5
+        )
+        for col in self.contour_set.collections:
+            col.set_clip_path(self.image.get_clip_path())
+        return list(self.contour_set.collections)
+
+    def update(self, plotting_data, frame_time=None):
+        """
+        Draws a new frame on the topomap.
+
+        Parameters:
+            plotting_data: numpy.ndarray
+                Data of shape (num_channels, ) in volts.
+            frame_time: float or None
+                The time of the frame in seconds to show in the timestamp. Defaults to None.
+
+        Returns:
+            list:
+                The artists that were changed.
+        """
+        image_data = self.interpolate(plotting_data)
+        self.image.set_data(image_data)
+        changed = [self.image]
+
+        if self.contours:
+            changed += self.draw_contours(image_data)
+
+        if self.timestamp_text is not None and frame_time is not None:
+            self.timestamp_text.set_text(get_timestamp_text(frame_time))
+            changed.append(self.timestamp_text)
+
+        return changed
+
+
 def animate_topomap_2d(epoch,
                        plotting_data=None,
                        colormap='RdBu_r',
@@ -388,64 +686,35 @@ def animate_topomap_2d(epoch,
         plotting_data = epoch.data
     
     ms_between_frames = 1000 / frame_rate
-    fig, ax = plt.subplots()
 
-    # Need to get the axis scale since it varies with different data
-    if colorbar or timestamps or sphere=="auto":
-        ax_lims = get_axis_lims(epoch)
-    
-    if sphere=="auto":
-        sphere=ax_lims[0] * -0.95
-    
-    if colorbar:
-        ax_divider = make_axes_locatable(ax)
-        vmid = (vmin+vmax)/2
-        clim = dict(kind='value', lims=[vmin, vmid, vmax])
+    # The head, sensors, colorbar and interpolation are only calculated once,
+    # each frame only updates the image data (and contours/timestamp)
+    renderer = TopomapRenderer(
+        epoch,
+        plotting_data=plotting_data[:, 0],
+        colormap=colormap,
+        mark=mark,
+        vmin=vmin,
+        vmax=vmax,
+        sphere=sphere,
+        colorbar=colorbar,
+        timestamp=timestamp,
+        **kwargs
+    )
 
     # Internal animation function to be called later
     def animate(frame_number):
-        #if frame_number != 0:
-        fig.clear()
-        ax.clear()
-        
-        topomap_2d = plot_topomap_2d(
-            epoch=epoch,
-            plotting_data=plotting_data[:, frame_number],
-            colormap=colormap,
-            mark=mark,
-            vmin = vmin,
-            vmax = vmax,
-            timestamp = False,
-            colorbar=False,
-            sphere=sphere,
-            **kwargs
-        )
-        
+        frame_time = None
         if timestamp:
-            add_timestamp(epoch, ax_lims[0], ax_lims[1], frame_number)
-
-        if colorbar:
-            cax = ax_divider.append_axes("right", size=0.1, pad="0%")
-            # https://mne.tools/stable/generated/mne.viz.plot_brain_colorbar.html
-            mne.viz.plot_brain_colorbar(
-                cax,
-                clim,
-                colormap=colormap,
-                transparent=False,
-                orientation='vertical',
-                label='µV',
-                bgcolor='0'
-            )
-        
-            
-        return [fig]
+            frame_time = epoch.times[frame_number]
+        return renderer.update(plotting_data[:, frame_number], frame_time)
 
     ani = animation.FuncAnimation(
-        fig,
+        renderer.fig,
         animate,
         frames=frames_to_show,
         interval=ms_between_frames,
         blit=True
     )
 
-    return ani
\ No newline at end of file
+    return ani
@@ -1,16 +1,102 @@
 import os
 import os.path as op
+import hashlib
+import warnings
 import mne
 import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
 from mne.datasets import fetch_fsaverage
 from mne.minimum_norm import make_inverse_operator
-from mne.minimum_norm import apply_inverse_epochs
-from mne.minimum_norm import apply_inverse
+from mne.minimum_norm.inverse import (
+    _assemble_kernel,
+    _check_ch_names,
+    _check_or_prepare,
+    _check_reference,
+    _pick_channels_inverse_operator,
+    _subject_from_inverse,
+    combine_xyz,
+)
+from mne.io.constants import FIFF
+from mne.source_estimate import _get_src_type, _make_stc
+from mne.morph import _hemi_morph
+from mne.source_space import _check_spacing, _create_surf_spacing
+from mne.surface import read_curvature
+from mne.utils import _check_subject, get_subjects_dir
+from mne.viz._3d import _linearize_map, _process_clim, _separate_map, _set_aspect_equal
+from scipy import sparse, stats
+from collections import OrderedDict
 import matplotlib.gridspec as gridspec
 from matplotlib.transforms import Bbox
 import matplotlib.animation as animation
+from simpl_eeg import export, layout
+
+# Most recently used inverse operators, keyed by the forward, the data used for
+# the noise covariance and the make_inverse_operator() arguments
+INVERSE_CACHE = OrderedDict()
+INVERSE_CACHE_SIZE = 4
+
+# Camera angles of each view for the matplotlib backend, the same as used by
+# mne.SourceEstimate.plot()
+BRAIN_VIEWS = {
+    'lh': {'lat': {'elev': 0, 'azim': 180},
+           'med': {'elev': 0, 'azim': 0},
+           'ros': {'elev': 0, 'azim': 90},
+           'cau': {'elev': 0, 'azim': -90},
+           'dor': {'elev': 90, 'azim': -90},
+           'ven': {'elev': -90, 'azim': -90},
+           'fro': {'elev': 0, 'azim': 106.739},
+           'par': {'elev': 30, 'azim': -120}},
+    'rh': {'lat': {'elev': 0, 'azim': 0},
+           'med': {'elev': 0, 'azim': 180},
+           'ros': {'elev': 0, 'azim': 90},
+           'cau': {'elev': 0, 'azim': -90},
+           'dor': {'elev': 90, 'azim': -90},
+           'ven': {'elev': -90, 'azim': -90},
+           'fro': {'elev': 16.739, 'azim': 60},
+           'par': {'elev': 30, 'azim': -60}}
+}
+
+# Colormap and the grey values of concave and convex surfaces of each cortex style,
+# the same shades as mne.SourceEstimate.plot() ('classic' as its matplotlib backend)
+CORTEX_COLORMAPS = {
+    'classic': ('Greys', 0.33, 0.66),
+    'high_contrast': ('Greys', 0.1 / 1.4, 1.1 / 1.4),
+    'low_contrast': ('Greys', 0.5, 0.6),
+    'bone': ('bone_r', 0.2 / 2.2, 1.2 / 2.2)
+}
+
+# animate_matplot_brain arguments of mne.SourceEstimate.plot() that only apply to
+# the 3D backends
+UNSUPPORTED_BRAIN_KWARGS = [
+    'time_label', 'time_unit', 'title', 'volume_options', 'show_traces', 'src', 'verbose'
+]
+
+# Surface meshes of each hemisphere, keyed by the subject, surface and spacing
+BRAIN_GEOMETRY_CACHE = {}
+
+# Smoothing operators, keyed by the mesh, source vertices and smoothing steps
+SMOOTHING_CACHE = {}
+
+def format_timestamp_brain(frame_time):
+    """
+    Helper function for add_timestamp_brain and BrainRenderer. Formats a time of the
+    stc as a timestamp.
+
+    Parameters:
+        frame_time: float
+            The time in seconds.
+
+    Returns:
+        str:
+            The timestamp.
+    """
+    tstamp = format(frame_time, '.4f')
+    if float(frame_time) >= 0:
+        return 'time:  {}'.format(tstamp) + 's'
+    else:
+        return 'time: {}'.format(tstamp) + 's'
+
 
 def add_timestamp_brain(stc, figure, frame_number, xpos, ypos, fontsize):
     """
@@ -35,16 +121,9 @@ def add_timestamp_brain(stc, figure, frame_number, xpos, ypos, fontsize):
         fontsize:
             The size to generate the font.
     """
-    frame_time = stc.times[frame_number]
-    tstamp = format(frame_time, '.4f')
-    if float(frame_time) >= 0:
-        time_str = 'time:  {}'.format(tstamp) + 's'
-    else:
-        time_str = 'time: {}'.format(tstamp) + 's'
-        
     figure.text(xpos,
                 ypos,
-                time_str,
+                format_timestamp_brain(stc.times[frame_number]),
                 fontsize=fontsize,
                 color = 'white',
                 clip_on=True)
@@ -86,9 +165,9 @@ def calculate_cbar_dims(img_width, img_figsize, img_height):
 
 def convert_figure_to_image(fig, img_height, img_width):
     """
-    Helper for animate_matplot_brain. Converts figure to image when plotting multiple
-    views and then cuts out the empty space. This must be done when animating to
-    preserve the figure dimensions as they otherwise get cut-off.
+    Converts a figure of multiple brain views to an image and then cuts out the empty
+    space, e.g. to save the views as a single image with the figure dimensions preserved.
+    animate_matplot_brain no longer uses it since BrainRenderer draws each view once.
 
     Parameters:
         fig: matplotlib.figure.Figure
@@ -100,12 +179,11 @@ def convert_figure_to_image(fig, img_height, img_width):
 
     Returns:
         plot_image: numpy.ndarray
-            Image built from figure that will be animated.
+            Image built from figure that will be animated. A view of the figure's
+            reused Agg buffer (see export.render_figure), so it is overwritten
+            when the figure is drawn again.
     """
-
-    fig.canvas.draw()
-    plot_image = np.frombuffer(fig.canvas.tostring_rgb(), dtype=np.uint8)
-    plot_image = plot_image.reshape(fig.canvas.get_width_height()[::-1] + (3,))
+    plot_image = export.figure_to_array(fig)
 
     cropped_height = round(plot_image.shape[0] * (img_height / img_width))
     cropped_height = plot_image.shape[1] - cropped_height
@@ -181,16 +259,140 @@ def calculate_clim_values(vmin, vmid, vmax, colormap_limit_type):
             )
     return clim_values
 
-def create_fsaverage_forward(epoch, **kwargs):
+def get_forward_cache_key(info, src, bem, trans='fsaverage', **kwargs):
+    """
+    Helper function for create_fsaverage_forward that builds the forward cache key.
+    The key is a hash of the names and positions of the channels, the source space,
+    BEM and transformation files (path, size and modification time) and the
+    arguments of mne.make_forward_solution() that change the result (e.g. mindist).
+
+    Parameters:
+        info: mne.Info
+            Info containing the channel locations.
+        src: str
+            Path to the source space file.
+        bem: str
+            Path to the BEM solution file.
+        trans: str
+            The 'trans' parameter in the mne.make_forward_solution() function.
+            Defaults to 'fsaverage'.
+        kwargs: arguments
+            The arguments passed to mne.make_forward_solution().
+
+    Returns:
+        str:
+            Hexadecimal cache key
+    """
+    fingerprint = [layout.get_layout_fingerprint(info), trans]
+
+    for file_path in (src, bem):
+        file_stat = os.stat(file_path)
+        fingerprint.append((op.abspath(file_path), file_stat.st_size, file_stat.st_mtime_ns))
+
+    # the number of jobs and verbosity don't change the forward solution
+    fingerprint.append(sorted(
+        (key, value) for key, value in kwargs.items() if key not in ('n_jobs', 'verbose')
+    ))
+
+    return hashlib.sha1(repr(fingerprint).encode("utf-8")).hexdigest()
+
+
+def load_forward_cache(cache_dir, cache_key):
+    """
+    Helper function for create_fsaverage_forward that reads a forward cache entry
+    and marks it as recently used. Returns None if no readable entry exists.
+
+    Parameters:
+        cache_dir: str
+            Folder of the forward cache.
+        cache_key: str
+            The key from get_forward_cache_key().
+
+    Returns:
+        mne.forward.forward.Forward or None:
+            The cached forward operator.
+    """
+    fwd_path = op.join(cache_dir, cache_key + "-fwd.fif")
+
+    try:
+        fwd = mne.read_forward_solution(fwd_path, verbose=False)
+        os.utime(fwd_path)
+    except (OSError, ValueError):
+        # missing, or removed by another process in the meantime
+        return None
+
+    print("loaded forward from cache " + fwd_path)
+    return fwd
+
+
+def save_forward_cache(cache_dir, cache_key, fwd, max_cache_size=1e9):
+    """
+    Helper function for create_fsaverage_forward that writes a forward cache entry.
+    The entry is written under a temporary name and renamed once complete so
+    concurrent readers never see partial files. Afterwards the least recently
+    used entries are removed until the cache is no larger than max_cache_size.
+
+    Parameters:
+        cache_dir: str
+            Folder of the forward cache.
+        cache_key: str
+            The key from get_forward_cache_key().
+        fwd: mne.forward.forward.Forward
+            The forward operator to save.
+        max_cache_size: int or float
+            Maximum total size of the cache in bytes. Defaults to 1e9.
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    fwd_path = op.join(cache_dir, cache_key + "-fwd.fif")
+    tmp_path = op.join(cache_dir, "{}.{}.tmp-fwd.fif".format(cache_key, os.getpid()))
+
+    mne.write_forward_solution(tmp_path, fwd, overwrite=True, verbose=False)
+    os.replace(tmp_path, fwd_path)
+
+    entries = []
+    for f in os.listdir(cache_dir):
+        entry_path = op.join(cache_dir, f)
+        if f.endswith("-fwd.fif") and ".tmp" not in f and entry_path != fwd_path:
+            try:
+                entry_stat = os.stat(entry_path)
+            except OSError:
+                continue
+            entries.append((entry_stat.st_mtime, entry_stat.st_size, entry_path))
+
+    cache_size = os.stat(fwd_path).st_size + sum(entry[1] for entry in entries)
+    for mtime, size, entry_path in sorted(entries):
+        if cache_size <= max_cache_size:
+            break
+        try:
+            os.remove(entry_path)
+        except OSError:
+            pass
+        cache_size -= size
+
+
+def create_fsaverage_forward(epoch, cache_dir='auto', max_cache_size=1e9, **kwargs):
     """
     A forward model is an estimation of the potential or field distribution for a known source
     and for a known model of the head. Returns EEG forward operator with a downloaded template
     MRI (fsaverage).
 
+    Forward operators are cached on disk in MNE's -fwd.fif format, keyed by the channel names
+    and positions, the source space and the mne.make_forward_solution() arguments, so they are
+    only calculated once for each montage.
+
     Parameters:
         epoch: mne.epochs.Epochs
                 MNE epoch object containing portions of raw EEG data built around specified timestamp(s).
 
+        cache_dir: str or None
+                Folder to cache forward operators in. If 'auto' a 'forward_cache' folder next to the
+                downloaded fsaverage files is used. If None forward operators are not cached.
+                Defaults to 'auto'.
+
+        max_cache_size: int or float
+                Maximum total size of the cache in bytes, the least recently used forward
+                operators are removed first. Defaults to 1e9.
+
         kwargs: arguments
                 Specify any of the following arguments for the mne.make_forward_solution() function. These include midist=5.0, n_jobs=1.
 
@@ -210,6 +412,15 @@ def create_fsaverage_forward(epoch, **kwargs):
     src = op.join(fs_dir, 'bem', 'fsaverage-ico-5-src.fif')
     bem = op.join(fs_dir, 'bem', 'fsaverage-5120-5120-5120-bem-sol.fif')
 
+    if cache_dir == 'auto':
+        cache_dir = op.join(subjects_dir, 'forward_cache')
+
+    if cache_dir is not None:
+        cache_key = get_forward_cache_key(epoch.info, src, bem, trans, **kwargs)
+        fwd = load_forward_cache(cache_dir, cache_key)
+        if fwd is not None:
+            return fwd
+
     # Make forward
     fwd = mne.make_forward_solution(epoch.info,
                                     trans=trans,
@@ -218,6 +429,9 @@ def create_fsaverage_forward(epoch, **kwargs):
                                     eeg=True,
                                     **kwargs)
 
+    if cache_dir is not None:
+        save_forward_cache(cache_dir, cache_key, fwd, max_cache_size)
+
     return fwd
 
 
@@ -279,29 +493,166 @@ def create_inverse_solution(
     #             `evoked = epoch.average()`)"""
     #         )
 
-    noise_cov = mne.compute_covariance(epoch, method=covariance_method)
+    inverse_operator = get_inverse_operator(
+        epoch, fwd, covariance_method=covariance_method, loose=loose, depth=depth
+    )
+
+    # only the first epoch is used
+    stc = apply_inverse_batch(
+        epoch,
+        inverse_operator,
+        snr=snr,
+        apply_inverse_method=apply_inverse_method,
+        pick_ori=pick_ori,
+        epoch_numbers=[0]
+    )[0]
+
+    return stc
 
-    inverse_operator = make_inverse_operator(epoch.info, fwd, noise_cov,
-                                             loose=loose, depth=depth)
 
-    lambda2 = 1.0 / snr ** 2
+def get_inverse_operator(epoch, fwd, covariance_method=['empirical', 'shrunk'], loose=0.2,
+                         depth=0.8):
+    """
+    Helper function for create_inverse_solution. Calculates the noise covariance of the
+    epoch and the inverse operator, or returns them from the cache if the same forward,
+    data and arguments were used before.
 
-    if isinstance(epoch, mne.epochs.Epochs):
-        stc = apply_inverse_epochs(epoch,
-                                   inverse_operator=inverse_operator,
-                                   lambda2=lambda2,
-                                   method=apply_inverse_method,
-                                   pick_ori=pick_ori)
-        stc = stc[0]
+    Parameters:
+        epoch: mne.epochs.Epochs or mne.evoked.EvokedArray
+            MNE epochs or evoked object to calculate the noise covariance from.
 
-    elif isinstance(epoch, mne.evoked.EvokedArray):
-        stc = apply_inverse(epoch,
-                            inverse_operator=inverse_operator,
-                            lambda2=lambda2,
-                            method=apply_inverse_method,
-                            pick_ori=pick_ori)
+        fwd: mne.forward.forward.Forward
+            Specifies the 'forward' parameter in the mne.minimum_norm.make_inverse_operator() function.
+
+        covariance_method: list
+            Specifies the 'method' parameter in the mne.compute_covariance() function.
+
+        loose: float
+            Specifies the 'loose' parameter in the mne.minimum_norm.make_inverse_operator() function.
+
+        depth: float
+            Specifies the 'depth' parameter in the mne.minimum_norm.make_inverse_operator() function.
+
+    Returns:
+        mne.minimum_norm.InverseOperator:
+            The inverse operator.
+    """
+    fwd_hash = hashlib.sha1(repr(fwd['info']['ch_names']).encode("utf-8"))
+    fwd_hash.update(np.ascontiguousarray(fwd['sol']['data']).tobytes())
+
+    data_hash = hashlib.sha1(layout.get_layout_fingerprint(epoch.info).encode("utf-8"))
+    data_hash.update(np.ascontiguousarray(epoch.get_data()).tobytes())
+
+    key = (fwd_hash.hexdigest(), data_hash.hexdigest(), repr(covariance_method), loose, depth)
+
+    if key in INVERSE_CACHE:
+        INVERSE_CACHE.move_to_end(key)
+    else:
+        noise_cov = mne.compute_covariance(epoch, method=covariance_method)
+        INVERSE_CACHE[key] = make_inverse_operator(epoch.info, fwd, noise_cov,
+                                                   loose=loose, depth=depth)
+        while len(INVERSE_CACHE) > INVERSE_CACHE_SIZE:
+            INVERSE_CACHE.popitem(last=False)
+
+    return INVERSE_CACHE[key]
+
+
+def apply_inverse_batch(
+        epoch,
+        inverse_operator,
+        snr=3.0,
+        apply_inverse_method="dSPM",
+        pick_ori='normal',
+        epoch_numbers=None,
+        stream=False):
+    """
+    Applies an inverse operator to one, many or all epochs at once. The imaging kernel
+    is assembled once and multiplied with the data of all requested epochs, giving the
+    same source estimates as mne.minimum_norm.apply_inverse_epochs() (for epochs) or
+    mne.minimum_norm.apply_inverse() (for evoked data).
+
+    Parameters:
+        epoch: mne.epochs.Epochs or mne.evoked.EvokedArray
+            MNE epochs or evoked object to calculate the source estimates for.
+
+        inverse_operator: mne.minimum_norm.InverseOperator
+            The inverse operator, see get_inverse_operator().
+
+        snr: float
+            Used to calculate 'lambda2' in the equation 'lambda2 = 1.0 / snr ** 2'.
+
+        apply_inverse_method: str
+            Specifies the 'method' parameter in mne.minimum_norm.apply_inverse_epochs().
+
+        pick_ori: str
+            Specifies the 'pick_ori' parameter in mne.minimum_norm.apply_inverse_epochs().
+
+        epoch_numbers: list or None
+            The epochs to calculate source estimates for. Defaults to None for all epochs.
+
+        stream: bool
+            Whether to return a generator calculating the source estimates one epoch at a
+            time instead of a list, so they are never all held in memory. Defaults to False.
+
+    Returns:
+        list or generator of mne.source_estimate.SourceEstimate:
+            The source estimate of each requested epoch.
+    """
+    is_evoked = isinstance(epoch, mne.evoked.Evoked)
+
+    if is_evoked:
+        _check_reference(epoch, inverse_operator['info']['ch_names'])
+        nave = epoch.nave
+    else:
+        nave = 1
+        if epoch_numbers is not None:
+            epoch = epoch[epoch_numbers]
+
+    _check_ch_names(inverse_operator, epoch.info)
+    inv = _check_or_prepare(inverse_operator, nave, 1.0 / snr ** 2,
+                            apply_inverse_method, None, False)
+    sel = _pick_channels_inverse_operator(epoch.ch_names, inv)
+    K, noise_norm, vertno, source_nn = _assemble_kernel(
+        inv, None, apply_inverse_method, pick_ori)
+
+    is_free_ori = (inv['source_ori'] == FIFF.FIFFV_MNE_FREE_ORI and
+                   pick_ori != 'normal')
+    if noise_norm is not None:
+        if is_free_ori and pick_ori == 'vector':
+            noise_norm = noise_norm.repeat(3, axis=0)
+        if not is_free_ori:
+            # premultiply the kernel with the noise normalization
+            K = K * noise_norm
+
+    stc_params = dict(
+        vertices=vertno,
+        tmin=float(epoch.times[0]),
+        tstep=1.0 / epoch.info['sfreq'],
+        subject=_subject_from_inverse(inv),
+        vector=(pick_ori == 'vector'),
+        source_nn=source_nn,
+        src_type=_get_src_type(inv['src'], vertno)
+    )
+
+    def make_stc(sol):
+        if is_free_ori:
+            if pick_ori != 'vector':
+                sol = combine_xyz(sol)
+            if noise_norm is not None:
+                sol *= noise_norm
+        return _make_stc(sol, **stc_params)
+
+    if is_evoked:
+        data = epoch.data[np.newaxis, sel]
+    else:
+        data = epoch.get_data()[:, sel]
+
+    if stream:
+        return (make_stc(K @ epoch_data) for epoch_data in data)
+
+    # one matrix product for all epochs
+    return [make_stc(sol) for sol in np.matmul(K, data)]
 
-    return stc
 
 def create_inverse_solution_auto(stc = 'auto', fwd = 'auto', epoch = None):
     """
@@ -385,6 +736,7 @@ def plot_topomap_3d_brain(
         smoothing_steps=3,
         timestamp=True,
         figure=None,
+        cache_dir='auto',
         **kwargs):
     """
     Creates a still image figure of the epochs or stc data mapped to the brain using the 
@@ -499,7 +851,7 @@ def plot_topomap_3d_brain(
 
         smoothing_steps: int
             Specifies the 'smoothing_steps' parameter in the mne.SourceEstimate.plot() function. "The amount of smoothing".
-            3 by default.
+            With the matplotlib backend the smoothing operators are cached, see get_smoothing_operator(). 3 by default.
         
         timestamp: bool
             Specifies whether or not to show the timestamp on the plot relative to the time in the epoch that
@@ -512,6 +864,10 @@ def plot_topomap_3d_brain(
             with the given id. If an instance of matplotlib figure, mpl backend is used for plotting." NOTE that if plotting
             multiple views OR a split/both hemi with the matplotlib backend then this argument will not work. None by default.
 
+        cache_dir: str or None
+            Folder to cache the smoothing operators of the matplotlib backend in, see BrainRenderer.
+            Defaults to 'auto' to use a 'smoothing_cache' folder in the subjects_dir.
+
     Returns:
         matplotlib.figure.Figure or mne.viz.figure
             If using 'matplotlib' backend (default) then returns a matplotlib.figure.Figure. If using 'pyvista'
@@ -666,6 +1022,30 @@ def plot_topomap_3d_brain(
         colorbar = colorbar,
         figure=figure
     ):
+        # The matplotlib backend smooths with the same cached operators as animate_matplot_brain
+        if backend == 'matplotlib':
+            renderer = BrainRenderer(
+                plot_stc,
+                views=views,
+                hemi=hemi,
+                colormap=colormap,
+                colorbar=colorbar,
+                clim=clim_values,
+                spacing=spacing,
+                smoothing_steps=smoothing_steps,
+                timestamp=False,
+                size=img_figsize * 100,
+                surface=kwargs['surface'],
+                subject=kwargs['subject'],
+                subjects_dir=kwargs['subjects_dir'],
+                transparent=kwargs['transparent'],
+                cortex=kwargs['cortex'],
+                alpha=kwargs['alpha'],
+                figure=figure,
+                cache_dir=cache_dir
+            )
+            return renderer.fig
+
         plt.show(block=True)
         brain = plot_stc.plot(
             views=views,
@@ -700,9 +1080,6 @@ def plot_topomap_3d_brain(
         
         brain = make_plot(views=views[0])
         
-        if colorbar == False:
-            brain.axes[1].remove()
-        
         if timestamp:
             add_timestamp_brain(gen_stc, brain, recording_number, 0.18, 0.94, 15)
 
@@ -848,6 +1225,444 @@ def save_animated_topomap_3d_brain(
                      time_viewer=time_viewer)
 
 
+def get_brain_geometry(subject, subjects_dir, hemi, surface='inflated', spacing='oct6'):
+    """
+    Helper function for BrainRenderer. Reads the surface mesh of a hemisphere the same
+    way as mne.SourceEstimate.plot() with the matplotlib backend. Results are cached per
+    subject, surface and spacing.
+
+    Parameters:
+        subject: str
+            The name of the subject.
+
+        subjects_dir: str
+            The folder containing the subject's FreeSurfer files.
+
+        hemi: str
+            The hemisphere to read, either 'lh' or 'rh'.
+
+        surface: str
+            The surface to plot the data on. Defaults to 'inflated'.
+
+        spacing: str
+            The spacing of the plotted vertices, either 'all' or 'ico#'/'oct#'. Defaults to 'oct6'.
+
+    Returns:
+        dict:
+            The 'coords' and 'faces' of the plotted mesh, the surface vertices it uses
+            ('inuse'), the triangles of the full sphere ('tris') used for smoothing
+            and the binarized curvature ('curv') of the plotted vertices.
+    """
+    key = (subjects_dir, subject, hemi, surface, spacing)
+
+    if key not in BRAIN_GEOMETRY_CACHE:
+        surf_dir = op.join(subjects_dir, subject, 'surf')
+        surf_path = op.join(surf_dir, '{}.{}'.format(hemi, surface))
+        if spacing == 'all':
+            coords, faces = mne.read_surface(surf_path)
+            inuse = np.arange(len(coords))
+        else:
+            stype, sval, ico_surf, src_type_str = _check_spacing(spacing)
+            surf = _create_surf_spacing(surf_path, hemi, subject, stype, ico_surf, subjects_dir)
+            inuse = surf['vertno']
+            coords = surf['rr'][inuse]
+            faces = surf['use_tris']
+            faces = stats.rankdata(faces, 'dense').reshape(faces.shape).astype(int) - 1
+
+        tris = mne.read_surface(op.join(surf_dir, '{}.sphere.reg'.format(hemi)))[1]
+        curv = read_curvature(op.join(surf_dir, '{}.curv'.format(hemi)), binary=False)[inuse]
+
+        BRAIN_GEOMETRY_CACHE[key] = {
+            'coords': coords,
+            'faces': faces,
+            'inuse': inuse,
+            'tris': tris,
+            'curv': np.clip(np.array(curv > 0, np.int64), 0.33, 0.66)
+        }
+
+    return BRAIN_GEOMETRY_CACHE[key]
+
+
+def get_smoothing_cache_key(geometry, vertices, smoothing_steps):
+    """
+    Helper function for get_smoothing_operator that builds the smoothing cache key.
+    The key is a hash of the plotted mesh, the triangles used for smoothing, the
+    source vertices and the number of smoothing steps, so it identifies the subject,
+    surface, spacing and hemisphere without depending on where the files are.
+
+    Parameters:
+        geometry: dict
+            The hemisphere's mesh as returned by get_brain_geometry().
+
+        vertices: numpy.ndarray
+            The surface vertices of the hemisphere's sources (stc.vertices).
+
+        smoothing_steps: int
+            The amount of smoothing.
+
+    Returns:
+        str:
+            Hexadecimal cache key
+    """
+    sha1 = hashlib.sha1(repr(smoothing_steps).encode("utf-8"))
+    for array in (geometry['faces'], geometry['inuse'], geometry['tris'], vertices):
+        array = np.ascontiguousarray(array, dtype=np.int64)
+        sha1.update(repr(array.shape).encode("utf-8"))
+        sha1.update(array.tobytes())
+    return sha1.hexdigest()
+
+
+def get_smoothing_operator(geometry, vertices, smoothing_steps, cache_dir=None):
+    """
+    Helper function for BrainRenderer. Calculates the sparse matrix mapping the source
+    values of a hemisphere to the mean smoothed value of each face of the plotted mesh,
+    so all frames can be coloured with a single matrix product.
+
+    Operators are cached in memory and, if a cache_dir is given, on disk in scipy's
+    .npz format, so they are only calculated once for each subject, spacing, number
+    of smoothing steps and hemisphere.
+
+    Parameters:
+        geometry: dict
+            The hemisphere's mesh as returned by get_brain_geometry().
+
+        vertices: numpy.ndarray
+            The surface vertices of the hemisphere's sources (stc.vertices).
+
+        smoothing_steps: int
+            The amount of smoothing.
+
+        cache_dir: str or None
+            Folder to cache smoothing operators in. Defaults to None to only cache
+            them in memory.
+
+    Returns:
+        scipy.sparse.csr_matrix:
+            The (n_faces, n_sources) smoothing operator.
+    """
+    cache_key = get_smoothing_cache_key(geometry, vertices, smoothing_steps)
+
+    if cache_key in SMOOTHING_CACHE:
+        return SMOOTHING_CACHE[cache_key]
+
+    if cache_dir is not None:
+        operator_path = op.join(cache_dir, cache_key + "-smooth.npz")
+        try:
+            SMOOTHING_CACHE[cache_key] = sparse.load_npz(operator_path).tocsr()
+            return SMOOTHING_CACHE[cache_key]
+        except (OSError, ValueError):
+            # not calculated yet
+            pass
+
+    morph = _hemi_morph(
+        geometry['tris'], geometry['inuse'], vertices, smoothing_steps, maps=None, warn=True
+    )
+
+    faces = geometry['faces']
+    face_mean = sparse.csr_matrix(
+        (
+            np.full(faces.size, 1 / faces.shape[1]),
+            (np.repeat(np.arange(len(faces)), faces.shape[1]), faces.ravel())
+        ),
+        shape=(len(faces), morph.shape[0])
+    )
+    operator = (face_mean @ morph).tocsr()
+
+    if cache_dir is not None:
+        # written under a temporary name so concurrent readers never see partial files
+        os.makedirs(cache_dir, exist_ok=True)
+        tmp_path = op.join(cache_dir, "{}.{}.tmp-smooth.npz".format(cache_key, os.getpid()))
+        sparse.save_npz(tmp_path, operator)
+        os.replace(tmp_path, operator_path)
+
+    SMOOTHING_CACHE[cache_key] = operator
+    return operator
+
+
+class BrainRenderer:
+    """
+    A persistent matplotlib plot of an stc on the brain for rendering many frames.
+    The surface meshes of every hemisphere and view, the colorbar and the timestamp
+    are drawn once and each new frame only updates the face colours of the meshes.
+
+    Attributes:
+        fig: matplotlib.figure.Figure
+            The figure containing the plot.
+        axes: {str: [mpl_toolkits.mplot3d.axes3d.Axes3D]}
+            The axis of every view, keyed by the hemisphere.
+        collections: {str: [mpl_toolkits.mplot3d.art3d.Poly3DCollection]}
+            The surface mesh of every view, keyed by the hemisphere.
+        operators: {str: scipy.sparse.csr_matrix}
+            The smoothing operator of each hemisphere, see get_smoothing_operator().
+        face_values: {str: numpy.ndarray}
+            The (n_faces, n_times) smoothed values of each hemisphere's faces.
+        curv_colors: {str: numpy.ndarray}
+            The (n_faces, 3) colour of the curvature of each hemisphere's faces.
+        alpha: float
+            The opacity of the brain.
+        cmap: matplotlib.colors.Colormap
+            The colormap of the data.
+        scale_pts: numpy.ndarray
+            The lower, middle and upper limits of the colormap.
+        colorbar: matplotlib.colorbar.Colorbar or None
+            The colorbar of the plot.
+        timestamp_text: matplotlib.text.Text or None
+            The timestamp of the plot.
+
+    Methods:
+        update(frame_number):
+            Draws a new time of the stc and returns the changed artists.
+    """
+
+    def __init__(
+        self,
+        stc,
+        views=['lat', 'dor', 'fro'],
+        hemi='both',
+        colormap='mne',
+        colorbar=True,
+        clim='auto',
+        spacing='oct6',
+        smoothing_steps=3,
+        timestamp=True,
+        size=200,
+        surface='inflated',
+        subject=None,
+        subjects_dir=None,
+        transparent=False,
+        cortex='classic',
+        alpha=1.0,
+        figure=None,
+        geometry=None,
+        cache_dir='auto'
+    ):
+        """
+        Draws the first time of the stc.
+
+        Parameters:
+            stc: mne.source_estimate.SourceEstimate
+                The stc to plot.
+
+            views: str or list
+                Any combination of 'lat', 'med', 'ros', 'cau', 'dor', 'ven', 'fro' and 'par',
+                drawn from left to right. Defaults to ['lat', 'dor', 'fro'].
+
+            hemi: str
+                One of 'lh', 'rh', 'both' or 'split'. 'both' and 'split' draw the left
+                hemisphere above the right one. Defaults to 'both'.
+
+            colormap: str or np.ndarray of float, shape(n_colors, 3 | 4)
+                The colormap as used in mne.SourceEstimate.plot(). Defaults to 'mne'.
+
+            colorbar: bool
+                Whether to draw a colorbar. Defaults to True.
+
+            clim: str or dict
+                The colormap limits as used in mne.SourceEstimate.plot(), see
+                calculate_clim_values(). 'auto' limits are calculated once from all
+                times of the stc. Defaults to 'auto'.
+
+            spacing: str
+                The spacing of the plotted vertices, either 'all' or 'ico#'/'oct#'. Defaults to 'oct6'.
+
+            smoothing_steps: int
+                The amount of smoothing. Defaults to 3.
+
+            timestamp: bool
+                Whether to show the time of the frame. Defaults to True.
+
+            size: int
+                The height and width of each view in pixels, rounded to the closest
+                inch (100 pixels). Defaults to 200.
+
+            surface: str
+                The surface to plot the data on. Defaults to 'inflated'.
+
+            subject: str or None
+                The name of the subject. Defaults to None to use stc.subject.
+
+            subjects_dir: str or None
+                The folder containing the subject's FreeSurfer files. Defaults to None
+                to use the SUBJECTS_DIR environment variable.
+
+            transparent: bool
+                Whether values below the lower colormap limit are transparent. Defaults to False.
+
+            cortex: str
+                The colours of the curvature, one of 'classic', 'high_contrast',
+                'low_contrast' or 'bone'. Defaults to 'classic'.
+
+            alpha: float
+                The opacity of the brain. Defaults to 1.0.
+
+            figure: matplotlib.figure.Figure or None
+                The figure to draw in. Defaults to None to create a new figure sized by
+                the size, views and hemi.
+
+            geometry: dict or None
+                The mesh of each hemisphere ('lh'/'rh') as returned by get_brain_geometry().
+                Defaults to None to read them from the subject's files.
+
+            cache_dir: str or None
+                Folder to cache the smoothing operators in, see get_smoothing_operator().
+                If 'auto' a 'smoothing_cache' folder in the subjects_dir is used when the
+                meshes are read from the subject's files. Defaults to 'auto'.
+        """
+        if isinstance(views, str):
+            views = [views]
+
+        if hemi not in ['lh', 'rh', 'both', 'split']:
+            raise ValueError(
+                "Invalid hemi, hemi can only be one of "
+                "lh, "
+                "rh, "
+                "both, or "
+                "split"
+            )
+
+        if any(view not in BRAIN_VIEWS['lh'] for view in views):
+            raise ValueError(
+                "Invalid views, views can only contain "
+                "lat, med, ros, cau, dor, ven, fro, or par"
+            )
+
+        if cortex not in CORTEX_COLORMAPS:
+            raise ValueError(
+                "Invalid cortex, cortex can only be one of "
+                "classic, "
+                "high_contrast, "
+                "low_contrast, or "
+                "bone"
+            )
+
+        if hemi == 'both' or hemi == 'split':
+            hemis = ['lh', 'rh']
+        else:
+            hemis = [hemi]
+
+        if geometry is None:
+            subject = _check_subject(stc.subject, subject)
+            subjects_dir = get_subjects_dir(subjects_dir, raise_error=True)
+            geometry = {
+                h: get_brain_geometry(subject, subjects_dir, h, surface, spacing) for h in hemis
+            }
+            if cache_dir == 'auto':
+                cache_dir = op.join(subjects_dir, 'smoothing_cache')
+
+        if cache_dir == 'auto':
+            cache_dir = None
+
+        self.stc = stc
+        self.alpha = alpha
+
+        # The colormap limits are fixed for the whole animation
+        mapdata = _process_clim(clim, colormap, transparent, stc.data)
+        _separate_map(mapdata)
+        colormap, self.scale_pts = _linearize_map(mapdata)
+        self.cmap = plt.cm.get_cmap(colormap)
+        cortex_name, concave, convex = CORTEX_COLORMAPS[cortex]
+        greymap = plt.cm.get_cmap(cortex_name)
+
+        img_figsize = round(size / 100)
+        n_rows = len(hemis)
+        n_cols = len(views)
+        if figure is None:
+            figure = plt.figure(figsize=(img_figsize * n_cols, img_figsize * n_rows), facecolor='black')
+        self.fig = figure
+
+        self.operators = {}
+        self.face_values = {}
+        self.curv_colors = {}
+        self.axes = {}
+        self.collections = {}
+        for row, h in enumerate(hemis):
+            hemi_idx = 0 if h == 'lh' else 1
+            n_lh = len(stc.vertices[0])
+            rows = slice(0, n_lh) if h == 'lh' else slice(n_lh, None)
+
+            coords = geometry[h]['coords']
+            faces = geometry[h]['faces']
+            self.operators[h] = get_smoothing_operator(
+                geometry[h], stc.vertices[hemi_idx], smoothing_steps, cache_dir
+            )
+
+            # Smooth all frames at once
+            self.face_values[h] = np.asarray(self.operators[h] @ stc.data[rows])
+            # the binarized curvature is stored as 0.33 (concave) and 0.66 (convex)
+            convexity = (geometry[h]['curv'][faces].mean(axis=1) - 0.33) / 0.33
+            self.curv_colors[h] = greymap(concave + convexity * (convex - concave))[:, :3]
+
+            self.axes[h] = []
+            self.collections[h] = []
+            for col, view in enumerate(views):
+                ax = self.fig.add_axes(
+                    [col / n_cols, 1 - (row + 1) / n_rows, 1 / n_cols, 1 / n_rows],
+                    projection='3d'
+                )
+                collection = ax.plot_trisurf(
+                    *coords.T, triangles=faces, antialiased=False, vmin=0, vmax=1
+                )
+                ax.view_init(**BRAIN_VIEWS[h][view])
+                ax.set_facecolor('black')
+                _set_aspect_equal(ax)
+                ax.axis('off')
+                ax.set(xlim=[-80, 80], ylim=(-80, 80), zlim=[-80, 80])
+                self.axes[h].append(ax)
+                self.collections[h].append(collection)
+
+        self.colorbar = None
+        if colorbar:
+            cax = self.fig.add_axes([0.1, 0.12 / n_rows, 0.8, 0.04 / n_rows])
+            scalar_mappable = plt.cm.ScalarMappable(
+                cmap=self.cmap,
+                norm=plt.Normalize(self.scale_pts[0], self.scale_pts[2])
+            )
+            self.colorbar = self.fig.colorbar(scalar_mappable, cax=cax, orientation='horizontal')
+            cax.tick_params(colors='white', labelsize=4 * img_figsize)
+
+        self.timestamp_text = None
+        if timestamp:
+            self.timestamp_text = self.fig.text(
+                0.01, 0.99, '', fontsize=6 * img_figsize, color='white', va='top'
+            )
+
+        self.update(0)
+
+    def update(self, frame_number):
+        """
+        Colours the meshes with a new time of the stc.
+
+        Parameters:
+            frame_number: int
+                The index of the time in the stc.
+
+        Returns:
+            [matplotlib.artist.Artist]:
+                The artists that were changed
+        """
+        changed = []
+        range_ = self.scale_pts[2] - self.scale_pts[0]
+
+        for h, collections in self.collections.items():
+            values = self.face_values[h][:, frame_number]
+            colors = self.cmap((values - self.scale_pts[0]) / range_)
+
+            # alpha blend with the curvature
+            colors[:, :3] *= colors[:, [3]]
+            colors[:, :3] += self.curv_colors[h] * (1. - colors[:, [3]])
+            colors[:, 3] = self.alpha
+
+            for collection in collections:
+                collection.set_facecolor(colors)
+            changed += collections
+
+        if self.timestamp_text is not None:
+            self.timestamp_text.set_text(format_timestamp_brain(self.stc.times[frame_number]))
+            changed.append(self.timestamp_text)
+
+        return changed
+
+
 def animate_matplot_brain(
     epoch=None,
     fwd='auto',
@@ -868,11 +1683,13 @@ def animate_matplot_brain(
     smoothing_steps=3,
     timestamp=True,
     frame_rate=12,
+    cache_dir='auto',
     **kwargs
 ):
     """
     Creates an animated view of all timestamp observations an mne.epochs.Epochs data using a matplotlib backend.
-    If multiple views are used then speed becomes significantly slower. Colorbar placement may be inconsistent.
+    The brain meshes, views and colorbar are drawn once by a BrainRenderer and each frame only updates
+    the colours of the meshes. Automatic colormap limits are calculated from all the frames.
 
     Parameters:
         epoch: mne.epochs.Epoch or None
@@ -955,14 +1772,40 @@ def animate_matplot_brain(
         frame_rate: int or float
             The frame rate to render the animation at. Defautls to 12.
 
+        cache_dir: str or None
+            Folder to cache the smoothing operators in so they are only calculated once for
+            each spacing and smoothing_steps. If 'auto' a 'smoothing_cache' folder in the
+            subjects_dir is used. If None they are only cached in memory. Defaults to 'auto'.
+
+        **kwargs: various
+            Additional arguments for BrainRenderer: 'surface' (defaults to 'inflated'),
+            'subject', 'subjects_dir', 'transparent' (defaults to False), 'cortex' (defaults
+            to 'classic') and 'alpha' (defaults to 1.0). The mne.SourceEstimate.plot()
+            arguments 'time_label', 'time_unit', 'title', 'volume_options', 'show_traces',
+            'src' and 'verbose' only apply to its 3D backends, so they are ignored with a
+            warning.
+
     Returns:
         matplotlib.animation.FuncAnimation:
             Animation containing frames from all of the avalible times in the passed in epoch.
     """
 
     defaultKwargs = { 'transparent': False, 'alpha': 1.0, 'surface': 'inflated', 'cortex': 'classic',
-                 'subject': None, 'time_label': None, 'time_unit': 's', 'volume_options': None,
-                 'subjects_dir': None, 'title': None, 'show_traces': 'auto', 'src': None, 'verbose': None }
+                 'subject': None, 'subjects_dir': None }
+
+    unknown = [key for key in kwargs if key not in defaultKwargs and key not in UNSUPPORTED_BRAIN_KWARGS]
+    if unknown:
+        raise TypeError(
+            "animate_matplot_brain() got unexpected keyword arguments: " + ", ".join(unknown)
+        )
+
+    unsupported = [key for key in kwargs if key in UNSUPPORTED_BRAIN_KWARGS]
+    if unsupported:
+        warnings.warn(
+            "The following arguments only apply to the 3D backends of mne.SourceEstimate.plot() "
+            "and are ignored by animate_matplot_brain: " + ", ".join(unsupported)
+        )
+
     kwargs = { **defaultKwargs, **kwargs }
 
     if isinstance(views, str):
@@ -1000,109 +1843,32 @@ def animate_matplot_brain(
 
     ms_between_frames = 1000 / frame_rate
 
-    def plotting(figure=None, recording_number=0, cbar = False, hemi = hemi, views = views):
-        return (plot_topomap_3d_brain(stc=plot_stc,
-                                      backend='matplotlib',
-                                      hemi=hemi,
-                                      views=views,
-                                      colormap=colormap,
-                                      colorbar = cbar,
-                                      background='black',
-                                      foreground = 'white',
-                                      spacing=spacing,
-                                      smoothing_steps=smoothing_steps,
-                                      colormap_limit_type='lims',
-                                      vmin=vmin,
-                                      vmid=vmid,
-                                      vmax=vmax,
-                                      size=size,
-                                      recording_number=recording_number,
-                                      figure=figure,
-                                      time_viewer = False,
-                                      timestamp=False,
-                                      **kwargs
-                                      )
-                )
-
-    # Create animation function if using a single view
-    if (hemi == 'lh' and len(views) == 1) or (hemi == 'rh' and len(views) == 1):
-
-        fig, ax = plt.subplots(round(size/100), round(size/100))
-        
-        def animate(frame_number):
-
-            fig.clear()
-            
-            # get new image from list
-            plotting(figure=fig,
-                     recording_number=frame_number,
-                     cbar = colorbar
-                     )
-            
-            if timestamp:
-                add_timestamp_brain(plot_stc, fig, frame_number, 0.18, 0.94, 15)
-
-            return[fig]
-
-    # Create animation function if using a multi-view
-    else:
-        img_width = len(views)
-        img_figsize = round(size / 100)
-        
-        if hemi == 'lh' or hemi == 'rh':
-            img_height = 1
-        else:
-            img_height = 2
-        
-        fig, ax = plt.subplots(figsize = (img_figsize*img_width, img_figsize*img_height))
-        
-        add_colorbar = 0
-        if colorbar:
-            add_colorbar = 1
-            colorbar = False
-        
-        # Generate dummy colorbar to move to the main figure
-        if add_colorbar:
-            cbar_width, cbar_height = calculate_cbar_dims(img_width, img_figsize, img_height)
-            cbar_fig = plt.figure(figsize=(cbar_width, cbar_height))
-            plotting(figure=cbar_fig, hemi='lh', views='fro', cbar=True)
-
-        def animate(frame_number):
-            # remove previous image
-            ax.clear()
-            plt.show(block=True)
-
-            brain = plotting( 
-                recording_number=frame_number,
-                cbar = False
-            )
-            
-            if add_colorbar:
-                move_axes(cbar_fig.axes[1], brain, copy = True)
-            
-            if timestamp:
-                if img_height == 2 and img_width == 1:
-                    xpos = 0.1
-                    ypos = 0.48
-                else:
-                    ypos = 0
-                    xpos = 0.7
-                    for i in range(img_width-2):
-                        if img_width >= 3:
-                            xpos += 0.1/(2**(i))
-                
-                add_timestamp_brain(plot_stc, brain, frame_number, xpos-0.01, ypos, 6*img_figsize)
+    # The meshes, views, colorbar and timestamp are drawn once,
+    # each frame only updates the face colours and the timestamp text
+    renderer = BrainRenderer(
+        plot_stc,
+        views=views,
+        hemi=hemi,
+        colormap=colormap,
+        colorbar=colorbar,
+        clim=calculate_clim_values(vmin, vmid, vmax, colormap_limit_type),
+        spacing=spacing,
+        smoothing_steps=smoothing_steps,
+        timestamp=timestamp,
+        size=size,
+        surface=kwargs['surface'],
+        subject=kwargs['subject'],
+        subjects_dir=kwargs['subjects_dir'],
+        transparent=kwargs['transparent'],
+        cortex=kwargs['cortex'],
+        alpha=kwargs['alpha'],
+        cache_dir=cache_dir
+    )
+    fig = renderer.fig
 
-            # Convert plot to image/frame
-            plot_image = convert_figure_to_image(brain, img_height, img_width)
+    def animate(frame_number):
+        return renderer.update(frame_number)
 
-            # Remove gridlines 
-            plt.setp(ax.get_xticklabels(), visible=False)
-            plt.setp(ax.get_yticklabels(), visible=False)
-            ax.tick_params(axis='both', which='both', length=0)
-            # display new image
-            ax.imshow(plot_image)
-        
     ani = animation.FuncAnimation(
         fig,
         animate,
@@ -3,13 +3,32 @@ Module for generating and animating the topographic map in a 3D head shape
 """
 
 # import libraries
+import base64
+import io
+import json
+import multiprocessing
+import os
+
 import gif
 import mne
 import numpy as np
 import pandas as pd
 import plotly.graph_objects as go
+import plotly.io as pio
+from mne.bem import _fit_sphere
+from mne.channels.interpolation import _make_interpolation_matrix
+from mne.utils.dataframe import _convert_times, _scale_dataframe_data
+from scipy import sparse
 from scipy.interpolate import NearestNDInterpolator
-from simpl_eeg import eeg_objects
+from PIL import Image
+from scipy.spatial import ConvexHull, cKDTree
+from simpl_eeg import eeg_objects, export, montages
+
+# vertex to electrode interpolation weights, cached per set of electrodes and method
+INTERPOLATION_CACHE = {}
+
+# The figure template of the current head rendering worker process, set by init_head_worker
+HEAD_WORKER_STATE = {}
 
 
 # define the frame arguments for the animated plot
@@ -54,17 +73,9 @@ def get_standard_coord():
             A numpy array of cartesian coordinates of
             the standard node locations ("standard_1005")
     """
-    # get the dictionary of standard montage "standard_1005"
-    montage = mne.channels.make_standard_montage("standard_1005")
-
-    standard_coord_list = []
-    # get the cartesian coordinates from the standard montage dictionary
-    for key, value in montage.get_positions()["ch_pos"].items():
-        standard_coord_list.append(value.tolist())
-
-    # save the cartesian coordinates in a numpy array
-    standard_coord_array = np.array(standard_coord_list)
-    return montage, standard_coord_array
+    # the montage is only loaded once, the coordinates are shared and read only
+    geometry = montages.get_montage_geometry("standard_1005")
+    return geometry.montage, geometry.coords
 
 
 def interpolated_time(df, channel_names, node_coord, x, y, z, t):
@@ -129,6 +140,241 @@ def interpolated_time(df, channel_names, node_coord, x, y, z, t):
     return interpolate_model(np.array(list(zip(x, y, z))))
 
 
+def get_interpolation_weights(
+    node_coord, vertex_coord, method="nearest", n_neighbors=4, power=2
+):
+    """
+    Build a sparse matrix mapping EEG signals on the electrodes to the
+    locations of the head vertices
+
+    Parameters:
+        node_coord: numpy.ndarray
+            A numpy array of (x, y, z) coordinates of
+            all channels in the raw data
+        vertex_coord: numpy.ndarray
+            A numpy array of (x, y, z) coordinates of all
+            locations to interpolate to
+        method: str (optional)
+            One of "nearest" (nearest electrode), "idw" (inverse distance
+            weighting of the nearest electrodes) or "spline" (the regularized
+            spherical spline mne uses to interpolate bad channels, which
+            smooths the values at the electrodes). Defaults to "nearest".
+        n_neighbors: int (optional)
+            The number of electrodes used for each location by "idw".
+            Defaults to 4.
+        power: int or float (optional)
+            The power of the distances used by "idw". Defaults to 2.
+
+    Returns:
+        scipy.sparse.csr_matrix:
+            A (n_vertices, n_channels) matrix of interpolation weights
+    """
+    if type(node_coord) is not np.ndarray:
+        raise TypeError(
+            "node_coord has to be a numpy array of electrode coordinates"
+        )
+
+    if type(vertex_coord) is not np.ndarray:
+        raise TypeError(
+            "vertex_coord has to be a numpy array of vertex coordinates"
+        )
+
+    n_vertices = len(vertex_coord)
+    n_nodes = len(node_coord)
+    tree = cKDTree(node_coord)
+
+    if method == "nearest":
+        # same assignment as scipy.interpolate.NearestNDInterpolator
+        nearest_idx = tree.query(vertex_coord)[1]
+        return sparse.csr_matrix(
+            (np.ones(n_vertices), (np.arange(n_vertices), nearest_idx)),
+            shape=(n_vertices, n_nodes)
+        )
+
+    elif method == "idw":
+        n_neighbors = min(n_neighbors, n_nodes)
+        distances, indices = tree.query(vertex_coord, k=n_neighbors)
+        distances = distances.reshape(n_vertices, n_neighbors)
+        indices = indices.reshape(n_vertices, n_neighbors)
+
+        with np.errstate(divide="ignore"):
+            weights = 1 / distances ** power
+        # locations on an electrode take its value
+        on_node = np.isinf(weights).any(axis=1)
+        weights[on_node] = np.isinf(weights[on_node])
+        weights /= weights.sum(axis=1, keepdims=True)
+
+        return sparse.csr_matrix(
+            (
+                weights.ravel(),
+                (np.repeat(np.arange(n_vertices), n_neighbors), indices.ravel())
+            ),
+            shape=(n_vertices, n_nodes)
+        )
+
+    elif method == "spline":
+        # spherical splines need the locations relative to the centre of the head
+        origin = _fit_sphere(vertex_coord, disp=False)[1]
+        return sparse.csr_matrix(
+            _make_interpolation_matrix(node_coord - origin, vertex_coord - origin)
+        )
+
+    else:
+        raise ValueError(
+            "Invalid interpolation method, method can only be one of "
+            "nearest, "
+            "idw, or "
+            "spline"
+        )
+
+
+def get_head_interpolation(epoch, method="nearest", **kwargs):
+    """
+    Get the interpolation weights from the electrodes of an epoch to the
+    standard node locations ("standard_1005"). The weights only depend on the
+    electrodes so they are calculated once and cached.
+
+    Parameters:
+        epoch: mne.epochs.Epochs
+            The epoch data
+        method: str (optional)
+            The interpolation method, see get_interpolation_weights.
+            Defaults to "nearest".
+        **kwargs: dict (optional)
+            Optional arguments to pass to get_interpolation_weights
+
+    Returns:
+        scipy.sparse.csr_matrix:
+            A (n_vertices, n_channels) matrix of interpolation weights
+    """
+    if type(epoch) is not mne.epochs.Epochs and type(epoch) is not mne.evoked.EvokedArray:
+        raise TypeError(
+            "epoch is not an epoched data, "
+            "please refer to eeg_objects to create an epoched data"
+        )
+
+    key = (tuple(epoch.get_montage().ch_names), method, tuple(sorted(kwargs.items())))
+
+    if key not in INTERPOLATION_CACHE:
+        standard_montage, standard_coord = get_standard_coord()
+        node_coord = get_eeg_node(epoch, standard_montage)
+        INTERPOLATION_CACHE[key] = get_interpolation_weights(
+            node_coord, standard_coord, method, **kwargs
+        )
+
+    return INTERPOLATION_CACHE[key]
+
+
+def interpolate_frames(data, weights):
+    """
+    Interpolate EEG signals of all frames at once
+
+    Parameters:
+        data: numpy.ndarray
+            A (n_channels, n_frames) array of EEG signals
+        weights: scipy.sparse.csr_matrix
+            A (n_vertices, n_channels) matrix of interpolation weights
+
+    Returns:
+        numpy.ndarray:
+            A (n_frames, n_vertices) array of interpolated EEG voltages
+    """
+    return np.asarray(weights @ data).T
+
+
+def get_frame_data(epoch, data_df=None):
+    """
+    Get the EEG signals of each frame directly from the epoch data. Gives the same
+    values as epoch.to_data_frame().groupby("time").mean(), i.e. the microvolts
+    averaged over all epochs and samples sharing a time stamp in milliseconds,
+    without building the long format data frame. Time stamps where any channel
+    is 0 are removed.
+
+    Parameters:
+        epoch: mne.epochs.Epochs
+            The epoch data
+        data_df: pd.core.frame.DataFrame (optional)
+            A data frame of EEG data to use instead of the epoch data,
+            with a "time" column and a column for each channel. Defaults to None.
+
+    Returns:
+        data: numpy.ndarray
+            A (n_channels, n_frames) array of EEG signals
+        times: numpy.ndarray
+            The time stamp of each frame
+    """
+    channel_names = epoch.ch_names
+
+    if data_df is None:
+        if type(epoch) is mne.evoked.EvokedArray:
+            data = epoch.data.copy()
+        else:
+            data = epoch.get_data().mean(axis=0)
+        data = _scale_dataframe_data(
+            epoch, data.T, range(len(channel_names)), None
+        ).T
+
+        # average the samples rounded to the same millisecond
+        times, inverse, counts = np.unique(
+            _convert_times(epoch, epoch.times, "ms"),
+            return_inverse=True,
+            return_counts=True
+        )
+        grouped = np.zeros((len(channel_names), len(times)))
+        np.add.at(grouped, (slice(None), inverse), data)
+        data = grouped / counts
+    else:
+        df = data_df.groupby("time").mean()
+        data = df[channel_names].values.T.astype(float)
+        times = df.index.values
+
+    # remove time stamps with 0 values for all channels
+    non_zero = (data != 0).all(axis=0)
+    return data[:, non_zero], times[non_zero]
+
+
+def quantize_intensity(values, quantize=None):
+    """
+    Reduce the precision of the interpolated values to make the animated plot smaller
+
+    Parameters:
+        values: numpy.ndarray
+            A (n_frames, n_vertices) array of interpolated EEG voltages
+        quantize: str or None (optional)
+            None to keep the values, "float32" to round them to float32
+            precision or "uint8" to store them as integer steps of 1/255 of
+            their range. Defaults to None.
+
+    Returns:
+        values: numpy.ndarray
+            The quantized values
+        offset: float
+            The EEG voltage of a quantized value of 0
+        scale: float
+            The EEG voltage of a quantized step, voltage = offset + scale * value
+    """
+    if quantize is None:
+        return values, 0.0, 1.0
+
+    elif quantize == "float32":
+        # the shortest representation of the float32 values serializes
+        # with about half as many digits as the float64 values
+        return values.astype(np.float32).astype(str).astype(float), 0.0, 1.0
+
+    elif quantize == "uint8":
+        offset = float(np.min(values))
+        scale = float(np.max(values) - offset) / 255 or 1.0
+        return np.round((values - offset) / scale).astype(np.uint8), offset, scale
+
+    else:
+        raise ValueError(
+            "Invalid quantize option, quantize can only be one of "
+            "None, "
+            "float32, or "
+            "uint8"
+        )
+
+
 def get_eeg_node(raw, standard_montage_list):
     """
     Get the electrode location from the raw data
@@ -155,13 +401,8 @@ def get_eeg_node(raw, standard_montage_list):
             "standard_montage_list has to be a mne montage"
         )
 
-    node_list = []
-    for channel in raw.get_montage().ch_names:
-        node_list.append(
-            standard_montage_list.get_positions()["ch_pos"][channel].tolist()
-        )
-    node_coord = np.array(node_list)
-    return node_coord
+    geometry = montages.get_montage_geometry(standard_montage_list)
+    return geometry.get_coords(raw.get_montage().ch_names)
 
 
 def get_node_dataframe(raw, montage):
@@ -189,17 +430,10 @@ def get_node_dataframe(raw, montage):
     if type(montage) is not mne.channels.montage.DigMontage:
         raise TypeError("montage has to be a mne montage")
 
-    node_list_name = []
-    for channel in raw.get_montage().ch_names:
-        node_list_name.append(
-            [
-                channel,
-                montage.get_positions()["ch_pos"][channel][0],  # x value
-                montage.get_positions()["ch_pos"][channel][1],  # y value
-                montage.get_positions()["ch_pos"][channel][2],  # z value
-            ]
-        )
-    node_df = pd.DataFrame(node_list_name, columns=["channel", "X", "Y", "Z"])
+    ch_names = raw.get_montage().ch_names
+    coords = montages.get_montage_geometry(montage).get_coords(ch_names)
+    node_df = pd.DataFrame(coords, columns=["X", "Y", "Z"])
+    node_df.insert(0, "channel", ch_names)
     return node_df
 
 
@@ -211,6 +445,8 @@ def animate_3d_head(
     vmin=-50,
     vmax=50,
     colormap="Bluered",
+    interpolation="nearest",
+    quantize=None,
 ):
 
     if type(epoch) is not mne.epochs.Epochs and type(epoch) is not mne.evoked.EvokedArray:
@@ -237,54 +473,39 @@ def animate_3d_head(
     if type(vmax) is not int and type(vmax) is not float:
         raise TypeError("vmax has to be a number")
 
-    # find out the channel names
-    channel_names = epoch.ch_names
-
     # get the standard montage coordinates
     standard_montage, standard_coord = get_standard_coord()
-    x = np.array(standard_coord)[:, 0]
-    y = np.array(standard_coord)[:, 1]
-    z = np.array(standard_coord)[:, 2]
 
     # get the coordinates of the electrodes from the raw data
-    node_coord = get_eeg_node(epoch, standard_montage)
     node_df = get_node_dataframe(epoch, standard_montage)
 
-    if data_df is None:
-        # change the raw epoched data to a dataframe
-        df = epoch.to_data_frame().groupby("time").mean().reset_index()
-    elif data_df is not None:
-        df = data_df.groupby("time").mean().reset_index()
-
-    df = df.loc[
-        (df[channel_names] != 0).all(axis=1)
-    ].reset_index()  # remove rows with 0 values for all columns
-    nb_frame = len(df)  # calculate the number of frames
-
-    # get the interpolated values for all electrode locations
-    interpolated_values_dict = {}
-    for i in range(nb_frame):
-        interpolated_values_dict[str(i)] = interpolated_time(
-            df, channel_names, node_coord, x, y, z, i
-        )
+    # get the EEG signals of each frame
+    data, times = get_frame_data(epoch, data_df)
+    nb_frame = data.shape[1]  # calculate the number of frames
 
-    # generate the animated plot
+    # get the interpolated values for all electrode locations at once
+    weights = get_head_interpolation(epoch, interpolation)
+    interpolated_values = interpolate_frames(data, weights)
+
+    # store the values with less precision if requested
+    interpolated_values, offset, scale = quantize_intensity(
+        interpolated_values, quantize
+    )
+    colorbar = {"title": color_title}
+    if quantize == "uint8":
+        # label the colour bar with the EEG voltages of the quantized values
+        ticks = np.linspace(vmin, vmax, 5)
+        colorbar["tickvals"] = (ticks - offset) / scale
+        colorbar["ticktext"] = [format(tick, "g") for tick in ticks]
+        vmin, vmax = (vmin - offset) / scale, (vmax - offset) / scale
+
+    # generate the animated plot, the frames only update the
+    # intensity of the head trace
     fig = go.Figure(
         frames=[
             go.Frame(
-                data=go.Mesh3d(
-                    x=np.array(standard_coord)[:, 0],
-                    y=np.array(standard_coord)[:, 1],
-                    z=np.array(standard_coord)[:, 2],
-                    colorscale=colormap,
-                    colorbar_title=color_title,
-                    cmin=vmin,
-                    cmax=vmax,
-                    intensity=interpolated_values_dict[str(k)],
-                    intensitymode="vertex",  # can't be changed
-                    alphahull=1,  # can't be changed
-                    opacity=1,
-                ),
+                data=[go.Mesh3d(intensity=interpolated_values[k])],
+                traces=[0],
                 # you need to name the frame for the
                 # animation to behave properly
                 name=format(epoch.times[k], ".4f"),
@@ -300,12 +521,12 @@ def animate_3d_head(
             y=np.array(standard_coord)[:, 1],
             z=np.array(standard_coord)[:, 2],
             colorscale=colormap,
-            colorbar_title=color_title,
+            colorbar=colorbar,
             cmin=vmin,
             cmax=vmax,
-            intensity=interpolated_values_dict[str(0)],
-            intensitymode="vertex",
-            alphahull=1,
+            intensity=interpolated_values[0],
+            intensitymode="vertex",  # can't be changed
+            alphahull=1,  # can't be changed
             opacity=1,
         )
     )
@@ -404,6 +625,98 @@ def animate_3d_head(
     return fig
 
 
+# decode the intensity of the frames and add them to the plot in the browser
+DECODE_FRAMES_SCRIPT = """
+var gd = document.getElementById('{plot_id}');
+var binary = atob('%(blob)s');
+var bytes = new Uint8Array(binary.length);
+for (var i = 0; i < binary.length; i++) {
+    bytes[i] = binary.charCodeAt(i);
+}
+var values = new %(array_type)s(bytes.buffer);
+var names = %(names)s;
+var n_vertices = values.length / names.length;
+var frames = names.map(function(name, k) {
+    return {
+        name: name,
+        traces: [0],
+        data: [{intensity: Array.from(values.subarray(k * n_vertices, (k + 1) * n_vertices))}]
+    };
+});
+return Plotly.addFrames(gd, frames);
+"""
+
+
+def to_compact_html(fig, include_plotlyjs=True, full_html=True):
+    """
+    Convert an animated plot from animate_3d_head to HTML with the intensity of all
+    frames stored as a single base64 encoded binary array, which is decoded into the
+    animation frames in the browser
+
+    Parameters:
+        fig: plotly.graph_objs._figure.Figure
+            An animated plot from animate_3d_head
+        include_plotlyjs: bool or str (optional)
+            How to include plotly.js, as used in plotly.io.to_html.
+            Defaults to True.
+        full_html: bool (optional)
+            Whether to create a full HTML document or only a div. Defaults to True.
+
+    Returns:
+        str:
+            The HTML of the animated plot
+    """
+    if type(fig) is not go.Figure:
+        raise TypeError("fig has to be a plotly figure")
+
+    intensity = np.array([frame.data[0].intensity for frame in fig.frames])
+
+    # integer values from quantize="uint8" fit in one byte each
+    if np.array_equal(intensity, np.round(intensity)) and (
+        intensity.min() >= 0 and intensity.max() <= 255
+    ):
+        intensity = intensity.astype("<u1")
+        array_type = "Uint8Array"
+    else:
+        intensity = intensity.astype("<f4")
+        array_type = "Float32Array"
+
+    post_script = DECODE_FRAMES_SCRIPT % {
+        "blob": base64.b64encode(intensity.tobytes()).decode("ascii"),
+        "array_type": array_type,
+        "names": json.dumps([frame.name for frame in fig.frames]),
+    }
+
+    base_fig = go.Figure(fig)
+    base_fig.frames = []
+    return base_fig.to_html(
+        include_plotlyjs=include_plotlyjs,
+        full_html=full_html,
+        post_script=post_script,
+    )
+
+
+def write_compact_html(fig, file_name, include_plotlyjs=True):
+    """
+    Save an animated plot from animate_3d_head as a compact HTML file,
+    see to_compact_html
+
+    Parameters:
+        fig: plotly.graph_objs._figure.Figure
+            An animated plot from animate_3d_head
+        file_name: str
+            The file name
+        include_plotlyjs: bool or str (optional)
+            How to include plotly.js, as used in plotly.io.to_html.
+            Defaults to True.
+    """
+    if type(file_name) is not str:
+        raise TypeError("file_name has to be a string")
+
+    with open(file_name, "w", encoding="utf-8") as file:
+        file.write(to_compact_html(fig, include_plotlyjs))
+
+
 # generate the 3D topographic map for a single time stamp
 def topo_3d_map(
     epoch,
@@ -413,6 +726,7 @@ def topo_3d_map(
     vmin=-50,
     vmax=50,
     colormap="Bluered",
+    interpolation="nearest",
 ):
     """
     Plot a topographic map in a 3D head shape for a single time stamp
@@ -437,6 +751,9 @@ def topo_3d_map(
             Defaults to 50.
         colormap: str (optional)
             The colour scheme to use. Defaults to Bluered.
+        interpolation: str (optional)
+            The interpolation method, one of "nearest", "idw" or "spline".
+            Defaults to "nearest".
 
     Returns:
         plotly.graph_objs._figure.Figure
@@ -463,32 +780,18 @@ def topo_3d_map(
     if type(vmax) is not int and type(vmax) is not float:
         raise TypeError("vmax has to be a number")
 
-    # find out the channel names
-    channel_names = epoch.ch_names
-
     # get the standard montage coordinates
     standard_montage, standard_coord = get_standard_coord()
-    x = np.array(standard_coord)[:, 0]
-    y = np.array(standard_coord)[:, 1]
-    z = np.array(standard_coord)[:, 2]
 
     # get the coordinated of the electrodes in the raw data
-    node_coord = get_eeg_node(epoch, standard_montage)
     node_df = get_node_dataframe(epoch, standard_montage)
 
-    if data_df is None:
-        # change the raw epoched data to a dataframe
-        df = epoch.to_data_frame().groupby("time").mean().reset_index()
-    elif data_df is not None:
-        df = data_df.groupby("time").mean().reset_index()
-
-    # change the raw epoched data to a dataframe
-    df = df.loc[(df[channel_names] != 0).all(axis=1)].reset_index()
-    nb_frame = len(df)
+    # get the EEG signals of each frame
+    data, times = get_frame_data(epoch, data_df)
 
     if data_df is None:
         # get the index
-        time_index = df[df["time"] == time_stamp].index.values[0]
+        time_index = np.flatnonzero(times == time_stamp)[0]
     elif data_df is not None:
         time_index = time_stamp
 
@@ -502,8 +805,8 @@ def topo_3d_map(
             colorbar_title=color_title,
             cmin=vmin,
             cmax=vmax,
-            intensity=interpolated_time(
-                df, channel_names, node_coord, x, y, z, time_index
+            intensity=interpolate_frames(
+                data[:, time_index], get_head_interpolation(epoch, interpolation)
             ),
             intensitymode="vertex",
             alphahull=1,
@@ -585,9 +888,10 @@ def topo3dhead_plot(epoch, i, data_df=None):
 
 
 # To save the animated plot as a gif
-def save_gif(epoch, gifname, duration, data_df=None):
+def save_gif(epoch, gifname, duration, data_df=None, workers=1):
     """
-    Save the animated plot as gif file
+    Save the animated plot as gif file. The frames are rendered with
+    render_head_to_file and streamed to the file as they are rendered.
 
     Parameters:
         epoch: mne.epochs.Epochs
@@ -599,6 +903,9 @@ def save_gif(epoch, gifname, duration, data_df=None):
         data_df: pd.core.frame.DataFrame
             A data frame of EEG data if epoched data is not of
             interest
+        workers: int (optional)
+            Number of processes to render frames with, see render_head_to_file.
+            Defaults to 1 to render in the current process.
     """
     if type(epoch) is not mne.epochs.Epochs and type(epoch) is not mne.evoked.EvokedArray:
         raise TypeError(
@@ -612,25 +919,282 @@ def save_gif(epoch, gifname, duration, data_df=None):
     if data_df is not None and type(data_df) is not pd.core.frame.DataFrame:
         raise TypeError("data_df is not a data frame")
 
-    frames = []
+    render_head_to_file(
+        epoch,
+        f"{gifname}.gif",
+        data_df=data_df,
+        workers=workers,
+        frame_rate=1000 / duration,
+    )
+
+def get_head_mesh(coord):
+    """
+    Triangulate the head surface once so the frames do not need plotly's alphahull.
+    The triangles are the convex hull of the node locations (which alphahull=1 gives
+    for a head sized shape), all facing outwards for consistent shading.
+
+    Parameters:
+        coord: numpy.ndarray
+            A (n_vertices, 3) array of cartesian coordinates of the node locations
+
+    Returns:
+        numpy.ndarray:
+            A (n_triangles, 3) array with the vertex indices of each triangle
+    """
+    triangles = ConvexHull(coord).simplices.copy()
+    normals = np.cross(
+        coord[triangles[:, 1]] - coord[triangles[:, 0]],
+        coord[triangles[:, 2]] - coord[triangles[:, 0]]
+    )
+    inwards = (normals * (coord[triangles].mean(axis=1) - coord.mean(axis=0))).sum(axis=1) < 0
+    triangles[inwards] = triangles[inwards][:, ::-1]
+    return triangles
+
+
+def get_head_frames(epoch, data_df=None, interpolation="nearest"):
+    """
+    Calculate the intensity and title of every frame saved by save_gif at once.
+
+    Parameters:
+        epoch: mne.epochs.Epochs
+            The epoch data
+        data_df: pd.core.frame.DataFrame (optional)
+            A data frame of EEG data if epoched data is not of
+            interest. Defaults to None.
+        interpolation: str (optional)
+            The interpolation method, one of "nearest", "idw" or "spline".
+            Defaults to "nearest".
+
+    Returns:
+        intensity: numpy.ndarray
+            A (n_frames, n_vertices) array of interpolated EEG voltages
+        titles: [str]
+            The title of each frame
+    """
+    data, times = get_frame_data(epoch, data_df)
+
+    # the same frames topo_3d_map plots for each time stamp of save_gif
     if data_df is None:
-        starting = epoch.to_data_frame()["time"].min()
-        ending = epoch.to_data_frame()["time"].max()
+        all_times = _convert_times(epoch, epoch.times, "ms")
+        frames = np.flatnonzero((times >= all_times.min()) & (times < all_times.max()))
+        titles = ["Time stamp: " + format(epoch.times[k], ".4f") + "s" for k in frames]
+    else:
+        frames = np.arange(data_df.time.tolist()[0], data_df.time.tolist()[-1])
+        titles = [" "] * len(frames)
 
-        # for iterate over each timestamps in the dataframe
-        # to generate a plot, and then save it as animated gif
-        for i in range(starting, ending, 1):
-            frame = topo3dhead_plot(epoch, i)
-            frames.append(frame)
-        gif.save(frames, f"{gifname}.gif", duration=duration)
+    weights = get_head_interpolation(epoch, interpolation)
+    return interpolate_frames(data[:, frames], weights), titles
 
-    elif data_df is not None:
-        starting = data_df.time.tolist()[0]
-        ending = data_df.time.tolist()[-1]
-
-        # for iterate over each timestamps in the dataframe
-        # to generate a plot, and then save it as animated gif
-        for i in range(starting, ending, 1):
-            frame = topo3dhead_plot(epoch, i, data_df)
-            frames.append(frame)
-        gif.save(frames, f"{gifname}.gif", duration=duration)
\ No newline at end of file
+
+def get_head_figure_template(
+    epoch,
+    color_title="EEG MicroVolt",
+    vmin=-50,
+    vmax=50,
+    colormap="Bluered",
+):
+    """
+    Build the parts of a topo_3d_map plot that are the same for every frame, with
+    the head mesh already triangulated. Helper function for render_head_to_file.
+
+    Parameters:
+        epoch: mne.epochs.Epochs
+            The epoch data
+        color_title: str (optional)
+            The title of the color bar. Defaults to "EEG MicroVolt".
+        vmin: int (optional)
+            The minimum EEG voltage value to be shown on the color bar.
+            Defaults to -50.
+        vmax: int (optional)
+            The maximum EEG voltage value to be shown on the color bar.
+            Defaults to 50.
+        colormap: str (optional)
+            The colour scheme to use. Defaults to Bluered.
+
+    Returns:
+        dict:
+            The plotly figure as a dictionary, without the intensity and title
+    """
+    standard_montage, standard_coord = get_standard_coord()
+    node_df = get_node_dataframe(epoch, standard_montage)
+    triangles = get_head_mesh(standard_coord)
+
+    fig = go.Figure(
+        data=go.Mesh3d(
+            x=standard_coord[:, 0],
+            y=standard_coord[:, 1],
+            z=standard_coord[:, 2],
+            i=triangles[:, 0],
+            j=triangles[:, 1],
+            k=triangles[:, 2],
+            colorscale=colormap,
+            colorbar_title=color_title,
+            cmin=vmin,
+            cmax=vmax,
+            intensitymode="vertex",
+            opacity=1,
+        )
+    )
+
+    fig.add_scatter3d(
+        connectgaps=True,
+        x=node_df["X"],
+        y=node_df["Y"],
+        z=node_df["Z"],
+        text=node_df["channel"],
+        mode="markers+text",
+        marker={"size": 5, "color": "black"},
+        textposition="top center",
+        textfont=dict(family="sans serif", size=18),
+    )
+
+    fig.update_layout(
+        width=1000,
+        height=600,
+        scene=dict(
+            aspectratio=dict(x=1.5, y=1.5, z=1),
+        ),
+    )
+    return fig.to_dict()
+
+
+def init_head_worker(template):
+    """
+    Store the figure template that a worker process renders frames from. The
+    Kaleido renderer is started with the first frame and reused for the rest.
+    Helper function for render_head_to_file.
+
+    Parameters:
+        template: dict
+            The figure from get_head_figure_template
+    """
+    HEAD_WORKER_STATE["template"] = template
+
+
+def render_head_frames(frames):
+    """
+    Render frames of the head plot with Kaleido. Helper function for render_head_to_file.
+
+    Parameters:
+        frames: [(str, numpy.ndarray)]
+            The title and intensity of each frame
+
+    Returns:
+        [numpy.ndarray]:
+            RGB array of each frame
+    """
+    template = HEAD_WORKER_STATE["template"]
+    images = []
+    for title, intensity in frames:
+        # only the changed parts are replaced, the mesh is shared by every frame
+        fig = dict(
+            template,
+            data=[dict(template["data"][0], intensity=intensity)] + template["data"][1:],
+            layout=dict(template["layout"], title={"text": title}),
+        )
+        image = pio.to_image(fig, format="png", validate=False)
+        images.append(np.asarray(Image.open(io.BytesIO(image)).convert("RGB")))
+    return images
+
+
+def render_head_to_file(
+    epoch,
+    path,
+    data_df=None,
+    workers=None,
+    format=None,
+    frame_rate=12,
+    chunk_size=None,
+    color_title="EEG MicroVolt",
+    vmin=-50,
+    vmax=50,
+    colormap="Bluered",
+    interpolation="nearest",
+):
+    """
+    Render the frames of save_gif to a mp4, webm or gif file. The intensity of all frames
+    is interpolated at once and the frames are rendered in parallel by a pool of processes,
+    each keeping its own Kaleido renderer. The frames are written in order to a single
+    ffmpeg process as they arrive, so the images are never all held in memory. Since the
+    workers are started with 'spawn', scripts calling this function with workers > 1 need
+    an `if __name__ == '__main__':` guard.
+
+    Parameters:
+        epoch: mne.epochs.Epochs
+            The epoch data
+        path: str
+            Path of the file to save
+        data_df: pd.core.frame.DataFrame (optional)
+            A data frame of EEG data if epoched data is not of
+            interest. Defaults to None.
+        workers: int (optional)
+            Number of processes to render frames with. Defaults to None for the
+            number of CPUs. 1 renders in the current process.
+        format: str (optional)
+            One of "mp4", "webm" or "gif". Defaults to None to use the extension of the path.
+        frame_rate: int or float (optional)
+            The frame rate of the file. Defaults to 12.
+        chunk_size: int (optional)
+            Number of frames rendered per task. Defaults to None for about
+            four tasks per worker.
+        color_title: str (optional)
+            The title of the color bar. Defaults to "EEG MicroVolt".
+        vmin: int (optional)
+            The minimum EEG voltage value to be shown on the color bar.
+            Defaults to -50.
+        vmax: int (optional)
+            The maximum EEG voltage value to be shown on the color bar.
+            Defaults to 50.
+        colormap: str (optional)
+            The colour scheme to use. Defaults to Bluered.
+        interpolation: str (optional)
+            The interpolation method, one of "nearest", "idw" or "spline".
+            Defaults to "nearest".
+
+    Returns:
+        str:
+            The path of the saved file
+    """
+    if type(epoch) is not mne.epochs.Epochs and type(epoch) is not mne.evoked.EvokedArray:
+        raise TypeError(
+            "epoch is not an epoched data, "
+            "please refer to eeg_objects to create an epoched data"
+        )
+
+    if data_df is not None and type(data_df) is not pd.core.frame.DataFrame:
+        raise TypeError("data_df is not a data frame")
+
+    if workers is None:
+        workers = os.cpu_count()
+
+    # validates the format and frame rate before any frames are rendered
+    writer = export.FrameWriter(path, format, frame_rate)
+
+    intensity, titles = get_head_frames(epoch, data_df, interpolation)
+    frames = list(zip(titles, intensity))
+    template = get_head_figure_template(epoch, color_title, vmin, vmax, colormap)
+
+    try:
+        if workers <= 1:
+            init_head_worker(template)
+            for frame in frames:
+                writer.write(render_head_frames([frame])[0])
+        else:
+            context = multiprocessing.get_context("spawn")
+            with context.Pool(
+                workers,
+                initializer=init_head_worker,
+                initargs=(template,)
+            ) as pool:
+                chunks = [
+                    frames[start:stop]
+                    for start, stop in export.get_chunks(len(frames), workers, chunk_size)
+                ]
+                for images in pool.imap(render_head_frames, chunks):
+                    for image in images:
+                        writer.write(image)
+    finally:
+        HEAD_WORKER_STATE.clear()
+        writer.close()
+
+    return path
@@ -9,6 +9,7 @@ from os import walk
 
 from simpl_eeg import (
     eeg_objects,
+    layout,
     raw_voltage,
     connectivity,
     topomap_2d,
@@ -20,7 +21,6 @@ import matplotlib.pyplot as plt
 import re
 import datetime
 import time
-import pickle
 import scipy.io
 
 SECTION_NAMES = {
@@ -36,8 +36,8 @@ SPINNER_MESSAGE = "Rendering..."
 DEFAULT_FRAME_RATE = 12.0
 
 DATA_FOLDER = "data/"
-HEADER_EPOCH_PATH = "src/pre_saved/epoch_info"
 HEADER_FWD_PATH = "src/pre_saved/forward"
+RAW_CACHE_PATH = "src/pre_saved/raw"
 
 st.set_page_config(
     page_title="SimPL EEG App",
@@ -139,9 +139,10 @@ def files_with_specific_extension(experiment_num, file_types):
 @st.cache(show_spinner=False)
 def generate_fwd(epoch):
     """
-    Helper function for 3D brain map - Generate forward solution from epoch
+    Helper function for 3D brain map - Generate forward solution from epoch,
+    or load it from the forward cache if the montage was used before
     """
-    return(topomap_3d_brain.create_fsaverage_forward(epoch))
+    return(topomap_3d_brain.create_fsaverage_forward(epoch, cache_dir=HEADER_FWD_PATH))
 
 
 @st.cache(show_spinner=False)
@@ -223,11 +224,10 @@ def animate_ui_connectivity_circle(epoch, **kwargs):
     return anim.to_jshtml(), code
 
 
-@st.cache(show_spinner=False)
 def get_axis_lims(epoch):
     """
-    Generates an invisible mne.viz.plot_topomap plot and gets the ylim from its
-    matplotlib.axes._subplots.AxesSubplot.
+    Gets the ylim of a default mne.viz.plot_topomap plot of the epoch from the
+    montage positions (cached per montage).
     
     Parameters:
         epoch: mne.epochs.Epochs
@@ -237,23 +237,7 @@ def get_axis_lims(epoch):
         ax_lims: tuple
             A tuple of the ax_lims.
     """
-    fig, ax = plt.subplots()
-
-    if type(epoch) is mne.evoked.EvokedArray:
-        plot_data = epoch.data[:, 0]
-    else:
-        plot_data = epoch.get_data('eeg')[0][:, 0] 
-    
-    mne.viz.plot_topomap(
-        data=plot_data,
-        pos=epoch.info,
-        show=False,
-        res=1
-    )
-    
-    axis_lims = ax.get_ylim()
-    plt.close()
-    return(axis_lims)
+    return layout.get_axis_lims(epoch.info)
 
 
 @st.cache(show_spinner=False)
@@ -268,29 +252,12 @@ def generate_event_times_only(events):
     return event_times_only
 
 
-@st.cache(show_spinner=False)
 def check_if_sphere_works(epoch, extrapolate_setting):
     """
-    Helper function for creating standalone eeg_file object
+    Helper function for checking whether the sphere parameter can be used with
+    the montage and extrapolation setting (cached per montage)
     """
-    if type(epoch) is mne.evoked.EvokedArray:
-        plot_data = epoch.data[:, 0]
-    else:
-        plot_data = epoch.get_data('eeg')[0][:, 0]  
-
-    can_use_sphere_param=True
-    try:
-        mne.viz.plot_topomap(
-            data=plot_data,
-            pos=epoch.info,
-            extrapolate=extrapolate_setting,
-            sphere=100,
-            res=1,
-            show=False
-        )
-    except:
-        can_use_sphere_param=False
-    return(can_use_sphere_param)
+    return layout.check_sphere_works(epoch.info, 100, extrapolate_setting)
 
 
 @st.cache(show_spinner=False)
@@ -312,6 +279,7 @@ def generate_eeg_raw(experiment_num, **kwargs):
 
     gen_eeg_file = eeg_objects.EEG_File(
         DATA_FOLDER+experiment_num,
+        cache_dir=RAW_CACHE_PATH,
         **kwargs
     )
     return gen_eeg_file
@@ -372,6 +340,7 @@ def generate_epoch(experiment_num, epoch_num, **kwargs):
 
     epoch_obj = eeg_objects.Epochs(
         DATA_FOLDER+experiment_num,
+        cache_dir=RAW_CACHE_PATH,
         **kwargs
     )
     epoch_obj.get_epoch(epoch_num)
@@ -474,111 +443,6 @@ def get_working_montage(experiment_num, montage_list, file_name, return_first_ma
     return montage_options
 
 
-def get_list_of_files_cache(path):
-    """
-    Helper for load_generate_fwd. Gets list of files in a file path
-    with the extension ".pickle" and returns a list of them
-    """
-    file_list = []
-    for f in (next(walk(path), (None, None, []))[2]):
-        f_remove=True
-        if f.endswith(".pickle"):
-            f_remove=False
-        if f_remove==False:
-            file_list.append(f)
-    
-    return file_list
-
-def load_generate_fwd(
-    plot_epoch,
-    forward_genearted,
-    experiment_num,
-    HEADER_EPOCH_PATH,
-    HEADER_FWD_PATH):
-    """
-    Load fwd from the fwd cache or generate a new one and put it into the cache
-    """
-    # Fetch cache of epoch_info's
-    pre_load_epoch_list = get_list_of_files_cache(HEADER_EPOCH_PATH)
-
-    # Fetch cache of fwd's
-    pre_load_fwd_list = get_list_of_files_cache(HEADER_FWD_PATH)
-
-    try:
-        if type(plot_epoch) == mne.epochs.Epochs:
-            # Loads example epochs from cache, checks if it's 'epoch.info' matches the
-            # current plot_epoch. If it does, loads pre-exisiting forward to save time.
-            if forward_genearted is False:
-                for e in pre_load_epoch_list:
-                    with open(HEADER_EPOCH_PATH+'/'+e, "rb") as loaded_epoch:
-                        example_epoch_info = pickle.load(loaded_epoch)
-                    d1 = dict(plot_epoch.info)
-                    d1.pop("chs",0)
-                    example_epoch_info.pop("chs", 0)
-                    if d1 == example_epoch_info:
-                        FILE_LEAD = e.split("_epoch_info.pickle")[0]
-                        FWD_FILE = HEADER_FWD_PATH + '/' + FILE_LEAD + "_fwd.pickle"
-                        with open(FWD_FILE, "rb") as loaded_fwd:
-                            fwd = pickle.load(loaded_fwd)
-                            if type(fwd) == mne.forward.forward.Forward:
-                                forward_genearted = True
-                                print('loaded')
-                                break
-
-            # If no matching epoch.info found in cache then make fwd and save it + curent epoch info
-            # to the custom cache
-            if forward_genearted is False:
-                fwd = generate_fwd(plot_epoch)
-                forward_genearted = True
-                epoch_info_file_name = HEADER_EPOCH_PATH + '/' + experiment_num + "_epoch_info.pickle"
-                with open(epoch_info_file_name, 'wb') as handle:
-                    epoch_info_dict = dict(plot_epoch.info)
-                    pickle.dump(epoch_info_dict, handle, protocol=pickle.HIGHEST_PROTOCOL)
-                pre_load_epoch_list.append(experiment_num + "_epoch_info.pickle")
-                fwd_file_name = HEADER_FWD_PATH + '/' + experiment_num + "_fwd.pickle"
-                with open(fwd_file_name, 'wb') as handle:
-                    pickle.dump(fwd, handle, protocol=pickle.HIGHEST_PROTOCOL)
-                pre_load_fwd_list.append(experiment_num + "_fwd.pickle")
-
-        # Safety net for if evoked data gets here since saving doesn't work for it. 
-        else:
-            fwd = generate_fwd(plot_epoch)
-            forward_genearted = True
-
-    except:
-        st.warning("""Error loading files from fwd cache (
-            `simpl_eeg_capstone/src/pre_saved/epochs_info` and
-            `simpl_eeg_capstone/src/pre_saved/epochs_info`). Cache will be cleared to
-            avoid future errors.""")
-
-        epoch_list_to_clear = get_list_of_files_cache(HEADER_EPOCH_PATH)
-        fwd_list_to_clear = get_list_of_files_cache(HEADER_FWD_PATH)
-
-        for f in epoch_list_to_clear:
-            os.remove(HEADER_EPOCH_PATH+'/'+f)
-        for f in fwd_list_to_clear:
-            os.remove(HEADER_FWD_PATH+'/'+f)
-        fwd = generate_fwd(plot_epoch)
-        forward_genearted = True
-
-    # If 4 or more files have been added to the cache delete the oldest
-    for i in range(0, len(pre_load_epoch_list)-2):
-        if len(pre_load_fwd_list) >= 3:
-            remove_epoch_path = HEADER_EPOCH_PATH+'/{0}'
-            full_path = [remove_epoch_path.format(x) for x in pre_load_epoch_list]
-            oldest_epoch = min(full_path, key=os.path.getctime)
-
-            remove_epoch_path = HEADER_FWD_PATH+'/{0}'
-            full_path = [remove_epoch_path.format(x) for x in pre_load_fwd_list]
-            oldest_fwd = min(full_path, key=os.path.getctime)
-
-            os.remove(oldest_fwd)
-            os.remove(oldest_epoch)
-    
-    return fwd, forward_genearted
-    
-
-
 def main():
     """
     Populate and display the streamlit user interface
@@ -1787,7 +1651,8 @@ def main():
                     plot_epoch,
                     colormap=colormap,
                     vmin=vmin_3d_head,
-                    vmax=vmax_3d_head
+                    vmax=vmax_3d_head,
+                    quantize="float32"
                 )
                 st.plotly_chart(
                     plot,
@@ -1796,7 +1661,7 @@ def main():
                 export = expander_3d_head.on_render(code)
                 if export:
                     file_name, send_message = expander_3d_head.generate_file_name()
-                    plot.write_html(file_name)
+                    topomap_3d_head.write_compact_html(plot, file_name)
                     send_message()
         else:
             default_message(expander_3d_head.section_name)
@@ -1814,36 +1679,14 @@ def main():
                         """
                     )
                     if st.checkbox("Yes I'm sure, bombs away!", value=False,
-                    help =""" NOTE: This function uses a custom cache. The first time you load an
-                    experiment it will need to generate a fwd and take a long time to render. This fwd
+                    help =""" NOTE: This function uses a cache. The first time you use a montage
+                    it will need to generate a fwd and take a long time to render. This fwd
                     is then saved however making subsequent rendering of brain figures much faster. 
-                    Your two most recent fwds will be saved in `simpl_eeg_capstone/src/pre_saved`.
+                    Your most recently used fwds (up to 1 GB) will be saved in
+                    `simpl_eeg_capstone/src/pre_saved/forward`.
                     """):
 
-                        fwd_generated=False
-                        fwd, fwd_generated = load_generate_fwd(
-                            plot_epoch,
-                            fwd_generated,
-                            experiment_num,
-                            HEADER_EPOCH_PATH,
-                            HEADER_FWD_PATH
-                        )
-
-
-                        # # Loads an example epoch, checks if it's 'epoch.info' matches
-                        # # if it does, loads an accompanying forward
-                        # if fwd_generated is False:
-                        #     with open(HEADER_EPOCH_PATH, "rb") as handle:
-                        #         example_epoch = pickle.load(handle)
-                        #     if plot_epoch.info.__dict__ == example_epoch.info.__dict__:
-                        #         with open(HEADER_FWD_PATH, "rb") as handle:
-                        #             fwd = pickle.load(handle)
-                        #             if type(fwd) == mne.forward.forward.Forward:
-                        #                 fwd_generated = True
-
-                        # if fwd_generated is False:
-                        #     fwd = generate_fwd(plot_epoch)
-                        #     fwd_generated = True
+                        fwd = generate_fwd(plot_epoch)
 
                         stc = generate_stc(plot_epoch, fwd)
 
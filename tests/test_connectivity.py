@@ -1,4 +1,5 @@
 import pytest
+import mne
 from simpl_eeg import connectivity
 import pandas as pd
 import numpy as np
@@ -44,6 +45,20 @@ def test_calculate_connectivity():
     )
     pd.testing.assert_frame_equal(output_df, expected_output)
 
+    # covariance keeps the mean of data that isn't zero-mean, like mne
+    raw = mne.io.RawArray(
+        EPOCH_42.get_data()[0, :5].astype(float) + 1e-6,
+        mne.pick_info(EPOCH_42.info, range(5)),
+        verbose=False
+    )
+    small_epoch = mne.Epochs(
+        raw, [[0, 0, 1]], tmin=0, tmax=raw.times[19], baseline=None, verbose=False
+    )
+    np.testing.assert_allclose(
+        connectivity.calculate_connectivity(small_epoch, "covariance").to_numpy(),
+        mne.compute_covariance(small_epoch, method="empirical", verbose=False).data
+    )
+
 
 def test_plot_connectivity():
     """Test cases for plotting connectivity plot"""
@@ -54,8 +69,11 @@ def test_plot_connectivity():
         connectivity.plot_connectivity(test_df)
 
     # check all outpus are as expected
+    n_figures = len(matplotlib.pyplot.get_fignums())
     output_fig = connectivity.plot_connectivity(EPOCH_42)
     assert isinstance(output_fig, matplotlib.figure.Figure)
+    # the sensor positions are found without drawing another figure
+    assert len(matplotlib.pyplot.get_fignums()) == n_figures + 1
 
 
 def test_animate_connectivity():
@@ -99,6 +117,182 @@ def test_plot_conn_circle():
     assert isinstance(output_fig, matplotlib.figure.Figure)
 
 
+def test_connectivity_renderers():
+    """Test cases for updating connectivity plots between frames"""
+    first_epoch = connectivity.get_frame(EPOCH_42, 20, 0)
+    second_epoch = connectivity.get_frame(EPOCH_42, 20, 1)
+
+    renderer = connectivity.ConnectivityRenderer(
+        first_epoch, threshold=0.5, caption="first"
+    )
+    changed = renderer.update(second_epoch, caption="second")
+    assert renderer.lines in changed
+    assert renderer.caption_text.get_text() == "second"
+
+    # only connections above the threshold are shown
+    conn = connectivity.calculate_connectivity(second_epoch)
+    expected = [abs(conn.loc[name1, name2]) >= 0.5 for name1, name2 in renderer.pairs]
+    np.testing.assert_array_equal(renderer.visible, expected)
+    assert len(renderer.lines.get_segments()) == sum(expected)
+    assert len(renderer.lines.get_colors()) == sum(expected)
+
+    renderer = connectivity.ConnectivityCircleRenderer(
+        first_epoch, max_connections=10, caption="first"
+    )
+    renderer.update(second_epoch, caption="second")
+    assert sum(line.get_visible() for line in renderer.lines) == 10
+    assert renderer.caption_text.get_text() == "second"
+
+
+def test_calculate_windowed_connectivity():
+    """Test cases for calculating connectivity over sliding windows"""
+    # the default windows are the animation frames
+    conn, times = connectivity.calculate_windowed_connectivity(EPOCH_42)
+    assert conn.shape == (3, 19, 19)
+    for frame_number in range(3):
+        frame_epoch = connectivity.get_frame(EPOCH_42, 20, frame_number)
+        np.testing.assert_allclose(
+            conn[frame_number],
+            connectivity.calculate_connectivity(frame_epoch).to_numpy()
+        )
+        assert tuple(times[frame_number]) == (frame_epoch.tmin, frame_epoch.tmax)
+
+    # the covariance keeps the mean of each window like the cropped epoch
+    conn, times = connectivity.calculate_windowed_connectivity(EPOCH_42, "covariance")
+    for frame_number in range(3):
+        frame_epoch = connectivity.get_frame(EPOCH_42, 20, frame_number)
+        np.testing.assert_allclose(
+            conn[frame_number],
+            connectivity.calculate_connectivity(frame_epoch, "covariance").to_numpy(),
+            atol=1e-20
+        )
+
+    # other calculation types transform each window like the cropped epoch
+    conn, times = connectivity.calculate_windowed_connectivity(EPOCH_42, "envelope_correlation")
+    for frame_number in range(3):
+        frame_epoch = connectivity.get_frame(EPOCH_42, 20, frame_number)
+        np.testing.assert_allclose(
+            conn[frame_number],
+            connectivity.calculate_connectivity(frame_epoch, "envelope_correlation").to_numpy()
+        )
+
+    # overlapping windows are updated with running sums
+    data = EPOCH_42.get_data()[0]
+    correlation, times = connectivity.calculate_windowed_connectivity(
+        EPOCH_42, window_size=10, hop=2
+    )
+    covariance, times = connectivity.calculate_windowed_connectivity(
+        EPOCH_42, "covariance", window_size=10, hop=2
+    )
+    assert correlation.shape == covariance.shape == (21, 19, 19)
+    for frame_number, (start, stop) in enumerate(connectivity.get_window_bounds(42, 10, 2)):
+        window = data[:, start:stop]
+        np.testing.assert_allclose(correlation[frame_number], np.corrcoef(window))
+        np.testing.assert_allclose(
+            covariance[frame_number], window @ window.T / (window.shape[1] - 1), atol=1e-20
+        )
+
+    # windows with a single sample have no correlation
+    conn, times = connectivity.calculate_windowed_connectivity(EPOCH_42, window_size=5, hop=1)
+    assert np.isnan(conn[-1]).all()
+
+    with pytest.raises(ValueError):
+        connectivity.calculate_windowed_connectivity(EPOCH_42, hop=0)
+
+
+def test_connectivity_estimators():
+    """Test cases for the connectivity estimator registry"""
+    data = EPOCH_42.get_data()
+    sfreq = EPOCH_42.info["sfreq"]
+
+    # inputs shared by several estimators are only calculated once
+    inputs = {}
+    conn = connectivity.calculate_connectivity_arrays(
+        data, sfreq, ["spectral_connectivity", "envelope_correlation", "correlation"], inputs
+    )
+    assert sorted(inputs) == ["analytic", "fourier", "samples"]
+
+    # the estimators give the same values as mne
+    np.testing.assert_allclose(
+        conn["spectral_connectivity"],
+        mne.connectivity.spectral_connectivity(
+            EPOCH_42, method="pli", mode="fourier", faverage=True, verbose=False
+        )[0][:, :, 0]
+    )
+    np.testing.assert_allclose(
+        conn["envelope_correlation"],
+        mne.connectivity.envelope_correlation(EPOCH_42)
+    )
+
+    # new estimators can be added
+    @connectivity.register_connectivity_estimator("envelope_covariance", input="analytic")
+    def envelope_covariance(analytic):
+        return np.cov(np.hstack(np.abs(analytic)))
+
+    try:
+        output_df = connectivity.calculate_connectivity(EPOCH_42, "envelope_covariance")
+        assert output_df.shape == (19, 19)
+    finally:
+        del connectivity.CONNECTIVITY_ESTIMATORS["envelope_covariance"]
+
+    with pytest.raises(ValueError):
+        connectivity.register_connectivity_estimator("power", input="wavelets")
+
+
+def test_calculate_batch_connectivity(tmp_path):
+    """Test cases for calculating the connectivity of every epoch"""
+    rng = np.random.RandomState(0)
+    epochs = mne.EpochsArray(rng.randn(5, 4, 200), mne.create_info(4, 200., "eeg"), verbose=False)
+    calc_types = ["correlation", "spectral_connectivity"]
+
+    conn = connectivity.calculate_batch_connectivity(epochs, calc_types, progress=False)
+    assert conn["ch_names"] == epochs.ch_names
+    assert conn["correlation"].shape == (5, 4, 4)
+    for epoch_number in range(5):
+        expected = connectivity.calculate_connectivity_arrays(
+            epochs.get_data()[epoch_number:epoch_number + 1], 200., calc_types
+        )
+        for calc_type in calc_types:
+            np.testing.assert_allclose(conn[calc_type][epoch_number], expected[calc_type])
+
+    # epochs calculated by a pool of processes are stored in order
+    reported = []
+    pooled = connectivity.calculate_batch_connectivity(
+        epochs, calc_types, n_jobs=2, chunk_size=2,
+        progress=lambda done, total: reported.append((done, total))
+    )
+    np.testing.assert_allclose(pooled["correlation"], conn["correlation"])
+    assert len(reported) == 3 and reported[-1] == (5, 5)
+
+    # an interrupted run only calculates the unfinished epochs
+    path = str(tmp_path / "conn.npz")
+    checkpoint, done = connectivity.load_batch_checkpoint(path + ".partial", calc_types, (5, 4, 4))
+    for calc_type in calc_types:
+        checkpoint[calc_type][:3] = conn[calc_type][:3]
+    done[:3] = True
+    del checkpoint, done
+
+    reported = []
+    saved = connectivity.calculate_batch_connectivity(
+        epochs, calc_types, path=path,
+        progress=lambda done, total: reported.append((done, total))
+    )
+    assert reported[0][0] > 3
+    np.testing.assert_allclose(saved["spectral_connectivity"], conn["spectral_connectivity"])
+    with np.load(path) as loaded:
+        np.testing.assert_allclose(loaded["correlation"], conn["correlation"])
+
+    # a finished run is loaded from the file
+    assert connectivity.calculate_batch_connectivity(epochs, calc_types, path=path)["ch_names"] \
+        == epochs.ch_names
+
+    with pytest.raises(ValueError):
+        connectivity.calculate_batch_connectivity(epochs, ["granger"])
+
+    with pytest.raises(TypeError):
+        connectivity.calculate_batch_connectivity(EPOCH_42.average(), progress=False)
+
+
 def test_convert_pairs_1():
     '''
     Test convert_pairs helper function
@@ -139,6 +333,9 @@ if __name__ == '__main__':
     test_animate_connectivity()
     test_connectivity_circle()
     test_plot_conn_circle()
+    test_connectivity_renderers()
+    test_calculate_windowed_connectivity()
+    test_connectivity_estimators()
     test_convert_pairs_1()
     test_convert_pairs_2()
     test_convert_pairs_3()
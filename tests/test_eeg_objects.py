@@ -2,6 +2,7 @@ import pytest
 from simpl_eeg import eeg_objects
 import pickle
 import mne
+import numpy as np
 
 
 with open("tests/test_data/raw_1.pkl", "rb") as input:
@@ -28,6 +29,26 @@ def test_EEG_File():
     #assert isinstance(eeg_file.events, list)
 
 
+def test_EEG_File_cache(tmp_path):
+    """Test loading EEG_File from the raw cache"""
+    eeg_file = eeg_objects.EEG_File(
+        PATH,
+        file_name="test.set",
+        cache_dir=str(tmp_path)
+    )
+    cached_file = eeg_objects.EEG_File(
+        PATH,
+        file_name="test.set",
+        cache_dir=str(tmp_path)
+    )
+
+    assert isinstance(cached_file.raw, eeg_objects.CachedRaw)
+    assert cached_file.events == eeg_file.events
+    assert cached_file.montage_source == eeg_file.montage_source
+    assert cached_file.raw.ch_names == eeg_file.raw.ch_names
+    np.testing.assert_array_equal(cached_file.raw.get_data(), eeg_file.raw.get_data())
+
+
 def test_Epoch():
     epochs = eeg_objects.Epochs(
         PATH,
@@ -40,7 +61,66 @@ def test_Epoch():
     assert isinstance(epochs.epoch, mne.Epochs)
 
 
+def test_Epoch_lazy():
+    epochs = eeg_objects.Epochs(
+        PATH,
+        file_name="test.set",
+        lazy=True
+    )
+    preloaded_epochs = eeg_objects.Epochs(
+        PATH,
+        file_name="test.set"
+    )
+
+    # only the selected epoch is loaded
+    assert not epochs.all_epochs.preload
+    assert epochs.epoch.preload
+    np.testing.assert_allclose(epochs.epoch.get_data(), preloaded_epochs.epoch.get_data())
+
+    # selected epochs are kept in the cache
+    epochs.get_epoch('evoked')
+    assert list(epochs.epoch_cache) == [0, 'evoked']
+    assert isinstance(epochs.epoch, mne.Evoked)
+
+
+def test_rolling_average():
+    """Test vectorized rolling average against a per-sample loop"""
+    data = np.random.RandomState(0).randn(2, 3, 50)
+
+    for num_steps in [1, 2, 5, 8]:
+        expected = np.zeros_like(data)
+        for row in range(data.shape[-1]):
+            expected[..., row] = data[
+                ...,
+                max(row-num_steps//2, 0):min(row+num_steps//2+1, data.shape[-1])
+            ].mean(axis=-1)
+
+        averaged = eeg_objects.rolling_average(data, num_steps, offset=1, decim=num_steps)
+        np.testing.assert_allclose(averaged, expected[..., 1::num_steps])
+
+
+def test_average_n_steps():
+    epochs = eeg_objects.Epochs(
+        PATH,
+        file_name="test.set"
+    )
+
+    evoked = epochs.average_n_steps(5)
+    assert isinstance(evoked, mne.EvokedArray)
+    assert evoked.get_data().shape[1] == len(evoked.times)
+
+    all_averaged = epochs.average_n_steps(5, use_single=False)
+    assert isinstance(all_averaged, mne.EpochsArray)
+    np.testing.assert_allclose(
+        all_averaged.times,
+        epochs.skip_n_steps(5, use_single=False).times
+    )
+
+
 if __name__ == '__main__':
     test_EEG_File()
     test_Epoch()
+    test_Epoch_lazy()
+    test_rolling_average()
+    test_average_n_steps()
     print("All tests passed!")
@@ -0,0 +1,74 @@
+import io
+import pytest
+import pickle
+import imageio_ffmpeg
+import matplotlib
+import numpy as np
+from PIL import Image
+from simpl_eeg import export, topomap_2d, connectivity
+
+# prevent figure window from popping up
+matplotlib.use("Agg")
+
+# import the test data
+with open('tests/test_data/test_data1.pkl', 'rb') as input:
+    EPOCH_42 = pickle.load(input)
+
+
+def test_figure_to_array():
+    """Test rendering a figure to an array"""
+    fig = matplotlib.pyplot.figure(figsize=(3, 2), dpi=50)
+    image = export.figure_to_array(fig)
+    assert image.shape == (100, 150, 3)
+
+    # frames are views of the reused Agg buffer
+    rgba = export.render_figure(fig)
+    assert rgba.shape == (100, 150, 4)
+    assert np.shares_memory(rgba, export.render_figure(fig))
+
+
+def test_iter_frames():
+    """Test rendering every frame of an animation"""
+    anim = topomap_2d.animate_topomap_2d(EPOCH_42)
+    frames = [frame.copy() for frame in export.iter_frames(anim)]
+    assert len(frames) == 42
+
+    # the frames match rendering with savefig
+    anim._draw_frame(41)
+    buffer = io.BytesIO()
+    anim._fig.savefig(buffer, format="rgba", dpi=anim._fig.dpi)
+    saved = np.frombuffer(buffer.getbuffer(), dtype=np.uint8).reshape(frames[-1].shape)
+    np.testing.assert_array_equal(frames[-1], saved)
+
+
+def test_render_to_file(tmp_path):
+    """Test rendering animations to files"""
+    path = str(tmp_path / "topomap.gif")
+    export.render_to_file(topomap_2d.animate_topomap_2d, EPOCH_42, path, workers=1)
+    assert Image.open(path).n_frames == 42
+
+    # frames from multiple workers are written in order
+    path = str(tmp_path / "connectivity.mp4")
+    export.render_to_file(
+        connectivity.animate_connectivity,
+        EPOCH_42,
+        path,
+        workers=2,
+        chunk_size=2,
+        steps=5
+    )
+    assert imageio_ffmpeg.count_frames_and_secs(path)[0] == 9
+
+    with pytest.raises(ValueError):
+        export.render_to_file(topomap_2d.animate_topomap_2d, EPOCH_42, "topomap.avi")
+
+    with pytest.raises(TypeError):
+        export.render_to_file(
+            topomap_2d.animate_topomap_2d, EPOCH_42, "topomap.gif", frame_rate="12"
+        )
+
+
+if __name__ == '__main__':
+    test_figure_to_array()
+    test_iter_frames()
+    print("All tests passed!")
@@ -0,0 +1,88 @@
+import pytest
+import pickle
+import numpy as np
+import matplotlib
+import matplotlib.pyplot as plt
+import mne
+from simpl_eeg import layout
+
+# prevent figure window from popping up
+matplotlib.use("Agg")
+
+# import the test data
+with open('tests/test_data/test_data1.pkl', 'rb') as input:
+    EPOCH_42 = pickle.load(input)
+
+
+def rendered_axis_lims(info, **kwargs):
+    """Get the ylim of an actual mne.viz.plot_topomap plot"""
+    fig, ax = plt.subplots()
+    n_channels = len(mne.io.pick._pick_data_channels(info, exclude=()))
+    mne.viz.plot_topomap(np.arange(n_channels), info, show=False, res=1, **kwargs)
+    axis_lims = ax.get_ylim()
+    plt.close()
+    return axis_lims
+
+
+def test_get_axis_lims():
+    """Test the calculated axis limits match the rendered ones"""
+    np.testing.assert_allclose(
+        layout.get_axis_lims(EPOCH_42.info),
+        rendered_axis_lims(EPOCH_42.info)
+    )
+
+    montage = mne.channels.make_standard_montage('standard_1020')
+    info = mne.create_info(montage.ch_names[:40], 100., 'eeg')
+    info.set_montage(montage)
+    np.testing.assert_allclose(layout.get_axis_lims(info), rendered_axis_lims(info))
+
+    # cached per layout
+    assert layout.get_layout_fingerprint(info) in layout.AXIS_LIMS_CACHE
+    assert layout.get_layout_fingerprint(info) != layout.get_layout_fingerprint(EPOCH_42.info)
+
+
+def test_get_sensor_positions():
+    """Test the projected sensor positions match the ones mne draws"""
+    fig = EPOCH_42.plot_sensors(show_names=True, show=False)
+    labels = fig.findobj(match=lambda x: type(x) == plt.Text and x.get_text() != "")
+    plt.close(fig)
+
+    names, pos = layout.get_sensor_positions(EPOCH_42.info)
+    assert names == [label.get_text() for label in labels]
+    # mne draws the names slightly to the right of the sensors
+    np.testing.assert_allclose(pos + [0.0025, 0], [label.get_position() for label in labels])
+
+    montage = mne.channels.make_standard_montage('standard_1020')
+    info = mne.create_info(montage.ch_names[:40], 100., 'eeg')
+    info.set_montage(montage)
+    sphere = (0.01, 0.02, 0.03, 0.1)
+    np.testing.assert_allclose(
+        layout.get_sensor_positions(info, sphere)[1],
+        mne.channels.layout._find_topomap_coords(info, None, sphere=np.array(sphere))
+    )
+
+    # cached per layout and sphere
+    assert layout.get_sensor_positions(info, sphere)[1] is layout.get_sensor_positions(info, sphere)[1]
+
+    info['chs'][1]['loc'][:3] = info['chs'][0]['loc'][:3]
+    with pytest.raises(ValueError):
+        layout.get_sensor_positions(info)
+    assert len(layout.get_sensor_positions(info, ignore_overlap=True)[1]) == 40
+
+
+def test_check_sphere_works():
+    """Test checking whether the sphere parameter can be used"""
+    assert layout.check_sphere_works(EPOCH_42.info, 100, 'head')
+
+    montage = mne.channels.make_standard_montage('standard_1020')
+    info = mne.create_info(montage.ch_names[:40], 100., 'eeg')
+    info.set_montage(montage)
+    assert not layout.check_sphere_works(info, 100, 'head')
+    assert layout.check_sphere_works(info, 100, 'local')
+
+
+if __name__ == '__main__':
+    test_get_axis_lims()
+    test_get_sensor_positions()
+    test_check_sphere_works()
+    print("All tests passed!")
@@ -0,0 +1,53 @@
+import pytest
+import mne
+import numpy as np
+from simpl_eeg import montages
+
+
+def test_get_montage_geometry():
+    """Test looking up the electrode positions of a montage"""
+    geometry = montages.get_montage_geometry("standard_1005")
+    montage = mne.channels.make_standard_montage("standard_1005")
+    positions = montage.get_positions()["ch_pos"]
+
+    assert geometry.ch_names == montage.ch_names
+    np.testing.assert_allclose(geometry.coords, np.array(list(positions.values())))
+    assert geometry.coords.flags["C_CONTIGUOUS"] and not geometry.coords.flags["WRITEABLE"]
+
+    # vectorized lookups for any channel list
+    ch_names = ["Cz", "Fp1", "O2"]
+    np.testing.assert_allclose(
+        geometry.get_coords(ch_names), [positions[name] for name in ch_names]
+    )
+    np.testing.assert_array_equal(
+        geometry.get_indices(ch_names), [montage.ch_names.index(name) for name in ch_names]
+    )
+
+    # loaded once per process
+    assert montages.get_montage_geometry("standard_1005") is geometry
+    assert montages.get_montage_geometry(geometry.montage) is geometry
+
+    # other montages are read without being registered
+    other = montages.get_montage_geometry(mne.channels.make_standard_montage("easycap-M1"))
+    assert "easycap-M1" not in montages.MONTAGE_REGISTRY
+    assert len(other.coords) == len(other.ch_names)
+
+    with pytest.raises(ValueError):
+        geometry.get_coords(["Cz", "not a channel"])
+
+    with pytest.raises(TypeError):
+        montages.MontageGeometry("standard_1005")
+
+
+def test_get_montage():
+    """Test getting a copy of a registered montage"""
+    montage = montages.get_montage("standard_1020")
+    assert type(montage) is mne.channels.montage.DigMontage
+    assert montage is not montages.get_montage_geometry("standard_1020").montage
+    assert montages.get_montage(montage) is montage
+
+
+if __name__ == '__main__':
+    test_get_montage_geometry()
+    test_get_montage()
+    print("All tests passed!")
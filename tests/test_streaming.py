@@ -0,0 +1,160 @@
+import pytest
+import pickle
+import asyncio
+import itertools
+import threading
+import time
+import matplotlib
+import numpy as np
+from simpl_eeg import eeg_objects, streaming, topomap_2d
+
+# prevent figure window from popping up
+matplotlib.use("Agg")
+
+PATH = "tests/test_data/experiment_folder"
+
+# import the test data
+with open('tests/test_data/test_data1.pkl', 'rb') as input:
+    EPOCH_42 = pickle.load(input)
+
+
+def test_ring_buffer():
+    """Test writing and reading the newest samples of a stream"""
+    buffer = streaming.RingBuffer(2, 5)
+    assert buffer.read()[0].shape == (2, 0)
+
+    samples = np.arange(24).reshape(2, 12)
+    buffer.write(samples[:, :3])
+    data, n_written = buffer.read()
+    np.testing.assert_array_equal(data, samples[:, :3])
+    assert n_written == 3
+
+    # the oldest samples are overwritten
+    buffer.write(samples[:, 3:7])
+    np.testing.assert_array_equal(buffer.read()[0], samples[:, 2:7])
+    np.testing.assert_array_equal(buffer.read(2)[0], samples[:, 5:7])
+
+    # chunks larger than the buffer only keep their newest samples
+    buffer.write(samples[:, 4:12])
+    data, n_written = buffer.read()
+    np.testing.assert_array_equal(data, samples[:, 7:12])
+    assert n_written == 15
+
+    with pytest.raises(ValueError):
+        buffer.write(samples[:1])
+
+    with pytest.raises(ValueError):
+        streaming.RingBuffer(2, 0)
+
+
+def test_replay_eeg_file():
+    """Test replaying a recording into a ring buffer"""
+    eeg_file = eeg_objects.EEG_File(PATH, file_name="test.set")
+    data = eeg_file.raw.get_data(picks="eeg")
+    buffer = streaming.RingBuffer(data.shape[0], 100)
+
+    assert streaming.replay_eeg_file(eeg_file, buffer, speed=None) == data.shape[1]
+    np.testing.assert_array_equal(buffer.read()[0], data[:, -100:])
+
+    # replaying in a thread can be stopped
+    stop_event = threading.Event()
+    thread = threading.Thread(
+        target=streaming.replay_eeg_file, args=(eeg_file, buffer, 32, 1.0, stop_event)
+    )
+    thread.start()
+    stop_event.set()
+    thread.join(timeout=5)
+    assert not thread.is_alive()
+
+
+def test_stream_replay():
+    """Test replaying a recording as blocks of samples"""
+    eeg_file = eeg_objects.EEG_File(PATH, file_name="test.set")
+    data = eeg_file.raw.get_data(picks="eeg")
+
+    replay = streaming.StreamReplay(eeg_file, block_size=100, speed=None)
+    blocks = list(replay)
+    assert len(blocks) == len(replay) == 21
+    np.testing.assert_array_equal(np.concatenate(blocks, axis=1), data)
+
+    # the async iterator yields the same blocks
+    async def consume():
+        return [block async for block in replay]
+    np.testing.assert_array_equal(np.concatenate(asyncio.run(consume()), axis=1), data)
+
+    # blocks are yielded when their last sample would have been recorded
+    replay = streaming.StreamReplay(eeg_file, block_size=512, speed=4.0)
+    start_time = time.perf_counter()
+    for block in replay:
+        replay.record_dequeue()
+    assert time.perf_counter() - start_time >= data.shape[1] / 2048 / 4
+    assert len(replay.get_latencies()) == len(replay)
+    percentiles = replay.get_latency_percentiles((50, 99))
+    assert 0 <= percentiles[50] <= percentiles[99]
+
+    # dropped blocks are the same for the same seed
+    replay = streaming.StreamReplay(eeg_file, block_size=100, speed=None, drop_rate=0.5, seed=0)
+    n_samples = sum(block.shape[1] for block in replay)
+    assert 0 < replay.dropped.sum() < len(replay)
+    assert n_samples == data.shape[1] - sum(
+        min(100, data.shape[1] - start) for start in replay.starts[replay.dropped]
+    )
+    dropped = replay.dropped
+    list(replay)
+    np.testing.assert_array_equal(replay.dropped, dropped)
+
+    # only the blocks written before a frame are marked as consumed
+    buffer = streaming.RingBuffer(data.shape[0], 200)
+    replay = streaming.StreamReplay(eeg_file, block_size=100, speed=None)
+    stream = streaming.StreamingTopomap(buffer, eeg_file, replay=replay)
+    blocks = iter(replay)
+    for block in itertools.islice(blocks, 3):
+        buffer.write(block)
+    stream.update()
+    next(blocks)
+    assert len(replay.get_latencies()) == 3
+    assert not np.isnan(replay.get_latency_percentiles()[50])
+
+    with pytest.raises(ValueError):
+        streaming.StreamReplay(eeg_file, drop_rate=1)
+
+    with pytest.raises(TypeError):
+        streaming.StreamReplay(eeg_file, block_size=1.5)
+
+
+def test_streaming_topomap():
+    """Test drawing the newest samples of a stream"""
+    data = EPOCH_42.get_data()[0]
+    buffer = streaming.RingBuffer(data.shape[0], 20)
+    stream = streaming.StreamingTopomap(buffer, EPOCH_42.info, show_connectivity=True)
+
+    # nothing is redrawn until samples are written
+    assert stream.update() == []
+
+    buffer.write(data[:, :30])
+    changed = stream.update()
+    assert stream.renderer.image in changed
+    assert stream.conn_renderer.lines in changed
+    assert stream.latency >= 0
+
+    # the same image as the topomap of the newest sample
+    renderer = topomap_2d.TopomapRenderer(EPOCH_42)
+    np.testing.assert_allclose(
+        stream.renderer.image.get_array(), renderer.interpolate(data[:, 29])
+    )
+
+    anim = stream.animate(frame_rate=60)
+    buffer.write(data[:, 30:])
+    anim._draw_frame(0)
+    assert stream.n_drawn == data.shape[1]
+
+    with pytest.raises(ValueError):
+        streaming.StreamingTopomap(streaming.RingBuffer(3, 20), EPOCH_42.info)
+
+
+if __name__ == '__main__':
+    test_ring_buffer()
+    test_replay_eeg_file()
+    test_stream_replay()
+    test_streaming_topomap()
+    print("All tests passed!")
@@ -53,6 +53,24 @@ def test_animate_topomap_2d():
         topomap_2d.animate_topomap_2d(EPOCH_42, colorbar = 'not a bool')
 
 
+def test_TopomapRenderer():
+    """Test the precomputed interpolation renderer"""
+
+    data = EPOCH_42.get_data('eeg')[0]
+    renderer = topomap_2d.TopomapRenderer(EPOCH_42, plotting_data=data[:, 0])
+    assert isinstance(renderer.image, matplotlib.image.AxesImage)
+    assert renderer.weights.shape == (64 * 64, data.shape[0])
+
+    # The operator is linear so frames can be interpolated in a batch
+    images = renderer.interpolate(data[:, :3])
+    assert images.shape == (3, 64, 64)
+    np.testing.assert_allclose(images[1], renderer.interpolate(data[:, 1]))
+
+    changed = renderer.update(data[:, 1], EPOCH_42.times[1])
+    assert renderer.image in changed
+    assert renderer.timestamp_text.get_text() == topomap_2d.get_timestamp_text(EPOCH_42.times[1])
+
+
 # def test_add_timestamp():
 #     """Test add timestamp"""
 
@@ -75,4 +93,5 @@ if __name__ == '__main__':
     test_add_timestamp()
     test_plot_topomap_2d()
     test_animate_topomap_2d()
+    test_TopomapRenderer()
     print("All tests passed!")
\ No newline at end of file
@@ -1,5 +1,7 @@
+import os
 import pytest
 import mne
+import numpy as np
 from simpl_eeg import raw_voltage, topomap_3d_brain
 import pandas as pd
 import pickle
@@ -19,6 +21,78 @@ def test_create_fsaverage_forward():
         input_epoch)) == mne.forward.forward.Forward
 
 
+def make_sphere_forward(info):
+    """Make a small sphere model forward that doesn't need the fsaverage files"""
+    sphere = mne.make_sphere_model((0., 0., 0.04), 0.09, verbose=False)
+    src = mne.setup_volume_source_space(sphere=sphere, pos=30., verbose=False)
+    return mne.make_forward_solution(
+        info, trans=None, src=src, bem=sphere, eeg=True, meg=False, verbose=False
+    )
+
+
+def test_forward_cache(tmp_path):
+    """Test cases for caching forward operators on disk"""
+    fwd = make_sphere_forward(epoch42.info)
+    cache_dir = str(tmp_path)
+
+    assert topomap_3d_brain.load_forward_cache(cache_dir, "missing") is None
+
+    topomap_3d_brain.save_forward_cache(cache_dir, "first", fwd)
+    loaded_fwd = topomap_3d_brain.load_forward_cache(cache_dir, "first")
+    assert type(loaded_fwd) == mne.forward.forward.Forward
+    assert loaded_fwd["sol"]["data"].shape == fwd["sol"]["data"].shape
+
+    # the least recently used entries are removed once the cache is full
+    entry_size = (tmp_path / "first-fwd.fif").stat().st_size
+    topomap_3d_brain.save_forward_cache(cache_dir, "second", fwd)
+    os.utime(tmp_path / "second-fwd.fif", (0, 0))
+    topomap_3d_brain.save_forward_cache(
+        cache_dir, "third", fwd, max_cache_size=2.5 * entry_size
+    )
+    assert sorted(os.listdir(cache_dir)) == ["first-fwd.fif", "third-fwd.fif"]
+
+    # the key depends on the channel positions and arguments, not n_jobs
+    files = ("tests/test_data/test_data.pkl", "tests/test_data/test_data1.pkl")
+    key = topomap_3d_brain.get_forward_cache_key(epoch42.info, *files, mindist=5.0)
+    assert key == topomap_3d_brain.get_forward_cache_key(
+        epoch42.info, *files, mindist=5.0, n_jobs=2
+    )
+    assert key != topomap_3d_brain.get_forward_cache_key(
+        epoch42.info, *files, mindist=2.0
+    )
+
+
+def test_apply_inverse_batch():
+    """Test cases for the cached inverse operator and batched source estimates"""
+    epochs = mne.EpochsArray(
+        np.random.RandomState(0).normal(0, 1e-5, (4, 19, 42)), epoch42.info, verbose=False
+    )
+    epochs.set_eeg_reference(projection=True, verbose=False)
+    fwd = make_sphere_forward(epochs.info)
+
+    inverse_operator = topomap_3d_brain.get_inverse_operator(
+        epochs, fwd, covariance_method=['empirical'], loose=1.
+    )
+    assert topomap_3d_brain.get_inverse_operator(
+        epochs, fwd, covariance_method=['empirical'], loose=1.
+    ) is inverse_operator
+
+    expected = mne.minimum_norm.apply_inverse_epochs(
+        epochs, inverse_operator, 1.0 / 3.0 ** 2, verbose=False
+    )
+    stcs = topomap_3d_brain.apply_inverse_batch(epochs, inverse_operator, pick_ori=None)
+    assert len(stcs) == 4
+    for stc, expected_stc in zip(stcs, expected):
+        np.testing.assert_allclose(stc.data, expected_stc.data)
+
+    # only the requested epochs, one at a time
+    stcs = topomap_3d_brain.apply_inverse_batch(
+        epochs, inverse_operator, pick_ori=None, epoch_numbers=[1, 3], stream=True
+    )
+    assert not isinstance(stcs, list)
+    np.testing.assert_allclose(list(stcs)[1].data, expected[3].data)
+
+
 with open('tests/test_data/test_fwd.pickle', 'rb') as input:
     input_fwd = pickle.load(input)
 
@@ -212,6 +286,111 @@ def test_animate_topomap_3d_brain_matplotlib():
     
 
 
+def make_sphere_geometry():
+    """Make a brain mesh from a subdivided icosahedron that doesn't need the fsaverage files"""
+    ico = mne.surface._get_ico_surface(2)
+    return {
+        'coords': ico['rr'] * 60,
+        'faces': ico['tris'],
+        'inuse': np.arange(len(ico['rr'])),
+        'tris': ico['tris'],
+        'curv': np.clip(np.array(ico['rr'][:, 2] > 0, np.int64), 0.33, 0.66)
+    }
+
+
+def test_brain_renderer():
+    """Test cases for the persistent matplotlib brain renderer"""
+    geometry = make_sphere_geometry()
+    vertices = [np.arange(0, 162, 3), np.arange(0, 162, 5)]
+    data = np.random.RandomState(0).normal(size=(sum(map(len, vertices)), 4))
+    stc = mne.SourceEstimate(data, vertices, tmin=-0.1, tstep=0.05, subject='sphere')
+
+    operator = topomap_3d_brain.get_smoothing_operator(geometry, vertices[0], 3)
+    assert operator.shape == (len(geometry['faces']), len(vertices[0]))
+
+    renderer = topomap_3d_brain.BrainRenderer(
+        stc,
+        views=['lat', 'dor'],
+        hemi='both',
+        geometry={'lh': geometry, 'rh': geometry}
+    )
+    assert len(renderer.fig.axes) == 5
+    assert renderer.timestamp_text.get_text() == 'time: -0.1000s'
+
+    # each frame only recolours the meshes drawn by the first one
+    collection = renderer.collections['rh'][1]
+    changed = renderer.update(2)
+    assert collection in changed
+    assert renderer.timestamp_text.get_text() == 'time:  0.0000s'
+
+    # the face colours match smoothing the frame on the mesh and averaging each face
+    morph = mne.morph._hemi_morph(
+        geometry['tris'], geometry['inuse'], vertices[1], 3, maps=None, warn=False
+    )
+    smoothed = morph @ data[len(vertices[0]):, 2]
+    scale_pts = renderer.scale_pts
+    expected = renderer.cmap(
+        (smoothed[geometry['faces']].mean(axis=1) - scale_pts[0]) / (scale_pts[2] - scale_pts[0])
+    )
+    expected[:, :3] *= expected[:, [3]]
+    expected[:, :3] += renderer.curv_colors['rh'] * (1. - expected[:, [3]])
+    expected[:, 3] = 1.
+    np.testing.assert_allclose(collection._facecolor3d, expected)
+
+    # the classic cortex is the greyscale curvature like mne's matplotlib backend
+    np.testing.assert_allclose(
+        renderer.curv_colors['lh'],
+        plt.cm.Greys(geometry['curv'][geometry['faces']].mean(axis=1))[:, :3]
+    )
+
+    renderer = topomap_3d_brain.BrainRenderer(
+        stc, hemi='lh', views=['lat'], cortex='bone', alpha=0.5, geometry={'lh': geometry}
+    )
+    np.testing.assert_allclose(renderer.collections['lh'][0]._facecolor3d[:, 3], 0.5)
+    convex = geometry['curv'][geometry['faces']].mean(axis=1) == 0.66
+    np.testing.assert_allclose(
+        renderer.curv_colors['lh'][convex], plt.cm.bone_r(1.2 / 2.2)[:3] * np.ones((convex.sum(), 3))
+    )
+
+    with pytest.raises(ValueError):
+        topomap_3d_brain.BrainRenderer(stc, views=['axi'], geometry={'lh': geometry})
+
+    with pytest.raises(ValueError):
+        topomap_3d_brain.BrainRenderer(stc, cortex='wood', geometry={'lh': geometry})
+
+    # arguments of the 3D backends are ignored with a warning, others are rejected
+    with pytest.warns(UserWarning, match='title'):
+        with pytest.raises(TypeError):
+            topomap_3d_brain.animate_matplot_brain(stc='not an stc', title='brain')
+    with pytest.raises(TypeError, match='not_an_argument'):
+        topomap_3d_brain.animate_matplot_brain(stc=stc, hemi='lh', not_an_argument=True)
+
+    plt.close('all')
+
+
+def test_smoothing_operator_cache(tmp_path):
+    """Test cases for caching smoothing operators on disk"""
+    geometry = make_sphere_geometry()
+    vertices = np.arange(0, 162, 3)
+    cache_dir = str(tmp_path)
+
+    operator = topomap_3d_brain.get_smoothing_operator(geometry, vertices, 2, cache_dir)
+    assert len(os.listdir(cache_dir)) == 1
+
+    # the rows average the smoothed values of a face's vertices
+    np.testing.assert_allclose(operator.sum(axis=1), 1)
+
+    # loaded from disk once it's no longer in memory
+    topomap_3d_brain.SMOOTHING_CACHE.clear()
+    loaded = topomap_3d_brain.get_smoothing_operator(geometry, vertices, 2, cache_dir)
+    assert (loaded != operator).nnz == 0
+
+    # the key depends on the vertices and smoothing steps
+    key = topomap_3d_brain.get_smoothing_cache_key(geometry, vertices, 2)
+    assert key != topomap_3d_brain.get_smoothing_cache_key(geometry, vertices, 3)
+    assert key != topomap_3d_brain.get_smoothing_cache_key(geometry, vertices[1:], 2)
+
+
 # def test_nonexistent_input_path():
 #     '''
 #     Testing input path
@@ -1,9 +1,11 @@
 import pickle
+import imageio_ffmpeg
 import mne
 import numpy
 import pandas as pd
 import plotly
 import pytest
+from PIL import Image
 from simpl_eeg import eeg_objects, topomap_3d_head
 
 # import the test data
@@ -48,6 +50,44 @@ def test_animate_3d_head():
     assert isinstance(ani, plotly.graph_objs._figure.Figure)
     assert ani2.data[0]["cmin"] == -30 and ani2.data[0]["cmax"] == 40
 
+    # frames only contain the intensity of the head
+    assert ani.frames[0].traces == (0,)
+    assert ani.frames[0].data[0].x is None
+
+
+def test_quantize_intensity():
+    """Test cases for storing the interpolated values with less precision"""
+    values = numpy.random.RandomState(0).normal(0, 20, (5, 343))
+
+    with pytest.raises(ValueError):
+        topomap_3d_head.quantize_intensity(values, "float16")
+
+    quantized, offset, scale = topomap_3d_head.quantize_intensity(values, "float32")
+    numpy.testing.assert_allclose(quantized, values, rtol=1e-6)
+
+    quantized, offset, scale = topomap_3d_head.quantize_intensity(values, "uint8")
+    assert quantized.dtype == numpy.uint8
+    numpy.testing.assert_allclose(offset + scale * quantized, values, atol=scale)
+
+    # the colour bar still shows the voltages
+    ani = topomap_3d_head.animate_3d_head(epoch42, quantize="uint8")
+    assert ani.data[0].colorbar.ticktext == ("-50", "-25", "0", "25", "50")
+
+
+def test_to_compact_html():
+    """Test cases for exporting the frames as a binary array"""
+    with pytest.raises(TypeError):
+        topomap_3d_head.to_compact_html("fig")
+
+    ani = topomap_3d_head.animate_3d_head(epoch42)
+    html = topomap_3d_head.to_compact_html(ani, include_plotlyjs=False)
+    assert "Float32Array" in html
+    assert len(html) < len(ani.to_html(include_plotlyjs=False)) / 2
+
+    ani = topomap_3d_head.animate_3d_head(epoch42, quantize="uint8")
+    html = topomap_3d_head.to_compact_html(ani, include_plotlyjs=False)
+    assert "Uint8Array" in html
+
 
 # test the topo_3d_map function
 def test_topo_3d_map():
@@ -202,6 +242,61 @@ def test_interpolated_time():
     assert output.shape == (343,)
     assert type(output) == numpy.ndarray
 
+
+def test_get_frame_data():
+    """Test cases for getting the frame data without a data frame"""
+    df = epoch42.to_data_frame().groupby("time").mean()
+    data, times = topomap_3d_head.get_frame_data(epoch42)
+    numpy.testing.assert_allclose(data, df[epoch42.ch_names].values.T)
+    numpy.testing.assert_array_equal(times, df.index.values)
+
+    # data frames are still supported
+    data, times = topomap_3d_head.get_frame_data(
+        epoch42, epoch42.to_data_frame()
+    )
+    numpy.testing.assert_allclose(data, df[epoch42.ch_names].values.T)
+    assert data.shape == (19, len(times))
+
+
+def test_get_interpolation_weights():
+    """Test cases for the batched 3D interpolation"""
+    standard_montage, standard_coord = topomap_3d_head.get_standard_coord()
+    node_coord = topomap_3d_head.get_eeg_node(epoch42, standard_montage)
+
+    # reject non-array coordinates and unknown methods
+    with pytest.raises(TypeError):
+        topomap_3d_head.get_interpolation_weights("node_coord", standard_coord)
+    with pytest.raises(ValueError):
+        topomap_3d_head.get_interpolation_weights(
+            node_coord, standard_coord, method="linear"
+        )
+
+    # nearest neighbour weights give the same values as interpolated_time
+    df = epoch42.to_data_frame()
+    x = numpy.array(standard_coord)[:, 0]
+    y = numpy.array(standard_coord)[:, 1]
+    z = numpy.array(standard_coord)[:, 2]
+    weights = topomap_3d_head.get_head_interpolation(epoch42)
+    frames = topomap_3d_head.interpolate_frames(
+        df[epoch42.ch_names].values.T, weights
+    )
+    assert frames.shape == (len(df), 343)
+    numpy.testing.assert_allclose(
+        frames[1],
+        topomap_3d_head.interpolated_time(
+            df, epoch42.ch_names, node_coord, x, y, z, 1
+        ).astype(float)
+    )
+
+    # weights of every location add up to one
+    for method in ["idw", "spline"]:
+        weights = topomap_3d_head.get_interpolation_weights(
+            node_coord, standard_coord, method=method
+        )
+        assert weights.shape == (343, 19)
+        numpy.testing.assert_allclose(weights.sum(axis=1), 1, atol=0.05)
+
+
 def test_topo3dhead_plot():
     test_df = pd.DataFrame({"x": [1]})
     with pytest.raises(TypeError):
@@ -217,17 +312,60 @@ def test_save_gif():
         topomap_3d_head.save_gif(test_df, 1, 200)
     with pytest.raises(TypeError):
         topomap_3d_head.save_gif(epoch42, "20", 200.05)
-    
+
+
+def test_get_head_frames():
+    """Test calculating all frames of the gif at once"""
+    intensity, titles = topomap_3d_head.get_head_frames(epoch42)
+    data, times = topomap_3d_head.get_frame_data(epoch42)
+    assert intensity.shape == (len(times) - 1, 343)
+
+    # the frames match the plots of each time stamp
+    for k in (0, 7):
+        fig = topomap_3d_head.topo_3d_map(epoch42, times[k])
+        numpy.testing.assert_allclose(intensity[k], fig.data[0].intensity)
+        assert titles[k] == fig.layout.title.text
+
+    # the triangles of the head face outwards
+    montage, coord = topomap_3d_head.get_standard_coord()
+    triangles = topomap_3d_head.get_head_mesh(coord)
+    normals = numpy.cross(
+        coord[triangles[:, 1]] - coord[triangles[:, 0]],
+        coord[triangles[:, 2]] - coord[triangles[:, 0]]
+    )
+    assert ((normals * (coord[triangles].mean(axis=1) - coord.mean(axis=0))).sum(axis=1) > 0).all()
+
+
+def test_render_head_to_file(tmp_path):
+    """Test rendering the frames to a file with a pool of renderers"""
+    epoch = epoch42.copy().crop(tmax=0.0025)
+
+    path = topomap_3d_head.render_head_to_file(
+        epoch, str(tmp_path / "head.mp4"), workers=2, chunk_size=1
+    )
+    assert imageio_ffmpeg.count_frames_and_secs(path)[0] == 2
+
+    topomap_3d_head.save_gif(epoch, str(tmp_path / "head"), 200)
+    assert Image.open(str(tmp_path / "head.gif")).n_frames == 2
+
+    with pytest.raises(ValueError):
+        topomap_3d_head.render_head_to_file(epoch, "head.avi")
+
 
 
 if __name__ == "__main__":
     test_animate_3d_head()
+    test_quantize_intensity()
+    test_to_compact_html()
     test_topo_3d_map()
     test_frame_args()
     test_get_standard_coord()
     test_get_eeg_node()
     test_get_node_dataframe()
     test_interpolated_time()
+    test_get_frame_data()
+    test_get_interpolation_weights()
     test_topo3dhead_plot()
     test_save_gif()
+    test_get_head_frames()
     print("All tests passed!")
\ No newline at end of file